@@ -0,0 +1,584 @@
+"""
+Running Score Aggregation for LLM Evaluation
+"""
+
+import math
+from itertools import chain
+from typing import Dict, List, Any, Iterable, Callable, Tuple
+import numpy as np
+from scorer import Scorer
+from latency import LatencySketch
+from config import LLM_NAMES, WEIGHTS
+
+
+class ExactSum:
+    """
+    Exactly rounded floating point sum (Shewchuk partials, as in math.fsum)
+
+    The result does not depend on the order in which values are added or on
+    how partial sums are merged, so serial and sharded evaluations produce
+    bit-for-bit identical averages.
+    """
+
+    __slots__ = ('partials',)
+
+    def __init__(self):
+        self.partials: List[float] = []
+
+    def add(self, x: float):
+        """Add a value"""
+        partials = self.partials
+        i = 0
+        for y in partials:
+            if abs(x) < abs(y):
+                x, y = y, x
+            hi = x + y
+            lo = y - (hi - x)
+            if lo:
+                partials[i] = lo
+                i += 1
+            x = hi
+        partials[i:] = [x]
+
+    def add_many(self, values: Iterable[float]):
+        """
+        Add many values at C speed
+
+        The exact sum of `values` is split into non-overlapping floats with
+        repeated math.fsum calls (each captures the rounding error left by
+        the previous ones); typically one or two passes suffice.
+        """
+        values = list(values)
+        parts: List[float] = []
+        while True:
+            residual = math.fsum(chain(values, (-p for p in parts)))
+            if residual == 0.0:
+                break
+            parts.append(residual)
+        for part in parts:
+            self.add(part)
+
+    def merge(self, other: 'ExactSum'):
+        """Add all values of another sum"""
+        for x in other.partials:
+            self.add(x)
+
+    @property
+    def value(self) -> float:
+        """Correctly rounded sum"""
+        return math.fsum(self.partials)
+
+
+class ScoreAggregator:
+    """
+    Keep running per-LLM score sums and response time sketches
+
+    Only sums, counts and latency histograms are stored, so memory does not
+    depend on the number of responses fed through ``add``.
+    """
+
+    def __init__(self, llm_names: List[str] = None):
+        self.llm_names = list(llm_names or LLM_NAMES)
+        self.counts = {llm: 0 for llm in self.llm_names}
+        self.totals = {llm: ExactSum() for llm in self.llm_names}
+        self.criterion_totals = {
+            llm: {criterion: ExactSum() for criterion in Scorer.CRITERIA}
+            for llm in self.llm_names
+        }
+        self.latencies = {llm: LatencySketch() for llm in self.llm_names}
+
+    def add(self, llm_name: str, scores: Dict[str, float], response_time: float = None):
+        """
+        Add one scored response
+
+        Args:
+            llm_name: LLM the response belongs to
+            scores: Output of Scorer.score_response
+            response_time: Response time in ms (None = unknown)
+        """
+        self.counts[llm_name] += 1
+        self.latencies[llm_name].add(response_time)
+        self.totals[llm_name].add(scores['total'])
+
+        criterion_totals = self.criterion_totals[llm_name]
+        for criterion in Scorer.CRITERIA:
+            criterion_totals[criterion].add(scores[criterion])
+
+    def remove(self, llm_name: str, scores: Dict[str, float], response_time: float = None):
+        """
+        Remove a previously added response (e.g. a row that changed or was deleted)
+
+        Args:
+            llm_name: LLM the response belongs to
+            scores: Scores that were passed to add()
+            response_time: Response time that was passed to add()
+        """
+        self.counts[llm_name] -= 1
+        self.latencies[llm_name].remove(response_time)
+        self.totals[llm_name].add(-scores['total'])
+
+        criterion_totals = self.criterion_totals[llm_name]
+        for criterion in Scorer.CRITERIA:
+            criterion_totals[criterion].add(-scores[criterion])
+
+    def add_batch(self, llm_codes: np.ndarray, scores: Dict[str, np.ndarray], times: np.ndarray = None):
+        """
+        Add a batch of scored responses (output of Scorer.score_batch)
+
+        Sums are reduced per LLM group, giving the same results as calling
+        add() for every response.
+
+        Args:
+            llm_codes: Index into llm_names for every response
+            scores: Per-criterion and 'total' score arrays
+            times: Response times in ms, NaN where missing (None = not tracked)
+        """
+        llm_codes = np.asarray(llm_codes)
+        for code in np.unique(llm_codes):
+            llm_name = self.llm_names[code]
+            mask = llm_codes == code
+
+            self.counts[llm_name] += int(np.count_nonzero(mask))
+            self.totals[llm_name].add_many(scores['total'][mask].tolist())
+            if times is not None:
+                self.latencies[llm_name].add_many(times[mask])
+
+            criterion_totals = self.criterion_totals[llm_name]
+            for criterion in Scorer.CRITERIA:
+                criterion_totals[criterion].add_many(scores[criterion][mask].tolist())
+
+    def merge(self, other: 'ScoreAggregator'):
+        """
+        Fold the sums of another aggregator (e.g. a worker's partial result) into this one
+
+        Args:
+            other: Aggregator over a disjoint set of responses
+        """
+        for llm_name in other.llm_names:
+            if llm_name not in self.counts:
+                self.llm_names.append(llm_name)
+                self.counts[llm_name] = 0
+                self.totals[llm_name] = ExactSum()
+                self.criterion_totals[llm_name] = {c: ExactSum() for c in Scorer.CRITERIA}
+                self.latencies[llm_name] = LatencySketch()
+
+            self.counts[llm_name] += other.counts[llm_name]
+            self.totals[llm_name].merge(other.totals[llm_name])
+            self.latencies[llm_name].merge(other.latencies[llm_name])
+            for criterion, total in other.criterion_totals[llm_name].items():
+                self.criterion_totals[llm_name][criterion].merge(total)
+
+    def to_state(self) -> Dict[str, Any]:
+        """Serialize the running sums (JSON-compatible, exact)"""
+        return {
+            llm_name: {
+                'count': self.counts[llm_name],
+                'total': self.totals[llm_name].partials,
+                'criteria': {
+                    criterion: total.partials
+                    for criterion, total in self.criterion_totals[llm_name].items()
+                },
+                'latency': self.latencies[llm_name].to_state()
+            }
+            for llm_name in self.llm_names
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], llm_names: List[str] = None) -> 'ScoreAggregator':
+        """Restore an aggregator serialized with to_state()"""
+        aggregator = cls(llm_names)
+        for llm_name, sums in state.items():
+            if llm_name not in aggregator.counts:
+                continue
+            aggregator.counts[llm_name] = sums['count']
+            aggregator.totals[llm_name].partials = list(sums['total'])
+            for criterion, partials in sums['criteria'].items():
+                aggregator.criterion_totals[llm_name][criterion].partials = list(partials)
+            aggregator.latencies[llm_name] = LatencySketch.from_state(sums['latency'])
+        return aggregator
+
+    def average(self, llm_name: str) -> float:
+        """Average total score of an LLM"""
+        count = self.counts[llm_name]
+        return self.totals[llm_name].value / count if count > 0 else 0
+
+    def results(self, speed_quantile: float = None, weights: Dict[str, float] = None) -> Dict[str, Any]:
+        """
+        Build the evaluation results
+
+        Args:
+            speed_quantile: Score speed by this response time quantile of
+                each LLM (e.g. 0.95) instead of averaging the per-response
+                speed points; responses without a time are left out
+            weights: Weights the responses were scored with (default:
+                WEIGHTS); criteria with weight 0 were not scored and are
+                reported as None
+
+        Returns:
+            Dictionary with scores, details (incl. latency percentiles),
+            ranking, best/worst LLMs
+        """
+        weights = WEIGHTS if weights is None else weights
+        criteria = Scorer.active_criteria(weights)
+        llm_scores = {}
+        llm_details = {}
+
+        for llm_name in self.llm_names:
+            count = self.counts[llm_name]
+            avg_score = self.average(llm_name)
+            criterion_scores = {
+                criterion: (total.value / count if count > 0 else 0) if criterion in criteria else None
+                for criterion, total in self.criterion_totals[llm_name].items()
+            }
+
+            if speed_quantile is not None and count > 0 and 'speed' in criteria:
+                speed = Scorer.score_response_time(self.latencies[llm_name].quantile(speed_quantile))
+                avg_score += (speed - criterion_scores['speed']) / 10.0 * 100 * weights['speed']
+                criterion_scores['speed'] = speed
+
+            llm_scores[llm_name] = avg_score
+            llm_details[llm_name] = {
+                'average_score': avg_score,
+                'total_responses': count,
+                'valid_responses': count,
+                'criterion_scores': criterion_scores,
+                'latency': self.latencies[llm_name].summary()
+            }
+
+        ranked_llms = sorted(llm_scores.items(), key=lambda x: x[1], reverse=True)
+
+        return {
+            'scores': llm_scores,
+            'details': llm_details,
+            'ranking': ranked_llms,
+            'best_llm': ranked_llms[0][0],
+            'worst_llm': ranked_llms[-1][0]
+        }
+
+
+def row_winners(totals: List[float], llm_names: List[str]) -> Tuple[str, str]:
+    """
+    Best and worst LLM of one row
+
+    Ties are broken like the overall ranking: the best is the first of the
+    highest scores and the worst the last of the lowest, in llm_names order.
+
+    Args:
+        totals: Total score per LLM, in llm_names order
+
+    Returns:
+        (best_llm, worst_llm)
+    """
+    best = worst = 0
+    for index, total in enumerate(totals):
+        if total > totals[best]:
+            best = index
+        if total <= totals[worst]:
+            worst = index
+    return llm_names[best], llm_names[worst]
+
+
+UNKNOWN_GROUP = 'unknown'
+
+# Last axis of BreakdownAggregator.row_score_matrix()
+ROW_SCORE_KEYS = Scorer.CRITERIA + ['total']
+
+# Completed rows per preallocated block of kept row scores
+ROW_BLOCK_SIZE = 4096
+
+
+class BreakdownAggregator:
+    """
+    Per-error_category / per-error_code aggregates and per-row winners
+
+    Groups hold a ScoreAggregator each, so memory scales with the number of
+    categories and codes. Scores of a row are buffered only until all LLMs of
+    that row have been added; then the row's best/worst LLM is counted and
+    passed to `on_row_winner` (or collected in `row_winners`). With
+    `keep_row_scores` the scores of completed rows are also kept (see
+    row_score_matrix), e.g. for bootstrap confidence intervals; they are
+    stored as float32 in preallocated blocks of ROW_BLOCK_SIZE rows.
+    """
+
+    def __init__(self, llm_names: List[str] = None,
+                 on_row_winner: Callable[[int, str, str], None] = None,
+                 keep_row_scores: bool = False):
+        """
+        Args:
+            llm_names: LLMs scored per row
+            on_row_winner: Called with (row_id, best_llm, worst_llm) for each
+                completed row; if None, winners are collected in row_winners
+            keep_row_scores: Keep every criterion and total score of completed rows
+        """
+        self.llm_names = list(llm_names or LLM_NAMES)
+        self.llm_index = {llm: index for index, llm in enumerate(self.llm_names)}
+        self.categories: Dict[str, ScoreAggregator] = {}
+        self.error_codes: Dict[str, ScoreAggregator] = {}
+        self.wins = {llm: 0 for llm in self.llm_names}
+        self.losses = {llm: 0 for llm in self.llm_names}
+        self.on_row_winner = on_row_winner
+        self.row_winners: List[Tuple[int, str, str]] = []
+        self._pending: Dict[int, List[Any]] = {}
+        self.keep_row_scores = keep_row_scores
+        # (row_ids, scores) blocks of completed rows, plus the block rows
+        # added one by one are written to (the first _block_rows are used)
+        self._row_blocks: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._block_ids: np.ndarray = None
+        self._block_scores: np.ndarray = None
+        self._block_rows = 0
+
+    @staticmethod
+    def group_key(key: Any) -> str:
+        """Key a group is stored under (error categories and codes as strings)"""
+        return UNKNOWN_GROUP if key is None else str(key)
+
+    def _group(self, groups: Dict[str, ScoreAggregator], key: Any) -> ScoreAggregator:
+        """Get or create the aggregator of a group (keys are stored as strings)"""
+        key = self.group_key(key)
+        aggregator = groups.get(key)
+        if aggregator is None:
+            aggregator = groups[key] = ScoreAggregator(self.llm_names)
+        return aggregator
+
+    def _emit_winner(self, row_id: int, best_llm: str, worst_llm: str):
+        """Count and publish a row's winner"""
+        self.wins[best_llm] += 1
+        self.losses[worst_llm] += 1
+        if self.on_row_winner:
+            self.on_row_winner(row_id, best_llm, worst_llm)
+        else:
+            self.row_winners.append((row_id, best_llm, worst_llm))
+
+    def add(self, row_id: int, error_category: str, error_code: str,
+            llm_name: str, scores: Dict[str, float], response_time: float = None):
+        """
+        Add one scored response
+
+        Args:
+            row_id: llm_error_analysis.id
+            error_category: Row's error category
+            error_code: Row's error code
+            llm_name: LLM the response belongs to
+            scores: Output of Scorer.score_response
+            response_time: Response time in ms (None = unknown)
+        """
+        self._group(self.categories, error_category).add(llm_name, scores, response_time)
+        self._group(self.error_codes, error_code).add(llm_name, scores, response_time)
+
+        pending = self._pending.get(row_id)
+        if pending is None:
+            pending = self._pending[row_id] = [
+                0, [0.0] * len(self.llm_names), [None] * len(self.llm_names) if self.keep_row_scores else None
+            ]
+        pending[0] += 1
+        index = self.llm_index[llm_name]
+        pending[1][index] = scores['total']
+        if self.keep_row_scores:
+            pending[2][index] = [scores[key] for key in ROW_SCORE_KEYS]
+
+        if pending[0] == len(self.llm_names):
+            del self._pending[row_id]
+            if self.keep_row_scores:
+                self._keep_row(row_id, pending[2])
+            self._emit_winner(row_id, *row_winners(pending[1], self.llm_names))
+
+    def _keep_row(self, row_id: int, scores: List[List[float]]):
+        """Write the scores of a completed row into the current block"""
+        if self._block_scores is None or self._block_rows == ROW_BLOCK_SIZE:
+            self._close_block()
+            self._block_ids = np.empty(ROW_BLOCK_SIZE, dtype=np.int64)
+            self._block_scores = np.empty((ROW_BLOCK_SIZE, len(self.llm_names), len(ROW_SCORE_KEYS)),
+                                          dtype=np.float32)
+        self._block_ids[self._block_rows] = row_id
+        self._block_scores[self._block_rows] = scores
+        self._block_rows += 1
+
+    def _close_block(self):
+        """Move the used part of the current block to the completed blocks"""
+        if self._block_rows:
+            if self._block_rows == ROW_BLOCK_SIZE:
+                self._row_blocks.append((self._block_ids, self._block_scores))
+            else:
+                self._row_blocks.append((self._block_ids[:self._block_rows].copy(),
+                                         self._block_scores[:self._block_rows].copy()))
+        self._block_ids = self._block_scores = None
+        self._block_rows = 0
+
+    def add_batch(self, row_ids: np.ndarray, error_categories: List[str], error_codes: List[str],
+                  llm_codes: np.ndarray, scores: Dict[str, np.ndarray], times: np.ndarray = None):
+        """
+        Add complete rows scored with Scorer.score_batch
+
+        Responses must be row-major with every row holding all llm_names in
+        order (as produced by LLMEvaluator.build_feature_table).
+
+        Args:
+            row_ids: Row id of every response
+            error_categories: Error category of every response
+            error_codes: Error code of every response
+            llm_codes: Index into llm_names for every response
+            scores: Per-criterion and 'total' score arrays
+            times: Response times in ms, NaN where missing (None = not tracked)
+        """
+        n_llms = len(self.llm_names)
+
+        for names, groups in ((error_categories, self.categories), (error_codes, self.error_codes)):
+            positions: Dict[Any, List[int]] = {}
+            for position, key in enumerate(names):
+                positions.setdefault(key, []).append(position)
+            for key, index in positions.items():
+                self._group(groups, key).add_batch(
+                    llm_codes[index], {name: values[index] for name, values in scores.items()},
+                    times[index] if times is not None else None
+                )
+
+        totals = scores['total'].reshape(-1, n_llms)
+        if self.keep_row_scores:
+            self.add_row_scores(
+                row_ids[::n_llms],
+                np.stack([scores[key].reshape(-1, n_llms) for key in ROW_SCORE_KEYS], axis=-1)
+            )
+        best = np.argmax(totals, axis=1)
+        worst = n_llms - 1 - np.argmin(totals[:, ::-1], axis=1)
+        for row_id, b, w in zip(row_ids[::n_llms].tolist(), best.tolist(), worst.tolist()):
+            self._emit_winner(row_id, self.llm_names[b], self.llm_names[w])
+
+    def add_row_scores(self, row_ids: np.ndarray, scores: np.ndarray):
+        """
+        Keep the scores of complete rows scored elsewhere
+
+        Args:
+            row_ids: Row id of every row
+            scores: Array of shape (rows, len(llm_names), len(ROW_SCORE_KEYS))
+        """
+        self._row_blocks.append((np.asarray(row_ids, dtype=np.int64), np.asarray(scores, dtype=np.float32)))
+
+    def row_score_matrix(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Scores of all completed rows kept with `keep_row_scores`
+
+        Rows are sorted by id, so the matrix does not depend on the order
+        rows were scored or merged in.
+
+        Returns:
+            (row_ids, scores) with float32 scores of shape
+            (rows, len(llm_names), len(ROW_SCORE_KEYS))
+        """
+        self._close_block()
+        if not self._row_blocks:
+            return (np.zeros(0, dtype=np.int64),
+                    np.zeros((0, len(self.llm_names), len(ROW_SCORE_KEYS)), dtype=np.float32))
+
+        if len(self._row_blocks) > 1:
+            row_ids = np.concatenate([ids for ids, _ in self._row_blocks])
+            self._row_blocks = [(row_ids, np.concatenate([values for _, values in self._row_blocks]))]
+        row_ids, scores = self._row_blocks[0]
+        # Rows usually complete in id order; copy only when they did not
+        if np.any(row_ids[1:] < row_ids[:-1]):
+            order = np.argsort(row_ids, kind='stable')
+            self._row_blocks = [(row_ids[order], scores[order])]
+        return self._row_blocks[0]
+
+    def remove_row(self, error_category: str, error_code: str,
+                   llm_scores: List[Tuple[str, Dict[str, float], float]]):
+        """
+        Remove a previously added complete row
+
+        Args:
+            error_category: Category the row was added with
+            error_code: Code the row was added with
+            llm_scores: (llm_name, scores, response_time) for every LLM of the row
+        """
+        totals = [0.0] * len(self.llm_names)
+        for llm_name, scores, response_time in llm_scores:
+            self._group(self.categories, error_category).remove(llm_name, scores, response_time)
+            self._group(self.error_codes, error_code).remove(llm_name, scores, response_time)
+            totals[self.llm_index[llm_name]] = scores['total']
+
+        if len(llm_scores) == len(self.llm_names):
+            best_llm, worst_llm = row_winners(totals, self.llm_names)
+            self.wins[best_llm] -= 1
+            self.losses[worst_llm] -= 1
+
+    def merge(self, other: 'BreakdownAggregator'):
+        """
+        Fold another breakdown over a disjoint set of complete rows into this one
+
+        Winners collected by `other` are published through this aggregator.
+        """
+        for groups, other_groups in ((self.categories, other.categories),
+                                     (self.error_codes, other.error_codes)):
+            for key, aggregator in other_groups.items():
+                self._group(groups, key).merge(aggregator)
+
+        for row_id, best_llm, worst_llm in other.row_winners:
+            self._emit_winner(row_id, best_llm, worst_llm)
+
+        if self.keep_row_scores:
+            self.add_row_scores(*other.row_score_matrix())
+
+    def to_state(self) -> Dict[str, Any]:
+        """Serialize the group sums and win counts (JSON-compatible, exact)"""
+        return {
+            'categories': {key: agg.to_state() for key, agg in self.categories.items()},
+            'error_codes': {key: agg.to_state() for key, agg in self.error_codes.items()},
+            'wins': self.wins,
+            'losses': self.losses
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], llm_names: List[str] = None,
+                   on_row_winner: Callable[[int, str, str], None] = None) -> 'BreakdownAggregator':
+        """Restore a breakdown serialized with to_state()"""
+        breakdown = cls(llm_names, on_row_winner)
+        for groups, saved in ((breakdown.categories, state['categories']),
+                              (breakdown.error_codes, state['error_codes'])):
+            for key, sums in saved.items():
+                groups[key] = ScoreAggregator.from_state(sums, breakdown.llm_names)
+        for llm_name in breakdown.llm_names:
+            breakdown.wins[llm_name] = state['wins'].get(llm_name, 0)
+            breakdown.losses[llm_name] = state['losses'].get(llm_name, 0)
+        return breakdown
+
+    @staticmethod
+    def _summarize(groups: Dict[str, ScoreAggregator], speed_quantile: float = None,
+                   latency: bool = False, weights: Dict[str, float] = None) -> Dict[str, Any]:
+        """Average scores and best/worst LLM (and latency percentiles) per group"""
+        summary = {}
+        for key in sorted(groups):
+            aggregator = groups[key]
+            if not any(aggregator.counts.values()):
+                continue
+            results = aggregator.results(speed_quantile, weights)
+            summary[key] = {
+                'responses': max(aggregator.counts.values()),
+                'scores': results['scores'],
+                'best_llm': results['best_llm'],
+                'worst_llm': results['worst_llm']
+            }
+            if latency:
+                summary[key]['latency'] = {
+                    llm_name: details['latency'] for llm_name, details in results['details'].items()
+                }
+        return summary
+
+    def results(self, speed_quantile: float = None, weights: Dict[str, float] = None) -> Dict[str, Any]:
+        """
+        Build the breakdown results
+
+        Args:
+            speed_quantile: See ScoreAggregator.results
+            weights: See ScoreAggregator.results
+
+        Returns:
+            Dictionary with per-category (incl. latency percentiles) and
+            per-error-code summaries and per-LLM row win/loss counts
+        """
+        return {
+            'categories': self._summarize(self.categories, speed_quantile, latency=True, weights=weights),
+            'error_codes': self._summarize(self.error_codes, speed_quantile, weights=weights),
+            'row_wins': {
+                llm_name: {'best': self.wins[llm_name], 'worst': self.losses[llm_name]}
+                for llm_name in self.llm_names
+            }
+        }
@@ -0,0 +1,118 @@
+"""
+Asyncio Pipeline Overlapping Database I/O with Scoring
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class AsyncPipeline:
+    """
+    Run fetching, scoring and writing concurrently
+
+    Three stages connected by bounded asyncio queues:
+
+    - reader: `fetch_chunk()` in an I/O thread until it returns no rows
+      (psycopg2 releases the GIL while waiting for the server)
+    - scorers: `score(chunk)` in worker processes, `workers * 2` chunks in
+      flight so a process never waits for the parent
+    - writer: `write(item)` in a second I/O thread, in completion order
+
+    `merge(result)` runs on the event loop thread, so it needs no locks; it
+    folds a scored chunk into the running totals and returns the item to
+    write (None = nothing to write). A full queue suspends the stage feeding
+    it, so a slow database or slow scoring throttles the reader and at most
+    `queue_size` chunks wait between two stages. Wall time approaches the
+    slowest stage instead of the sum of all three.
+    """
+
+    def __init__(self, fetch_chunk: Callable[[], List[Tuple]], score: Callable[[List[Tuple]], Any],
+                 merge: Callable[[Any], Optional[Any]], write: Callable[[Any], None] = None,
+                 workers: int = 1, queue_size: int = 4,
+                 initializer: Callable = None, initargs: Tuple = ()):
+        """
+        Args:
+            fetch_chunk: Returns the next chunk of rows, an empty list at the end
+            score: Picklable function scoring one chunk in a worker process
+            merge: Folds a score() result in, returns the item to write or None
+            write: Writes one item to the database (None = nothing is written)
+            workers: Number of scoring processes
+            queue_size: Chunks buffered between two stages
+            initializer: Called with `initargs` once in every worker process
+        """
+        self.fetch_chunk = fetch_chunk
+        self.score = score
+        self.merge = merge
+        self.write = write
+        self.workers = max(workers, 1)
+        self.queue_size = max(queue_size, 1)
+        self.initializer = initializer
+        self.initargs = initargs
+        self.rows = 0
+        self.chunks = 0
+
+    def run(self):
+        """Run the pipeline to completion (re-raises the first stage error)"""
+        asyncio.run(self._run())
+
+    async def _run(self):
+        chunks = asyncio.Queue(self.queue_size)
+        results = asyncio.Queue(self.queue_size)
+        scorers = self.workers * 2
+
+        with ThreadPoolExecutor(1, thread_name_prefix='eval-reader') as reader, \
+                ThreadPoolExecutor(1, thread_name_prefix='eval-writer') as writer, \
+                ProcessPoolExecutor(max_workers=self.workers, initializer=self.initializer,
+                                    initargs=self.initargs) as pool:
+            stages = [
+                asyncio.create_task(self._read(reader, chunks, scorers)),
+                asyncio.create_task(self._score_stage(pool, chunks, results, scorers)),
+                asyncio.create_task(self._write_stage(writer, results)),
+            ]
+            try:
+                await asyncio.gather(*stages)
+            except BaseException:
+                for stage in stages:
+                    stage.cancel()
+                await asyncio.gather(*stages, return_exceptions=True)
+                raise
+
+    async def _read(self, reader: ThreadPoolExecutor, chunks: asyncio.Queue, scorers: int):
+        """Fetch chunks until the source is exhausted, then stop every scorer"""
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await loop.run_in_executor(reader, self.fetch_chunk)
+            if not chunk:
+                break
+            self.rows += len(chunk)
+            self.chunks += 1
+            await chunks.put(chunk)
+
+        for _ in range(scorers):
+            await chunks.put(None)
+
+    async def _score_stage(self, pool: ProcessPoolExecutor, chunks: asyncio.Queue,
+                           results: asyncio.Queue, scorers: int):
+        """Score chunks with `scorers` concurrent submitters, then stop the writer"""
+        await asyncio.gather(*(self._score(pool, chunks, results) for _ in range(scorers)))
+        await results.put(None)
+
+    async def _score(self, pool: ProcessPoolExecutor, chunks: asyncio.Queue, results: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await chunks.get()
+            if chunk is None:
+                return
+            item = self.merge(await loop.run_in_executor(pool, self.score, chunk))
+            if item is not None and self.write is not None:
+                await results.put(item)
+
+    async def _write_stage(self, writer: ThreadPoolExecutor, results: asyncio.Queue):
+        """Write merged items in order of completion"""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await results.get()
+            if item is None:
+                return
+            await loop.run_in_executor(writer, self.write, item)
@@ -0,0 +1,95 @@
+"""
+Benchmark: LSH duplicate grouping vs comparing every pair of signatures
+
+Near-duplicates are injected by copying responses and replacing a few of
+their words. Reports the time of both approaches and how many of the pairs
+found by the full comparison end up in the same LSH group (recall).
+
+Usage:
+    python benchmarks/bench_duplicates.py [--texts N] [--copies K] [--edit-rate R]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import corpus  # noqa: E402
+from config import DEDUP_THRESHOLD, DEDUP_NUM_PERM, DEDUP_SHINGLE_SIZE  # noqa: E402
+from duplicates import DuplicateIndex  # noqa: E402
+
+
+def near_duplicate_corpus(texts, copies, edit_rate, words=300, seed=42):
+    """Distinct responses followed by copies with a share of their words replaced"""
+    rng = random.Random(seed)
+    originals = [corpus.generate_response(rng, rng.randint(words // 2, words * 2)) for _ in range(texts)]
+    vocabulary = corpus.ENGLISH_WORDS + corpus.TURKISH_WORDS
+    mutated = []
+    for text in rng.sample(originals, min(copies, texts)):
+        parts = text.split(' ')
+        for position in rng.sample(range(len(parts)), int(len(parts) * edit_rate)):
+            parts[position] = rng.choice(vocabulary)
+        mutated.append(' '.join(parts))
+    return originals + mutated
+
+
+def similar_pairs(signatures, min_matches, block=256):
+    """Pairs of texts whose signatures agree in at least min_matches positions (all pairs compared)"""
+    pairs = []
+    for start in range(0, len(signatures), block):
+        matches = (signatures[start:start + block, None, :] == signatures[None, :, :]).sum(axis=2)
+        for offset, other in zip(*np.nonzero(matches >= min_matches)):
+            if start + offset < other:
+                pairs.append((start + offset, other))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--texts', type=int, default=3000)
+    parser.add_argument('--copies', type=int, default=1000)
+    parser.add_argument('--edit-rate', type=float, default=0.02)
+    parser.add_argument('--threshold', type=float, default=DEDUP_THRESHOLD)
+    args = parser.parse_args()
+
+    texts = near_duplicate_corpus(args.texts, args.copies, args.edit_rate)
+
+    index = DuplicateIndex(args.threshold, DEDUP_NUM_PERM, DEDUP_SHINGLE_SIZE)
+    start = time.perf_counter()
+    for text in texts:
+        index.hasher.signature(text)
+    signature_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    text_ids = [index.add(text) for text in texts]
+    lsh_time = time.perf_counter() - start - signature_time
+
+    signatures = np.array([index.signatures[text_id] for text_id in text_ids])
+    start = time.perf_counter()
+    pairs = similar_pairs(signatures, index._min_matches)
+    pairwise_time = time.perf_counter() - start
+
+    found = sum(index.find(text_ids[a]) == index.find(text_ids[b]) for a, b in pairs)
+    groups = {index.find(text_id) for text_id in text_ids}
+    recall = found / len(pairs) if pairs else 1.0
+
+    print(f"{'✅' if recall >= 0.95 else '❌'} LSH recall of similar pairs: {recall:.1%} ({found}/{len(pairs)})")
+    print(f"   Texts:            {len(texts)} ({args.copies} near-duplicates, {args.edit_rate:.0%} words edited)")
+    print(f"   LSH:              {index.bands} bands × {index.rows} rows, {index.comparisons} comparisons, "
+          f"{len(texts) - len(groups)} texts joined a group")
+    print(f"   Signatures:       {signature_time * 1000:8.1f} ms")
+    print(f"   LSH grouping:     {lsh_time * 1000:8.1f} ms")
+    print(f"   All pairs:        {pairwise_time * 1000:8.1f} ms ({len(texts) * (len(texts) - 1) // 2} pairs)")
+
+    if recall < 0.95:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
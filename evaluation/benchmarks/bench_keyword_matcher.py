@@ -0,0 +1,121 @@
+"""
+Benchmark: single-pass KeywordMatcher vs per-keyword str.count scans
+
+Usage:
+    python benchmarks/bench_keyword_matcher.py [--responses N] [--words N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config import (  # noqa: E402
+    TECHNICAL_KEYWORDS, SOLUTION_KEYWORDS, CAUSE_KEYWORDS,
+    ALTERNATIVE_KEYWORDS, ERROR_KEYWORDS
+)
+from keyword_matcher import KEYWORD_MATCHER  # noqa: E402
+
+
+FILLER = (
+    "the this when you should check make sure that for with information report "
+    "dialog broadcast capital important before after bu bir ve ile için olarak "
+    "kontrol edin lütfen şunu önce sonra dosya ayarlar İstanbul ÇÖZÜM Hata"
+).split()
+
+EDGE_CASES = [
+    "ororor errorerror disk DISK disklogdisk",
+    "stack\ntrace stack trace stack  trace haystack traceback",
+    "another method other method anothermethod",
+    "İNDEX İndex index KIMLIK doğrulama kimlik doğrulama",
+    "due to due tooo root cause rootcause",
+]
+
+
+def legacy_counts(text):
+    """Reference implementation: one scan per keyword"""
+    text_lower = text.lower()
+    technical = 0
+    for keyword in TECHNICAL_KEYWORDS:
+        technical += text_lower.count(keyword.lower())
+    return {
+        'technical': technical,
+        'error': any(k in text_lower for k in ERROR_KEYWORDS),
+        'solution': any(k in text_lower for k in SOLUTION_KEYWORDS),
+        'cause': any(k in text_lower for k in CAUSE_KEYWORDS),
+        'alternative': any(k in text_lower for k in ALTERNATIVE_KEYWORDS),
+    }
+
+
+def matcher_counts(text):
+    """KeywordMatcher implementation"""
+    counts = KEYWORD_MATCHER.scan(text.lower())
+    return {
+        'technical': counts['technical'],
+        'error': counts['error'] > 0,
+        'solution': counts['solution'] > 0,
+        'cause': counts['cause'] > 0,
+        'alternative': counts['alternative'] > 0,
+    }
+
+
+def generate_corpus(responses, words, seed=42):
+    """Generate responses mixing keywords, filler and markdown punctuation"""
+    rng = random.Random(seed)
+    keywords = (TECHNICAL_KEYWORDS + SOLUTION_KEYWORDS + CAUSE_KEYWORDS +
+                ALTERNATIVE_KEYWORDS)
+    corpus = list(EDGE_CASES)
+    for _ in range(responses):
+        parts = []
+        for _ in range(rng.randint(words // 2, words * 2)):
+            word = rng.choice(keywords) if rng.random() < 0.1 else rng.choice(FILLER)
+            if rng.random() < 0.05:
+                word = rng.choice(['`', '(', '**']) + word + rng.choice(['.', ',', ':', ')'])
+            parts.append(word)
+            if rng.random() < 0.05:
+                parts.append('\n\n' if rng.random() < 0.3 else '\n')
+        corpus.append(' '.join(parts))
+    return corpus
+
+
+def bench(func, corpus, repeat):
+    """Return best wall time over `repeat` runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--responses', type=int, default=300)
+    parser.add_argument('--words', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.responses, args.words)
+
+    mismatches = [t for t in corpus if legacy_counts(t) != matcher_counts(t)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} responses differ from the legacy counts")
+        sys.exit(1)
+    print(f"✅ Counts identical on {len(corpus)} responses")
+
+    size_kb = sum(len(t) for t in corpus) / len(corpus) / 1024
+    legacy = bench(legacy_counts, corpus, args.repeat)
+    matcher = bench(matcher_counts, corpus, args.repeat)
+
+    print(f"   Average response size: {size_kb:.1f} KB")
+    print(f"   Legacy str.count scans: {legacy * 1000:8.1f} ms")
+    print(f"   KeywordMatcher:         {matcher * 1000:8.1f} ms")
+    print(f"   Speedup:                {legacy / matcher:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
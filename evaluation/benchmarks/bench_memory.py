@@ -0,0 +1,100 @@
+"""
+Benchmark: memory of per-response dicts vs ResponseRecord / Features slots
+
+Usage:
+    python benchmarks/bench_memory.py [--rows N] [--features N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import corpus  # noqa: E402
+import standin_db  # noqa: E402
+from evaluator import LLMEvaluator  # noqa: E402
+from feature_extractor import FeatureExtractor, Features  # noqa: E402
+
+
+def legacy_fetch_all_responses(evaluator):
+    """Reference implementation: one dict per LLM per row"""
+    llm_responses = {llm: [] for llm in evaluator.llm_names}
+    for row in evaluator.iter_rows():
+        for llm_name, text, response_time in LLMEvaluator._row_responses(row, evaluator.llm_names):
+            llm_responses[llm_name].append({
+                'id': row[0],
+                'error_category': row[1],
+                'error_code': row[2],
+                'text': text,
+                'response_time': response_time,
+                'is_error': text.startswith('Error:') if text else True
+            })
+    return llm_responses
+
+
+def measure(build):
+    """Bytes still allocated by build()'s result, and the result"""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5_000)
+    parser.add_argument('--features', type=int, default=10_000)
+    args = parser.parse_args()
+
+    conn = standin_db.connect('sqlite')
+    standin_db.load_rows(conn, corpus.generate_rows(args.rows))
+    evaluator = LLMEvaluator()
+    evaluator.conn = conn
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        legacy_bytes, legacy = measure(lambda: legacy_fetch_all_responses(evaluator))
+        compact_bytes, compact = measure(evaluator.fetch_all_responses)
+    responses = sum(len(values) for values in compact.values())
+
+    # Response texts are the same in both; compare what is built around them
+    texts = {id(record.text): record.text for values in compact.values() for record in values}
+    text_bytes = sum(sys.getsizeof(text) for text in texts.values() if text is not None)
+
+    texts = corpus.generate_responses(args.features, unique=args.features)
+    feature_list = [FeatureExtractor.extract(text) for text in texts]
+    dict_bytes, feature_dicts = measure(lambda: [features.to_dict() for features in feature_list])
+    slot_bytes, feature_slots = measure(lambda: [Features(*features.values()) for features in feature_list])
+
+    identical = all(
+        d == f.to_dict() for d, f in zip(feature_dicts, feature_slots)
+    ) and all(
+        old['id'] == new.id and old['text'] == new.text and old['is_error'] == new.is_error
+        for llm_name in compact for old, new in zip(legacy[llm_name], compact[llm_name])
+    )
+
+    legacy_overhead = legacy_bytes - text_bytes
+    compact_overhead = compact_bytes - text_bytes
+    print(f"{'✅' if identical else '❌'} Records and features identical: {identical}")
+    print(f"   Responses:             {responses}")
+    print(f"   Dict records:          {legacy_bytes / 2**20:8.1f} MB "
+          f"({legacy_overhead / responses:6.0f} B/response besides texts)")
+    print(f"   ResponseRecord:        {compact_bytes / 2**20:8.1f} MB "
+          f"({compact_overhead / responses:6.0f} B/response besides texts)")
+    print(f"   Reduction:             {1 - compact_overhead / legacy_overhead:8.1%} (texts excluded), "
+          f"{1 - compact_bytes / legacy_bytes:.1%} overall")
+    print(f"   Feature dicts:         {dict_bytes / len(feature_dicts):8.0f} B/response")
+    print(f"   Features slots:        {slot_bytes / len(feature_slots):8.0f} B/response")
+    print(f"   Reduction:             {1 - slot_bytes / dict_bytes:8.1%}")
+
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
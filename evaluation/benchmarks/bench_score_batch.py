@@ -0,0 +1,73 @@
+"""
+Benchmark: Scorer.score_batch vs per-response Scorer.score_response
+
+Usage:
+    python benchmarks/bench_score_batch.py [--responses N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config import WEIGHTS  # noqa: E402
+from feature_extractor import FeatureExtractor, Features  # noqa: E402
+from scorer import Scorer  # noqa: E402
+
+
+def random_features(n, seed=42):
+    """Random feature table, response times and error flags"""
+    rng = np.random.default_rng(seed)
+    table = np.zeros((n, len(FeatureExtractor.FEATURE_NAMES)))
+    for index, name in enumerate(FeatureExtractor.FEATURE_NAMES):
+        if name.startswith('has_'):
+            table[:, index] = rng.integers(0, 2, n)
+        else:
+            table[:, index] = rng.integers(0, 1600 if name == 'word_count' else 30, n)
+    times = rng.uniform(500, 45000, n)
+    times[rng.random(n) < 0.05] = np.nan
+    is_error = rng.random(n) < 0.1
+    return table, times, is_error
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--responses', type=int, default=200_000)
+    args = parser.parse_args()
+
+    table, times, is_error = random_features(args.responses)
+    feature_records = [Features(*row) for row in table.tolist()]
+    time_list = [None if np.isnan(t) else t for t in times.tolist()]
+    error_list = is_error.tolist()
+
+    start = time.perf_counter()
+    rowwise = [
+        Scorer.score_response(f, t, e, WEIGHTS)
+        for f, t, e in zip(feature_records, time_list, error_list)
+    ]
+    rowwise_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = Scorer.score_batch(table, times, is_error, WEIGHTS)
+    batch_time = time.perf_counter() - start
+
+    identical = all(
+        np.array_equal(batch[key], [scores[key] for scores in rowwise])
+        for key in Scorer.CRITERIA + ['total']
+    )
+    print(f"{'✅' if identical else '❌'} Batch scores identical to score_response: {identical}")
+    print(f"   Responses:        {args.responses}")
+    print(f"   score_response:   {rowwise_time * 1000:8.1f} ms")
+    print(f"   score_batch:      {batch_time * 1000:8.1f} ms")
+    print(f"   Speedup:          {rowwise_time / batch_time:8.1f}x")
+
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Load test: scoring service (python main.py serve) latency and throughput
+
+Starts the service in a child process (or uses a running one with --url),
+sends --requests requests of --batch responses each over --concurrency
+keep-alive connections and reports per-request latency percentiles. Every
+reply is checked against in-process scoring.
+
+Usage:
+    python benchmarks/bench_service.py [--requests N] [--batch N] [--concurrency N]
+                                       [--transport http|stdio] [--url http://host:port]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import corpus  # noqa: E402
+from run_benchmarks import percentiles  # noqa: E402
+from service import score_response  # noqa: E402
+
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'main.py')
+
+
+def make_requests(count, batch, words, seed=42):
+    """`count` lists of `batch` {text, response_time} objects"""
+    rng = random.Random(seed)
+    texts = corpus.generate_responses(count * batch, seed=seed, words=words)
+    items = [
+        {'text': text, 'response_time': None if rng.random() < 0.05 else rng.randint(500, 45000)}
+        for text in texts
+    ]
+    return [items[start:start + batch] for start in range(0, len(items), batch)]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_http_service(timeout=30):
+    """Start `main.py serve` on a free port; returns (process, url) once healthy"""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, MAIN_PATH, 'serve', '--port', str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                conn.close()
+                return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("scoring service did not start")
+
+
+def run_http(url, bodies, concurrency):
+    """Send the request bodies over `concurrency` connections; (latencies, replies)"""
+    target = urlparse(url)
+    latencies = [None] * len(bodies)
+    replies = [None] * len(bodies)
+    errors = []
+
+    def worker(indices):
+        conn = http.client.HTTPConnection(target.hostname, target.port)
+        try:
+            # Not timed: opens the connection
+            conn.request('POST', '/score', b'[]', {'Content-Type': 'application/json'})
+            conn.getresponse().read()
+            for index in indices:
+                start = time.perf_counter()
+                conn.request('POST', '/score', bodies[index], {'Content-Type': 'application/json'})
+                response = conn.getresponse()
+                data = response.read()
+                latencies[index] = time.perf_counter() - start
+                if response.status != 200:
+                    raise RuntimeError(f"HTTP {response.status}: {data[:200]!r}")
+                replies[index] = json.loads(data)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            conn.close()
+
+    threads = [
+        threading.Thread(target=worker, args=(range(offset, len(bodies), concurrency),))
+        for offset in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return latencies, replies
+
+
+def run_stdio(bodies):
+    """Send the request bodies as JSON lines to `main.py serve --stdio`; (latencies, replies)"""
+    process = subprocess.Popen(
+        [sys.executable, MAIN_PATH, 'serve', '--stdio'],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    latencies = []
+    replies = []
+    try:
+        # Not timed: waits for startup
+        process.stdin.write(b'[]\n')
+        process.stdin.flush()
+        process.stdout.readline()
+        for body in bodies:
+            start = time.perf_counter()
+            process.stdin.write(body + b'\n')
+            process.stdin.flush()
+            line = process.stdout.readline()
+            latencies.append(time.perf_counter() - start)
+            replies.append(json.loads(line))
+    finally:
+        process.stdin.close()
+        process.wait()
+    return latencies, replies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2_000)
+    parser.add_argument('--batch', type=int, default=1, help="Responses per request")
+    parser.add_argument('--concurrency', type=int, default=4, help="Connections (HTTP only)")
+    parser.add_argument('--words', type=int, default=400, help="Average words per response")
+    parser.add_argument('--transport', choices=['http', 'stdio'], default='http')
+    parser.add_argument('--url', help="Use a running service instead of starting one")
+    args = parser.parse_args()
+
+    requests = make_requests(args.requests, args.batch, args.words)
+    bodies = [json.dumps(request, ensure_ascii=False).encode('utf-8') for request in requests]
+    expected = [[score_response(item['text'], item['response_time']) for item in request] for request in requests]
+
+    process = None
+    start = time.perf_counter()
+    if args.transport == 'stdio':
+        latencies, replies = run_stdio(bodies)
+    else:
+        url = args.url
+        if url is None:
+            process, url = start_http_service()
+        try:
+            start = time.perf_counter()
+            latencies, replies = run_http(url, bodies, args.concurrency)
+        finally:
+            if process:
+                process.terminate()
+                process.wait()
+    elapsed = time.perf_counter() - start
+
+    identical = replies == expected
+    latency = percentiles(latencies)
+    responses = args.requests * args.batch
+    connections = f"{args.concurrency} connections, " if args.transport == 'http' else ""
+    print(f"{'✅' if identical else '❌'} Replies identical to in-process scoring: {identical}")
+    print(f"   Transport:    {args.transport} ({connections}batch {args.batch})")
+    print(f"   Requests:     {args.requests} ({responses} responses) in {elapsed:.2f} s")
+    print(f"   Throughput:   {args.requests / elapsed:,.0f} requests/s, {responses / elapsed:,.0f} responses/s")
+    print(f"   Latency ms:   p50 {latency['p50']:.3f}  p95 {latency['p95']:.3f}  "
+          f"p99 {latency['p99']:.3f}  max {latency['max']:.3f}")
+
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: single-pass TextAnalyzer vs the per-feature splits and regexes
+
+Usage:
+    python benchmarks/bench_text_analyzer.py [--responses N] [--min-kb N] [--max-kb N]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from corpus import generate_response  # noqa: E402
+from text_analyzer import TextAnalyzer  # noqa: E402
+
+
+EDGE_CASES = [
+    "#\n##\n# Title\n#no heading\n  # indented",
+    "-\n- item\n  * item\n•\n-no bullet\n\n\n  - after blank lines\n-",
+    "1.\n2) item\n10. item\n١. arabic digit\n3.no\n  4. indented\n5.",
+    "a\n\n\nb\n \nc\n\n",
+    "First. Second!! Third?! ... last words\n\n",
+    "Version 1.2.3 e.g. this... and ✅ ⚠️ done",
+    "```\ncode\n```\n```",
+    "   \n\t\n",
+]
+
+
+def legacy_analyze(text):
+    """Reference implementation: one scan per feature"""
+    sentences = re.split(r'[.!?]+', text)
+    sentences = [s.strip() for s in sentences if s.strip()]
+    markers = ['✅', '❌', '🔍', '⚠️', '💡', '🚀', '📝', '🎯', '⏱️', '💾']
+    return {
+        'word_count': len(text.split()),
+        'code_blocks': text.count('```') // 2,
+        'headings': len(re.findall(r'^#+\s', text, re.MULTILINE)),
+        'bullet_points': len(re.findall(r'^\s*[-*•]\s', text, re.MULTILINE)),
+        'numbered_lists': len(re.findall(r'^\s*\d+[\.)]\s', text, re.MULTILINE)),
+        'paragraph_count': len([p.strip() for p in text.split('\n\n') if p.strip()]),
+        'has_visual_markers': any(marker in text for marker in markers),
+        'sentence_count': len(sentences),
+        'avg_sentence_length': (
+            sum(len(s.split()) for s in sentences) / len(sentences) if sentences else 0
+        ),
+    }
+
+
+def generate_texts(responses, min_kb, max_kb, seed=42):
+    """Markdown responses between min_kb and max_kb (about 7 bytes per word)"""
+    rng = random.Random(seed)
+    texts = list(EDGE_CASES)
+    for _ in range(responses):
+        words = rng.randint(min_kb * 1024 // 7, max_kb * 1024 // 7)
+        texts.append(generate_response(rng, words, structure=rng.random()))
+    return texts
+
+
+def bench(func, texts, repeat):
+    """Return best wall time over `repeat` runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--responses', type=int, default=300)
+    parser.add_argument('--min-kb', type=int, default=5)
+    parser.add_argument('--max-kb', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    texts = generate_texts(args.responses, args.min_kb, args.max_kb)
+
+    mismatches = [t for t in texts if legacy_analyze(t) != TextAnalyzer.analyze(t)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} responses differ from the legacy features")
+        sys.exit(1)
+    print(f"✅ Features identical on {len(texts)} responses")
+
+    size_kb = sum(len(t.encode('utf-8')) for t in texts) / len(texts) / 1024
+    legacy = bench(legacy_analyze, texts, args.repeat)
+    analyzer = bench(TextAnalyzer.analyze, texts, args.repeat)
+
+    print(f"   Average response size: {size_kb:.1f} KB")
+    print(f"   Legacy scans:          {legacy / len(texts) * 1e6:8.1f} µs/response")
+    print(f"   TextAnalyzer:          {analyzer / len(texts) * 1e6:8.1f} µs/response")
+    print(f"   Speedup:               {legacy / analyzer:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
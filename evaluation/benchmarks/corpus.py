@@ -0,0 +1,163 @@
+"""
+Synthetic LLM Response Corpus for Benchmarks
+
+Generates markdown responses of controlled size and structure (headings,
+paragraphs, bullet/numbered lists, code blocks, emoji markers) in mixed
+Turkish/English text, and llm_error_analysis rows built from them.
+"""
+
+import os
+import random
+import sys
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config import (  # noqa: E402
+    TECHNICAL_KEYWORDS, SOLUTION_KEYWORDS, CAUSE_KEYWORDS, ALTERNATIVE_KEYWORDS
+)
+
+
+ENGLISH_WORDS = (
+    "the this when you should check make sure that for with information value "
+    "request before after then run install update configure file setting user "
+    "service application call return result output input system environment "
+    "variable path permission access code line function method class object"
+).split()
+
+TURKISH_WORDS = (
+    "bu bir ve ile için olarak kontrol edin lütfen şunu önce sonra dosya ayarlar "
+    "kullanıcı uygulama sistem değer çalıştırın güncelleyin yükleyin ortam yol "
+    "izin erişim satır fonksiyon sınıf nesne sonuç çıktı giriş İstanbul ağ"
+).split()
+
+KEYWORDS = TECHNICAL_KEYWORDS + SOLUTION_KEYWORDS + CAUSE_KEYWORDS + ALTERNATIVE_KEYWORDS
+
+MARKERS = ['✅', '❌', '🔍', '⚠️', '💡', '🚀', '📝', '🎯']
+
+CODE_SNIPPETS = [
+    "import psycopg2\nconn = psycopg2.connect(host='localhost')\ncursor = conn.cursor()",
+    "try:\n    response = session.get(url, timeout=30)\nexcept TimeoutError as e:\n    log(e)",
+    "SELECT id, name FROM users WHERE id = %s;",
+    "npm install --save express\nnode server.js",
+    "const result = await fetch(endpoint, { method: 'POST' });",
+]
+
+ERROR_CATEGORIES = ['API_ERROR', 'DATABASE_ERROR', 'NETWORK_ERROR', 'CODE_ERROR', 'SECURITY_ERROR']
+
+# Responses per row: groq, mistral, cohere, openrouter, openrouter_hermes
+RESPONSE_COLUMNS = 5
+
+
+def _sentence(rng: random.Random, words: int, turkish: bool, keyword_rate: float) -> str:
+    """One sentence of filler words with keywords mixed in"""
+    vocabulary = TURKISH_WORDS if turkish else ENGLISH_WORDS
+    parts = [
+        rng.choice(KEYWORDS) if rng.random() < keyword_rate else rng.choice(vocabulary)
+        for _ in range(max(words, 1))
+    ]
+    parts[0] = parts[0].capitalize()
+    return ' '.join(parts) + rng.choice(['.', '.', '.', '!', '?'])
+
+
+def generate_response(rng: random.Random, words: int = 400, structure: float = 0.5,
+                      turkish: float = 0.5, keyword_rate: float = 0.08) -> str:
+    """
+    Generate one markdown response
+
+    Args:
+        rng: Random generator
+        words: Approximate number of words
+        structure: 0..1, how much markdown structure (headings, lists, code)
+        turkish: Share of Turkish sentences
+        keyword_rate: Share of words drawn from the keyword lists
+
+    Returns:
+        Response text
+    """
+    blocks = []
+    written = 0
+
+    while written < words:
+        kind = rng.random()
+        is_turkish = rng.random() < turkish
+
+        if kind < structure * 0.15:
+            blocks.append('#' * rng.randint(1, 3) + ' ' + _sentence(rng, 4, is_turkish, keyword_rate)[:-1])
+            written += 4
+        elif kind < structure * 0.35:
+            marker = rng.choice(['-', '*', '•'])
+            items = rng.randint(2, 6)
+            blocks.append('\n'.join(
+                f"{marker} {_sentence(rng, rng.randint(4, 12), is_turkish, keyword_rate)}" for _ in range(items)
+            ))
+            written += items * 8
+        elif kind < structure * 0.5:
+            items = rng.randint(2, 6)
+            blocks.append('\n'.join(
+                f"{i}. {_sentence(rng, rng.randint(4, 12), is_turkish, keyword_rate)}" for i in range(1, items + 1)
+            ))
+            written += items * 8
+        elif kind < structure * 0.6:
+            snippet = rng.choice(CODE_SNIPPETS)
+            blocks.append(f"```\n{snippet}\n```")
+            written += len(snippet.split())
+        else:
+            sentences = rng.randint(2, 6)
+            paragraph = ' '.join(
+                _sentence(rng, rng.randint(6, 24), is_turkish, keyword_rate) for _ in range(sentences)
+            )
+            if rng.random() < structure * 0.3:
+                paragraph = rng.choice(MARKERS) + ' ' + paragraph
+            blocks.append(paragraph)
+            written += sentences * 15
+
+    return '\n\n'.join(blocks)
+
+
+def generate_responses(count: int, seed: int = 42, words: int = 400, structure: float = 0.5,
+                       unique: int = 2000) -> List[str]:
+    """
+    Generate `count` responses drawn from a pool of `unique` distinct texts
+
+    Response sizes vary between half and twice `words`. Drawing from a pool
+    keeps generation fast for million-response runs.
+    """
+    rng = random.Random(seed)
+    pool = [
+        generate_response(rng, rng.randint(words // 2, words * 2), structure)
+        for _ in range(min(count, unique))
+    ]
+    return [pool[rng.randrange(len(pool))] for _ in range(count)]
+
+
+def generate_rows(count: int, seed: int = 42, words: int = 400, structure: float = 0.5,
+                  unique: int = 2000, error_rate: float = 0.1, missing_rate: float = 0.03) -> List[Tuple]:
+    """
+    Generate llm_error_analysis rows
+
+    Args:
+        count: Number of rows
+        error_rate: Share of 'Error: ...' responses
+        missing_rate: Share of responses without text and time
+
+    Returns:
+        Tuples of (error_category, error_code, error_message, then text and
+        response time for each of the 5 response columns)
+    """
+    rng = random.Random(seed + 1)
+    texts = generate_responses(min(count * RESPONSE_COLUMNS, unique), seed, words, structure, unique)
+
+    rows = []
+    for _ in range(count):
+        row = [rng.choice(ERROR_CATEGORIES), f"E{rng.randint(1, 40)}", "synthetic error message"]
+        for _ in range(RESPONSE_COLUMNS):
+            draw = rng.random()
+            if draw < missing_rate:
+                row += [None, None]
+            elif draw < missing_rate + error_rate:
+                row += [f"Error: {rng.choice([429, 500, 503])}", rng.randint(100, 2000)]
+            else:
+                row += [rng.choice(texts), rng.randint(500, 45000)]
+        rows.append(tuple(row))
+    return rows
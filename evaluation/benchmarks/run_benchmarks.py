@@ -0,0 +1,327 @@
+"""
+Benchmark suite: feature extraction, scoring and the full evaluation pipeline
+
+Each case runs in its own process on a synthetic corpus (see corpus.py) and
+reports throughput, per-response latency percentiles and peak memory.
+Results are compared with a stored baseline; a throughput drop beyond the
+tolerance or changed results exit with status 1.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 1k,100k,1m] [--cases extract,score,pipeline]
+                                        [--modes batch,stream,vectorized,parallel,async]
+                                        [--backend sqlite|postgres] [--save-baseline]
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import platform
+import sys
+import time
+from array import array
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import corpus  # noqa: E402
+import standin_db  # noqa: E402
+from config import LLM_NAMES, WEIGHTS  # noqa: E402
+from feature_extractor import FeatureExtractor  # noqa: E402
+from scorer import Scorer  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+SIZE_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+
+def parse_size(text):
+    """'1k' -> 1000, '1m' -> 1000000, '500' -> 500"""
+    text = text.strip().lower()
+    if text[-1] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def format_size(size):
+    """1000 -> '1k'"""
+    for suffix, factor in sorted(SIZE_SUFFIXES.items(), key=lambda item: -item[1]):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{suffix}"
+    return str(size)
+
+
+def peak_memory_mb():
+    """Peak resident memory of this process (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def percentiles(latencies):
+    """p50/p95/p99/max of per-item latencies in milliseconds"""
+    ordered = sorted(latencies)
+    if not ordered:
+        return None
+
+    def at(fraction):
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 4)
+
+    return {'p50': at(0.50), 'p95': at(0.95), 'p99': at(0.99), 'max': round(ordered[-1] * 1000, 4)}
+
+
+def bench_extract(size, options):
+    """FeatureExtractor.extract on every response, all features computed"""
+    texts = corpus.generate_responses(size, words=options['words'], unique=options['unique'])
+    extract = FeatureExtractor.extract
+    to_row = FeatureExtractor.to_row
+    clock = time.perf_counter
+
+    latencies = array('d')
+    checksum = []
+    start = clock()
+    for text in texts:
+        call = clock()
+        # extract() is lazy; reading the row computes every feature
+        row = to_row(extract(text))
+        latencies.append(clock() - call)
+        checksum.append(math.fsum(row))
+    wall = clock() - start
+
+    return wall, latencies, repr(math.fsum(checksum))
+
+
+def bench_score(size, options):
+    """Scorer.score_response on pre-extracted features"""
+    texts = corpus.generate_responses(size, words=options['words'], unique=options['unique'])
+    features = {}
+    for text in texts:
+        if text not in features:
+            features[text] = FeatureExtractor.extract(text)
+            # Compute the features now, so only scoring is timed
+            features[text].values()
+    items = [(features[text], 500 + (i * 7919) % 45000, i % 10 == 0) for i, text in enumerate(texts)]
+    score = Scorer.score_response
+    clock = time.perf_counter
+
+    latencies = array('d')
+    totals = []
+    start = clock()
+    for feature_record, response_time, is_error in items:
+        call = clock()
+        scores = score(feature_record, response_time, is_error, WEIGHTS)
+        latencies.append(clock() - call)
+        totals.append(scores['total'])
+    wall = clock() - start
+
+    return wall, latencies, repr(math.fsum(totals))
+
+
+def bench_pipeline(size, options):
+    """LLMEvaluator.evaluate_all_llms over a stand-in database"""
+    from evaluator import LLMEvaluator
+
+    mode = options['mode']
+    rows = corpus.generate_rows(
+        max(size // len(LLM_NAMES), 1), words=options['words'], unique=options['unique']
+    )
+    conn = standin_db.connect(options['backend'])
+    standin_db.load_rows(conn, rows, options['backend'])
+    del rows
+
+    evaluator = LLMEvaluator(
+        stream=mode == 'stream',
+        vectorized=mode == 'vectorized',
+        workers=options['workers'] if mode in ('parallel', 'async') else 1,
+        async_pipeline=mode == 'async'
+    )
+    evaluator.conn = conn
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = evaluator.evaluate_all_llms()
+    wall = time.perf_counter() - start
+    conn.close()
+
+    checksum = hashlib.sha256(
+        json.dumps([results['scores'], results['row_wins']], sort_keys=True).encode('utf-8')
+    ).hexdigest()[:16]
+    return wall, None, checksum
+
+
+CASES = {
+    'extract': bench_extract,
+    'score': bench_score,
+    'pipeline': bench_pipeline
+}
+
+
+def _run_case(case, size, options, queue):
+    """Child process entry point"""
+    try:
+        wall, latencies, checksum = CASES[case](size, options)
+        queue.put({
+            'responses': size,
+            'wall_s': round(wall, 4),
+            'throughput': round(size / wall, 1) if wall > 0 else None,
+            'latency_ms': percentiles(latencies) if latencies is not None else None,
+            'peak_memory_mb': peak_memory_mb(),
+            'checksum': checksum
+        })
+    except Exception as e:  # reported by the parent
+        queue.put({'error': f"{type(e).__name__}: {e}"})
+
+
+def run_case(case, size, options, repeat=1):
+    """
+    Run one case in fresh processes so peak memory is per case
+
+    Returns:
+        The fastest of `repeat` runs
+    """
+    best = None
+    for _ in range(repeat):
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_run_case, args=(case, size, options, queue))
+        process.start()
+        result = queue.get()
+        process.join()
+        if 'error' in result:
+            return result
+        if best is None or result['wall_s'] < best['wall_s']:
+            best = result
+    return best
+
+
+def _format(value, width, precision):
+    """Right-aligned number, '-' when not measured"""
+    return f"{value:>{width}.{precision}f}" if value is not None else f"{'-':>{width}}"
+
+
+def compare(key, result, baseline, tolerance):
+    """
+    Compare a result with its baseline entry
+
+    Returns:
+        (status, note); status is 'ok', 'new', 'slower' or 'changed'
+    """
+    reference = baseline.get(key)
+    if reference is None:
+        return 'new', ''
+    if reference.get('checksum') != result['checksum']:
+        return 'changed', 'results differ from baseline'
+    ratio = result['throughput'] / reference['throughput']
+    note = f"{(ratio - 1) * 100:+.1f}% vs baseline"
+    if ratio < 1 - tolerance:
+        return 'slower', note
+    return 'ok', note
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1k', help="Comma separated, e.g. 1k,100k,1m")
+    parser.add_argument('--cases', default='extract,score,pipeline')
+    parser.add_argument('--modes', default='batch,vectorized',
+                        help="Pipeline modes: batch, stream, vectorized, parallel, async")
+    parser.add_argument('--backend', choices=['sqlite', 'postgres'], default='sqlite',
+                        help="Pipeline database (postgres uses DB_CONFIG and a TEMP table)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--words', type=int, default=400, help="Average words per response")
+    parser.add_argument('--unique', type=int, default=2000, help="Distinct response texts")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per case, fastest is kept")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Store these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed throughput drop before failing (default: 0.25)")
+    parser.add_argument('--output', help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(',')]
+    cases = []
+    for case in args.cases.split(','):
+        if case == 'pipeline':
+            cases += [(f"pipeline.{mode}", case, mode) for mode in args.modes.split(',')]
+        else:
+            cases.append((case, case, None))
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+    print(f"{'case':<22} {'size':>6} {'resp/s':>12} {'p50 ms':>9} {'p99 ms':>9} {'peak MB':>9}  status")
+    results = {}
+    failed = False
+
+    for size in sizes:
+        for name, case, mode in cases:
+            options = {
+                'mode': mode, 'backend': args.backend, 'workers': args.workers,
+                'words': args.words, 'unique': args.unique
+            }
+            key = f"{name}@{format_size(size)}"
+            result = run_case(case, size, options, args.repeat)
+
+            if 'error' in result:
+                print(f"{name:<22} {format_size(size):>6}  ❌ {result['error']}")
+                failed = True
+                continue
+
+            status, note = compare(key, result, baseline, args.tolerance)
+            failed |= status in ('slower', 'changed')
+            results[key] = result
+
+            latency = result['latency_ms'] or {}
+            icon = {'ok': '✅', 'new': '🆕', 'slower': '❌', 'changed': '❌'}[status]
+            print(f"{name:<22} {format_size(size):>6} {result['throughput']:>12,.0f} "
+                  f"{_format(latency.get('p50'), 9, 3)} {_format(latency.get('p99'), 9, 3)} "
+                  f"{_format(result['peak_memory_mb'], 9, 1)}  {icon} {status} {note}")
+
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'backend': args.backend,
+        'words': args.words,
+        'unique': args.unique,
+        'repeat': args.repeat,
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f:
+                stored = json.load(f)
+            stored['results'].update(results)
+            results = stored['results']
+        report['results'] = dict(sorted(results.items()))
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"\n💾 Baseline saved to {args.baseline}")
+    elif failed:
+        print("\n❌ Performance regression or changed results")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Database Stand-ins for Pipeline Benchmarks
+
+`connect('sqlite')` returns an in-memory SQLite database behind a minimal
+psycopg2-style interface; `connect('postgres')` connects with DB_CONFIG and
+creates a session-local TEMP llm_error_analysis table that shadows the real
+one, so benchmarks never read or modify existing data.
+"""
+
+import os
+import sqlite3
+import sys
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config import DB_CONFIG  # noqa: E402
+
+
+RESPONSE_COLUMNS = ['groq', 'mistral', 'cohere', 'openrouter', 'openrouter_hermes']
+
+INSERT_COLUMNS = ['error_category', 'error_code', 'error_message'] + [
+    column
+    for llm in RESPONSE_COLUMNS
+    for column in (f"{llm}_response", f"{llm}_response_time")
+]
+
+
+class SQLiteCursor:
+    """psycopg2-like cursor over sqlite3 (%s placeholders, itersize)"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._cursor = conn.cursor()
+        self.itersize = 2000
+        self.rowcount = -1
+
+    def execute(self, query: str, params: Tuple = None):
+        self._cursor.execute(query.replace('%s', '?'), params or ())
+        self.rowcount = self._cursor.rowcount
+
+    def executemany(self, query: str, params: List[Tuple]):
+        self._cursor.executemany(query.replace('%s', '?'), params)
+        self.rowcount = self._cursor.rowcount
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size: int = None):
+        return self._cursor.fetchmany(size or self.itersize)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def __iter__(self):
+        while True:
+            rows = self._cursor.fetchmany(self.itersize)
+            if not rows:
+                return
+            yield from rows
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """psycopg2-like connection to an in-memory SQLite database"""
+
+    def __init__(self, path: str = ':memory:'):
+        # The async pipeline reads from an I/O thread
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+
+    def cursor(self, name: str = None) -> SQLiteCursor:
+        # Named (server-side) cursors map to plain cursors iterated in batches
+        return SQLiteCursor(self._conn)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+def _create_table(conn, backend: str):
+    """Create an empty llm_error_analysis table"""
+    response_columns = ', '.join(
+        f"{llm}_response TEXT, {llm}_response_time INTEGER" for llm in RESPONSE_COLUMNS
+    )
+    if backend == 'sqlite':
+        ddl = (
+            "CREATE TABLE llm_error_analysis (id INTEGER PRIMARY KEY, "
+            f"error_category TEXT, error_code TEXT, error_message TEXT, {response_columns})"
+        )
+    else:
+        ddl = (
+            "CREATE TEMP TABLE llm_error_analysis (id SERIAL PRIMARY KEY, "
+            f"error_category TEXT, error_code TEXT, error_message TEXT, {response_columns})"
+        )
+    cursor = conn.cursor()
+    cursor.execute(ddl)
+    cursor.close()
+
+
+def connect(backend: str = 'sqlite'):
+    """
+    Open a benchmark database with an empty llm_error_analysis table
+
+    Args:
+        backend: 'sqlite' (in-memory) or 'postgres' (DB_CONFIG, TEMP table)
+
+    Returns:
+        psycopg2 connection or SQLiteConnection
+    """
+    if backend == 'sqlite':
+        conn = SQLiteConnection()
+    elif backend == 'postgres':
+        import psycopg2
+        conn = psycopg2.connect(**DB_CONFIG)
+    else:
+        raise ValueError(f"Unknown backend: {backend}")
+
+    _create_table(conn, backend)
+    return conn
+
+
+def load_rows(conn, rows: List[Tuple], backend: str = 'sqlite'):
+    """
+    Insert generated rows (see corpus.generate_rows)
+
+    Args:
+        conn: Connection returned by connect()
+        rows: Tuples in INSERT_COLUMNS order
+        backend: Backend the connection belongs to
+    """
+    cursor = conn.cursor()
+    if backend == 'postgres':
+        from psycopg2.extras import execute_values
+        execute_values(
+            cursor,
+            f"INSERT INTO llm_error_analysis ({', '.join(INSERT_COLUMNS)}) VALUES %s",
+            rows, page_size=1000
+        )
+    else:
+        cursor.executemany(
+            f"INSERT INTO llm_error_analysis ({', '.join(INSERT_COLUMNS)}) "
+            f"VALUES ({', '.join('%s' for _ in INSERT_COLUMNS)})",
+            rows
+        )
+    cursor.close()
+    conn.commit()
@@ -0,0 +1,126 @@
+"""
+Bootstrap Confidence Intervals for LLM Averages
+"""
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+from aggregator import ROW_SCORE_KEYS
+from config import BOOTSTRAP_RESAMPLES, BOOTSTRAP_CONFIDENCE, BOOTSTRAP_SEED
+
+
+# Upper bound of resamples x rows drawn at once (bounds memory per batch)
+BATCH_CELLS = 4_000_000
+MAX_BATCH = 256
+
+_worker_scores = None
+
+
+def _init_worker(scores: np.ndarray):
+    global _worker_scores
+    _worker_scores = scores
+
+
+def resample_means(scores: np.ndarray, seed: np.random.SeedSequence, count: int) -> np.ndarray:
+    """
+    Means of `count` bootstrap resamples of the rows
+
+    Each resample draws as many rows as there are, with replacement; all LLMs
+    of a drawn row are kept together, so the resamples are paired. The draws
+    are turned into per-row counts and applied to every LLM and criterion
+    with one matrix product.
+
+    Args:
+        scores: Array of shape (rows, llms, len(ROW_SCORE_KEYS))
+        seed: Seed of this batch
+        count: Number of resamples
+
+    Returns:
+        Array of shape (count, llms, len(ROW_SCORE_KEYS))
+    """
+    rows = len(scores)
+    rng = np.random.default_rng(seed)
+    draws = rng.integers(0, rows, size=(count, rows)) + (np.arange(count) * rows)[:, None]
+    weights = np.bincount(draws.ravel(), minlength=count * rows).reshape(count, rows)
+    return (weights @ scores.reshape(rows, -1) / rows).reshape(count, *scores.shape[1:])
+
+
+def _worker_resample(seed: np.random.SeedSequence, count: int) -> np.ndarray:
+    return resample_means(_worker_scores, seed, count)
+
+
+def bootstrap(scores: np.ndarray, llm_names: List[str], resamples: int = BOOTSTRAP_RESAMPLES,
+              confidence: float = BOOTSTRAP_CONFIDENCE, seed: int = BOOTSTRAP_SEED,
+              workers: int = 1, criteria: List[str] = None) -> Dict[str, Any]:
+    """
+    Percentile bootstrap over the evaluated rows (errors)
+
+    Resamples are drawn in fixed-size batches with one child seed each, so
+    the intervals depend only on the scores and `seed`, not on `workers`.
+
+    Args:
+        scores: Per-row scores, shape (rows, len(llm_names), len(ROW_SCORE_KEYS))
+            (see BreakdownAggregator.row_score_matrix)
+        llm_names: LLMs of the second axis
+        resamples: Number of bootstrap resamples
+        confidence: Coverage of the intervals, e.g. 0.95
+        seed: Random seed
+        workers: Processes drawing resamples (1 = in this process)
+        criteria: Criteria scored in the run (default: all); the others
+            (weight 0) get None instead of an interval
+
+    Returns:
+        Dictionary with per-LLM intervals of the total and each criterion,
+        the probability of each LLM being best, and pairwise win
+        probabilities (share of resamples in which one LLM's average is
+        higher than another's, ties counting half)
+    """
+    rows = len(scores)
+    if rows < 2:
+        raise ValueError(f"Bootstrap needs at least 2 rows, got {rows}")
+
+    batch = max(1, min(MAX_BATCH, BATCH_CELLS // rows))
+    counts = [min(batch, resamples - start) for start in range(0, resamples, batch)]
+    seeds = np.random.SeedSequence(seed).spawn(len(counts))
+
+    if workers > 1 and len(counts) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(counts)), initializer=_init_worker,
+                                 initargs=(scores,)) as pool:
+            means = np.concatenate(list(pool.map(_worker_resample, seeds, counts)))
+    else:
+        means = np.concatenate([resample_means(scores, s, c) for s, c in zip(seeds, counts)])
+
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(means, [tail, 100 - tail], axis=0)
+
+    total_index = ROW_SCORE_KEYS.index('total')
+    totals = means[:, :, total_index]
+    # Ties go to the first LLM, as in the overall ranking
+    best = np.bincount(np.argmax(totals, axis=1), minlength=len(llm_names)) / resamples
+    higher = (totals[:, :, None] > totals[:, None, :]).mean(axis=0)
+    ties = (totals[:, :, None] == totals[:, None, :]).mean(axis=0)
+    win_probabilities = higher + ties / 2
+
+    llms = {}
+    for i, llm_name in enumerate(llm_names):
+        llms[llm_name] = {
+            'interval': [float(low[i, total_index]), float(high[i, total_index])],
+            'criterion_intervals': {
+                key: [float(low[i, k]), float(high[i, k])] if criteria is None or key in criteria else None
+                for k, key in enumerate(ROW_SCORE_KEYS) if key != 'total'
+            },
+            'best_probability': float(best[i])
+        }
+
+    return {
+        'method': 'percentile bootstrap over errors',
+        'resamples': resamples,
+        'confidence': confidence,
+        'seed': seed,
+        'rows': rows,
+        'llms': llms,
+        'win_probabilities': {
+            a: {b: float(win_probabilities[i, j]) for j, b in enumerate(llm_names) if j != i}
+            for i, a in enumerate(llm_names)
+        }
+    }
@@ -3,9 +3,30 @@ LLM Evaluation Configuration
 """
 
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+
+def _load_dotenv():
+    """
+    Load the nearest .env file, searching upwards from this directory
+
+    Same lookup as python-dotenv's load_dotenv(), but the package is only
+    imported when there is a file to load, so short commands that run
+    without one start faster.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, '.env')
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return
+        directory = parent
+
+
+_load_dotenv()
 
 # Database Configuration
 DB_CONFIG = {
@@ -16,6 +37,71 @@ DB_CONFIG = {
     'password': os.getenv('DB_PASSWORD', 'postgres')
 }
 
+# Connection pool shared by all evaluations in a process (see db_pool.py)
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', '0'))
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', '10'))
+# Seconds to wait for a free connection when all DB_POOL_MAX are in use
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+# Idle seconds after which a pooled connection is checked before reuse
+DB_POOL_HEALTH_CHECK = float(os.getenv('DB_POOL_HEALTH_CHECK', '30'))
+# Server-side limit per statement in milliseconds (0 = no limit)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '600000'))
+
+# Rows fetched per round trip by the streaming (server-side cursor) mode
+STREAM_ITERSIZE = int(os.getenv('EVAL_ITERSIZE', '2000'))
+
+# Rows per chunk sent to each scoring worker process (--workers N)
+WORKER_CHUNK_SIZE = int(os.getenv('EVAL_CHUNK_SIZE', '500'))
+
+# Chunks buffered between the fetch, score and write stages (--async)
+ASYNC_QUEUE_SIZE = int(os.getenv('EVAL_QUEUE_SIZE', '4'))
+
+# Rows per INSERT when writing per-response scores to evaluation_scores
+RESULTS_PAGE_SIZE = int(os.getenv('EVAL_RESULTS_PAGE_SIZE', '1000'))
+
+# Persistent cache of extracted features (reused across runs)
+FEATURE_CACHE_PATH = os.getenv('EVAL_FEATURE_CACHE', 'feature_cache.sqlite')
+
+# Rows per row group / record batch of a columnar snapshot (snapshot.py)
+SNAPSHOT_CHUNK_SIZE = int(os.getenv('EVAL_SNAPSHOT_CHUNK_SIZE', '10000'))
+
+# Bootstrap resamples of the per-error scores for confidence intervals (0 = off)
+BOOTSTRAP_RESAMPLES = int(os.getenv('EVAL_BOOTSTRAP_RESAMPLES', '2000'))
+BOOTSTRAP_CONFIDENCE = float(os.getenv('EVAL_BOOTSTRAP_CONFIDENCE', '0.95'))
+# Fixed seed, so reruns over the same data report the same intervals
+BOOTSTRAP_SEED = int(os.getenv('EVAL_BOOTSTRAP_SEED', '42'))
+
+# Score speed by this response time quantile of each LLM (e.g. 0.95)
+# instead of averaging the per-response speed points (empty = average)
+SPEED_QUANTILE = float(os.getenv('EVAL_SPEED_QUANTILE')) if os.getenv('EVAL_SPEED_QUANTILE') else None
+
+# Local scoring service (python main.py serve, see service.py)
+SERVICE_HOST = os.getenv('EVAL_SERVICE_HOST', '127.0.0.1')
+SERVICE_PORT = int(os.getenv('EVAL_SERVICE_PORT', '8765'))
+# Largest accepted request body in bytes
+SERVICE_MAX_BODY = int(os.getenv('EVAL_SERVICE_MAX_BODY', str(16 * 2**20)))
+
+# Continuous evaluation (python main.py watch, see watcher.py); the channel
+# must match src/database/upgrade-evaluation-notify.sql
+WATCH_CHANNEL = os.getenv('EVAL_WATCH_CHANNEL', 'llm_responses_changed')
+# Longest a notified change waits for its micro-batch, in seconds
+WATCH_MAX_DELAY = float(os.getenv('EVAL_WATCH_MAX_DELAY', '1.0'))
+# Rows that trigger a micro-batch without waiting
+WATCH_BATCH_SIZE = int(os.getenv('EVAL_WATCH_BATCH_SIZE', '500'))
+
+# Near-duplicate responses (python duplicates.py): estimated Jaccard
+# similarity of word shingles at or above which two texts are grouped
+DEDUP_THRESHOLD = float(os.getenv('EVAL_DEDUP_THRESHOLD', '0.8'))
+# MinHash permutations per text (signature length) and words per shingle
+DEDUP_NUM_PERM = int(os.getenv('EVAL_DEDUP_NUM_PERM', '128'))
+DEDUP_SHINGLE_SIZE = int(os.getenv('EVAL_DEDUP_SHINGLE_SIZE', '3'))
+# Distinct texts whose features `evaluate --dedup` keeps (least recently
+# used are dropped first, so --stream memory stays bounded)
+DEDUP_CACHE_SIZE = int(os.getenv('EVAL_DEDUP_CACHE_SIZE', '50000'))
+
+# Running aggregates and per-row scores for incremental evaluation
+EVAL_STATE_PATH = os.getenv('EVAL_STATE_PATH', 'evaluation_state.sqlite')
+
 # LLM Names
 LLM_NAMES = [
     'groq',
@@ -57,6 +143,9 @@ TECHNICAL_KEYWORDS = [
     'sorgu', 'kilitlenme', 'kısıt', 'enjeksiyon', 'şifreleme', 'sürüm'
 ]
 
+# Error Keywords
+ERROR_KEYWORDS = ['hata', 'error', 'kod']
+
 # Solution Keywords
 SOLUTION_KEYWORDS = [
     # English
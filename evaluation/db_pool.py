@@ -0,0 +1,233 @@
+"""
+Pooled PostgreSQL Connections
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.pool import PoolError
+from config import (
+    DB_CONFIG, DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT, DB_POOL_HEALTH_CHECK,
+    DB_STATEMENT_TIMEOUT_MS
+)
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of PostgreSQL connections built on DB_CONFIG
+
+    - At most `maxconn` connections are open; when all are in use getconn()
+      waits up to `timeout` seconds for one to be returned instead of
+      opening more, so concurrent jobs cannot exhaust `max_connections`.
+    - Connections idle for longer than `health_check` seconds are pinged
+      before reuse; closed or broken ones are replaced transparently.
+    - Every connection runs with `statement_timeout` (0 = no limit).
+    - Returned connections are rolled back, so uncommitted work never leaks
+      into the next borrower.
+    """
+
+    def __init__(self, minconn: int = DB_POOL_MIN, maxconn: int = DB_POOL_MAX,
+                 timeout: float = DB_POOL_TIMEOUT, health_check: float = DB_POOL_HEALTH_CHECK,
+                 statement_timeout_ms: int = DB_STATEMENT_TIMEOUT_MS, db_config: Dict[str, Any] = None):
+        """
+        Args:
+            minconn: Connections opened up front and kept idle
+            maxconn: Upper bound of open connections
+            timeout: Seconds getconn() waits for a free connection
+            health_check: Idle seconds after which a connection is pinged before reuse
+            statement_timeout_ms: Server-side statement timeout (0 = no limit)
+            db_config: psycopg2.connect arguments (default: DB_CONFIG)
+        """
+        if maxconn < 1 or minconn > maxconn:
+            raise ValueError(f"Invalid pool size: min {minconn}, max {maxconn}")
+
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.health_check = health_check
+        self.db_config = dict(db_config or DB_CONFIG)
+        if statement_timeout_ms:
+            self.db_config['options'] = f"-c statement_timeout={int(statement_timeout_ms)}"
+
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self._idle: List[Tuple[Any, float]] = []
+        self._opened = 0
+        self._closed = False
+        self._lock = threading.Condition()
+
+        for _ in range(minconn):
+            self._opened += 1
+            self._idle.append((self._connect(), time.monotonic()))
+
+    def _connect(self):
+        self.created += 1
+        return psycopg2.connect(**self.db_config)
+
+    def _is_healthy(self, conn, idle_since: float) -> bool:
+        """Whether an idle connection can be handed out"""
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < self.health_check:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _discard(self, conn):
+        self._close(conn)
+        with self._lock:
+            self._opened -= 1
+            self.discarded += 1
+            self._lock.notify_all()
+
+    def getconn(self):
+        """
+        Borrow a connection, waiting if all `maxconn` are in use
+
+        Returns:
+            psycopg2 connection; hand it back with putconn()
+
+        Raises:
+            PoolError: No connection became free within `timeout` seconds
+        """
+        return self.getconns(1)[0]
+
+    def getconns(self, count: int) -> List[Any]:
+        """
+        Borrow `count` connections at once
+
+        A job needing several connections gets all of them or waits holding
+        none, so concurrent jobs cannot deadlock on each other's halves.
+
+        Returns:
+            List of psycopg2 connections; hand each back with putconn()
+
+        Raises:
+            PoolError: They did not become free within `timeout` seconds
+        """
+        if not 1 <= count <= self.maxconn:
+            raise ValueError(f"Cannot borrow {count} connections from a pool of {self.maxconn}")
+        deadline = time.monotonic() + self.timeout
+
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+                if len(self._idle) + self.maxconn - self._opened >= count:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._lock.wait(remaining):
+                    raise PoolError(
+                        f"No database connection free within {self.timeout}s "
+                        f"({self.maxconn} in use)"
+                    )
+            reused = [self._idle.pop() for _ in range(min(count, len(self._idle)))]
+            self._opened += count - len(reused)
+
+        # Slots are reserved; connect and ping outside the lock
+        conns = []
+        try:
+            for conn, idle_since in reused:
+                if self._is_healthy(conn, idle_since):
+                    self.reused += 1
+                    conns.append(conn)
+                else:
+                    self._close(conn)
+                    self.discarded += 1
+                    conns.append(self._connect())
+            while len(conns) < count:
+                conns.append(self._connect())
+        except Exception:
+            for conn in conns:
+                self.putconn(conn)
+            with self._lock:
+                self._opened -= count - len(conns)
+                self._lock.notify_all()
+            raise
+        return conns
+
+    def putconn(self, conn, close: bool = False):
+        """
+        Return a borrowed connection
+
+        Args:
+            conn: Connection from getconn()
+            close: Close it instead of keeping it for reuse
+        """
+        if not close and not conn.closed:
+            try:
+                if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                close = True
+
+        if close or conn.closed or self._closed:
+            self._discard(conn)
+            return
+
+        with self._lock:
+            self._idle.append((conn, time.monotonic()))
+            self._lock.notify_all()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Borrow a connection for the duration of a with block"""
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def closeall(self):
+        """Close idle connections; borrowed ones are closed when returned"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._lock.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Process-wide pool shared by every evaluator and DB helper
+
+    Forked worker processes get their own pool instead of reusing the
+    parent's sockets.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ConnectionPool()
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def close_pool():
+    """Close the shared pool (a later get_pool() opens a new one)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
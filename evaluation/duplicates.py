@@ -0,0 +1,500 @@
+"""
+Duplicate and Near-Duplicate Responses: MinHash Signatures and LSH
+
+    python duplicates.py
+    python duplicates.py --threshold 0.9 --top 20
+    python duplicates.py --snapshot llm_error_analysis.parquet
+
+Finds responses that repeat the same text (exact duplicates) or nearly the
+same text (templated answers that only differ in a few words) across errors
+and LLMs, without comparing every pair of responses:
+
+1. Identical texts are merged by hash first; only distinct texts go on.
+2. Each distinct text becomes a MinHash signature over its word shingles
+   (`shingle_size` consecutive lowercase, whitespace-separated words).
+   Two signatures agree in a position with probability equal to the
+   Jaccard similarity of the two shingle sets.
+3. Signatures are cut into bands (LSH). Texts sharing a band land in the
+   same bucket and become candidates; band count and width are chosen so
+   that pairs around `threshold` collide and dissimilar pairs rarely do.
+4. Candidates whose estimated similarity reaches `threshold` are joined
+   (union-find). A bucket keeps only one representative per group it has
+   seen, so large groups of templated answers cost one comparison per
+   text and band instead of one per pair.
+
+Groups are chained: if A is similar to B and B to C, all three share a
+group even when A and C are below `threshold`. Each group reports the
+lowest similarity among the links that joined it (`min_link_similarity`),
+not a similarity between all of its texts.
+
+Empty and failed ('Error: ...') responses are not compared. A column read
+by several LLMs (openrouter_llama and openrouter_mistral share
+openrouter_response) counts once per row.
+"""
+
+import argparse
+import hashlib
+import json
+import time
+import zlib
+import numpy as np
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from evaluator import LLM_COLUMNS, ResponseRow
+from config import DEDUP_THRESHOLD, DEDUP_NUM_PERM, DEDUP_SHINGLE_SIZE
+
+
+# Permutations of 32-bit shingle hashes by multiply-add-shift:
+# h(x) = ((a * x + b) mod 2^64) >> 32 with random odd a, which uint64
+# arithmetic computes without a modulo; the shift keeps the order, so it
+# is applied to the minimum only
+HASH_SHIFT = np.uint64(32)
+HASH_MASK = np.uint64(0xFFFFFFFF)
+# Multiplier combining the word hashes of a shingle (FNV prime)
+SHINGLE_BASE = np.uint64(0x01000193)
+# Cached word hashes per MinHasher before the cache is cleared
+WORD_CACHE_SIZE = 1_000_000
+
+# Weight of false positives when choosing the LSH bands: candidates are
+# verified against the threshold, so a false positive costs a comparison
+# while a false negative loses a pair
+FALSE_POSITIVE_WEIGHT = 0.1
+
+# Row ids listed per group in the report
+GROUP_ROW_IDS = 20
+# Characters of the first text shown per group
+SAMPLE_LENGTH = 160
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Band count and rows per band for a similarity threshold
+
+    Pairs with similarity s share at least one band with probability
+    1 - (1 - s^rows)^bands. The split minimizing the false positive area
+    below the threshold (weighted by FALSE_POSITIVE_WEIGHT) plus the false
+    negative area above it is chosen.
+
+    Args:
+        threshold: Similarity at which texts are grouped
+        num_perm: Signature length (bands * rows <= num_perm)
+
+    Returns:
+        (bands, rows)
+    """
+    similarity = np.linspace(0.0, 1.0, 1001)
+    below = similarity < threshold
+    best, best_error = (1, num_perm), None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            collide = 1.0 - (1.0 - similarity ** rows) ** bands
+            error = (FALSE_POSITIVE_WEIGHT * collide[below].sum()
+                     + (1.0 - FALSE_POSITIVE_WEIGHT) * (1.0 - collide[~below]).sum())
+            if best_error is None or error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    """MinHash signatures of word shingle sets"""
+
+    __slots__ = ('num_perm', 'shingle_size', '_a', '_b', '_word_hashes')
+
+    def __init__(self, num_perm: int = DEDUP_NUM_PERM, shingle_size: int = DEDUP_SHINGLE_SIZE, seed: int = 1):
+        """
+        Args:
+            num_perm: Signature length
+            shingle_size: Words per shingle
+            seed: Seed of the permutations (fixed, so reruns group the same texts)
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # One permutation per row
+        self._a = (rng.integers(0, 1 << 64, num_perm, dtype=np.uint64, endpoint=False) | np.uint64(1))[:, None]
+        self._b = rng.integers(0, 1 << 64, num_perm, dtype=np.uint64, endpoint=False)[:, None]
+        # Word -> CRC-32; responses share most of their vocabulary
+        self._word_hashes: Dict[str, int] = {}
+
+    def shingles(self, text: str) -> np.ndarray:
+        """
+        Distinct 32-bit hashes of the word shingles of a text
+
+        Texts shorter than shingle_size words are one shingle.
+        """
+        words = text.lower().split()
+        word_hashes = self._word_hashes
+        if len(word_hashes) > WORD_CACHE_SIZE:
+            word_hashes.clear()
+        for word in set(words).difference(word_hashes):
+            word_hashes[word] = zlib.crc32(word.encode('utf-8'))
+        hashes = np.fromiter(map(word_hashes.__getitem__, words), dtype=np.uint64, count=len(words))
+        size = min(self.shingle_size, len(words))
+        if not size:
+            return hashes
+
+        count = len(words) - size + 1
+        combined = np.zeros(count, dtype=np.uint64)
+        for offset in range(size):
+            combined = (combined * SHINGLE_BASE + hashes[offset:offset + count]) & HASH_MASK
+        # Sorted distinct values (cheaper than np.unique for arrays this small)
+        combined.sort()
+        return combined[np.concatenate(([True], combined[1:] != combined[:-1]))]
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        MinHash signature of a text
+
+        Returns:
+            uint32 array of num_perm values (None for texts without words)
+        """
+        shingles = self.shingles(text)
+        if not len(shingles):
+            return None
+        permuted = self._a * shingles
+        permuted += self._b
+        return (permuted.min(axis=1) >> HASH_SHIFT).astype(np.uint32)
+
+
+class DuplicateIndex:
+    """
+    Groups of identical and similar texts, built one text at a time
+
+    Texts get ids in order of first appearance; adding a text again returns
+    its id. Memory per distinct text is its signature (4 * num_perm bytes)
+    plus one bucket key per band.
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, num_perm: int = DEDUP_NUM_PERM,
+                 shingle_size: int = DEDUP_SHINGLE_SIZE):
+        """
+        Args:
+            threshold: Estimated Jaccard similarity at which texts are grouped
+            num_perm: MinHash signature length
+            shingle_size: Words per shingle
+        """
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        # Similar texts agree in at least this many signature positions
+        self._min_matches = int(np.ceil(threshold * num_perm - 1e-9))
+
+        self._ids: Dict[bytes, int] = {}
+        self.signatures: List[Optional[np.ndarray]] = []
+        self._parent: List[int] = []
+        # Group root -> lowest similarity of the links that joined the group
+        self._link_similarity: Dict[int, float] = {}
+        # One dict per band: band values -> group representatives seen in the bucket
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self.comparisons = 0
+
+    def __len__(self) -> int:
+        """Number of distinct texts"""
+        return len(self.signatures)
+
+    def add(self, text: str) -> int:
+        """
+        Add a text and join it to the groups of similar texts
+
+        Returns:
+            Id of the text (shared by identical texts)
+        """
+        key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+        text_id = self._ids.get(key)
+        if text_id is not None:
+            return text_id
+
+        text_id = len(self.signatures)
+        self._ids[key] = text_id
+        signature = self.hasher.signature(text)
+        self.signatures.append(signature)
+        self._parent.append(text_id)
+        if signature is not None:
+            self._insert(text_id, signature)
+        return text_id
+
+    def _insert(self, text_id: int, signature: np.ndarray):
+        """Compare a new text with the representatives of its buckets"""
+        for band, bucket in enumerate(self._buckets):
+            key = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            representatives = bucket.setdefault(key, [])
+            joined = False
+            for representative in representatives:
+                if self.find(representative) == self.find(text_id):
+                    joined = True
+                    continue
+                self.comparisons += 1
+                matches = np.count_nonzero(self.signatures[representative] == signature)
+                if matches >= self._min_matches:
+                    self._join(text_id, representative, matches / len(signature))
+                    joined = True
+            if not joined:
+                representatives.append(text_id)
+
+    def _join(self, first: int, second: int, similarity: float):
+        """Merge the groups of two texts linked with the given similarity"""
+        root, other = self.find(second), self.find(first)
+        self._parent[other] = root
+        self._link_similarity[root] = min(
+            self._link_similarity.get(root, 1.0), self._link_similarity.pop(other, 1.0), similarity
+        )
+
+    def link_similarity(self, text_id: int) -> float:
+        """
+        Lowest estimated similarity of the links that joined a text's group
+
+        Every link reached the threshold, but chained texts of the group
+        can be less similar to each other (1.0 for a text without links).
+        """
+        return self._link_similarity.get(self.find(text_id), 1.0)
+
+    def find(self, text_id: int) -> int:
+        """Group (root text id) of a text"""
+        parent = self._parent
+        while parent[text_id] != text_id:
+            parent[text_id] = parent[parent[text_id]]
+            text_id = parent[text_id]
+        return text_id
+
+    def similarity(self, first: int, second: int) -> float:
+        """Estimated Jaccard similarity of two texts (1.0 for a text with itself)"""
+        if first == second:
+            return 1.0
+        a, b = self.signatures[first], self.signatures[second]
+        if a is None or b is None:
+            return 0.0
+        return np.count_nonzero(a == b) / len(a)
+
+
+def response_sources(llm_names: List[str]) -> List[Tuple[str, ...]]:
+    """
+    LLMs grouped by the response column they read, in llm_names order
+
+    openrouter_llama and openrouter_mistral both read openrouter_response,
+    so their texts are one response per row, not two duplicates.
+    """
+    sources: Dict[int, List[str]] = {}
+    for llm_name in llm_names:
+        sources.setdefault(LLM_COLUMNS[llm_name][0], []).append(llm_name)
+    return [tuple(names) for names in sources.values()]
+
+
+def iter_responses(rows: Iterator[Tuple], llm_names: List[str]) -> Iterator[Tuple[int, str, Tuple[str, ...], str]]:
+    """
+    Responses of RESPONSES_QUERY rows or ResponseRows, one per source
+
+    Yields:
+        (row_id, error_code, llm_names of the source, text) for every response,
+        including empty and failed ones
+    """
+    sources = response_sources(llm_names)
+    for row in rows:
+        if isinstance(row, ResponseRow):
+            # Normalized storage holds one text per LLM
+            for llm_name in llm_names:
+                text, _ = row.responses.get(llm_name, (None, None))
+                yield row.id, row.error_code, (llm_name,), text
+        else:
+            for names in sources:
+                yield row[0], row[2], names, row[LLM_COLUMNS[names[0]][0]]
+
+
+def find_duplicates(responses: Iterator[Tuple[int, str, Tuple[str, ...], str]], llm_names: List[str],
+                    threshold: float = DEDUP_THRESHOLD, num_perm: int = DEDUP_NUM_PERM,
+                    shingle_size: int = DEDUP_SHINGLE_SIZE) -> Dict[str, Any]:
+    """
+    Group duplicate and near-duplicate responses
+
+    Args:
+        responses: (row_id, error_code, llm_names, text) as from iter_responses
+        llm_names: LLMs evaluated (order of the per-LLM report)
+        threshold: Estimated Jaccard similarity at which texts are grouped
+        num_perm: MinHash signature length
+        shingle_size: Words per shingle
+
+    Returns:
+        Report with totals, per-LLM duplicate shares and the groups (largest first);
+        a group of one distinct text is 'exact', otherwise 'near' (chained,
+        see DuplicateIndex.link_similarity)
+    """
+    index = DuplicateIndex(threshold, num_perm, shingle_size)
+    # Per compared response: text id, row id, error code, source
+    text_ids, row_ids, error_codes, response_llms = [], [], [], []
+    samples: Dict[int, str] = {}
+    skipped = 0
+
+    for row_id, error_code, names, text in responses:
+        if not text or text.startswith('Error:'):
+            skipped += 1
+            continue
+        text_id = index.add(text)
+        if text_id == len(samples):
+            samples[text_id] = text[:SAMPLE_LENGTH]
+        text_ids.append(text_id)
+        row_ids.append(row_id)
+        error_codes.append(error_code)
+        response_llms.append(names)
+
+    members: Dict[int, List[int]] = defaultdict(list)
+    for position, text_id in enumerate(text_ids):
+        members[index.find(text_id)].append(position)
+
+    llm_totals = Counter(llm_name for names in response_llms for llm_name in names)
+    llm_duplicated = Counter()
+    groups = []
+    for positions in members.values():
+        if len(positions) < 2:
+            continue
+        distinct = sorted({text_ids[position] for position in positions})
+        llms = Counter(llm_name for position in positions for llm_name in response_llms[position])
+        llm_duplicated.update(llms)
+        groups.append({
+            'kind': 'exact' if len(distinct) == 1 else 'near',
+            'responses': len(positions),
+            'distinct_texts': len(distinct),
+            'min_link_similarity': round(index.link_similarity(distinct[0]), 3),
+            'llms': {llm_name: llms[llm_name] for llm_name in llm_names if llms[llm_name]},
+            'error_codes': len({error_codes[position] for position in positions}),
+            'row_ids': sorted({row_ids[position] for position in positions})[:GROUP_ROW_IDS],
+            'sample': samples[distinct[0]]
+        })
+    groups.sort(key=lambda group: (-group['responses'], group['row_ids'][0]))
+
+    return {
+        'threshold': threshold,
+        'num_perm': num_perm,
+        'bands': index.bands,
+        'rows_per_band': index.rows,
+        'shingle_size': shingle_size,
+        'responses': len(text_ids),
+        'skipped': skipped,
+        'distinct_texts': len(index),
+        'comparisons': index.comparisons,
+        'exact_groups': sum(group['kind'] == 'exact' for group in groups),
+        'near_groups': sum(group['kind'] == 'near' for group in groups),
+        'duplicated_responses': sum(group['responses'] for group in groups),
+        'llms': {
+            llm_name: {
+                'responses': llm_totals[llm_name],
+                'duplicated': llm_duplicated[llm_name],
+                'share': llm_duplicated[llm_name] / llm_totals[llm_name] if llm_totals[llm_name] else 0.0
+            }
+            for llm_name in llm_names
+        },
+        'groups': groups
+    }
+
+
+def print_report(report: Dict[str, Any], elapsed: float, top: int = 10):
+    """Print totals, per-LLM duplicate shares and the largest groups"""
+    print("\n" + "="*70)
+    print("🧬 DUPLICATE RESPONSES")
+    print("="*70 + "\n")
+    print(f"   {report['responses']} responses ({report['skipped']} empty or failed skipped), "
+          f"{report['distinct_texts']} distinct texts")
+    print(f"   MinHash {report['num_perm']} × {report['shingle_size']}-word shingles, "
+          f"LSH {report['bands']} bands × {report['rows_per_band']} rows, threshold {report['threshold']:g}")
+    print(f"   {report['comparisons']} signature comparisons in {elapsed:.2f}s\n")
+    print(f"   Exact duplicate groups: {report['exact_groups']}")
+    print(f"   Near-duplicate groups:  {report['near_groups']}")
+    print(f"   Responses in a group:   {report['duplicated_responses']}\n")
+
+    print(f"   {'LLM'.ljust(22)} {'responses':>10} {'duplicated':>11} {'share':>7}")
+    for llm_name, stats in report['llms'].items():
+        print(f"   {llm_name.ljust(22)} {stats['responses']:>10} {stats['duplicated']:>11} {stats['share']:>7.1%}")
+
+    if report['groups'] and top:
+        print("\n   Largest groups:")
+        for group in report['groups'][:top]:
+            llms = ', '.join(f"{llm_name} {count}" for llm_name, count in group['llms'].items())
+            sample = ' '.join(group['sample'].split())[:70]
+            if group['kind'] == 'exact':
+                marker, texts = '🟰', "1 text"
+            else:
+                marker, texts = '≈ ', f"{group['distinct_texts']} texts (links ≥ {group['min_link_similarity']:.2f})"
+            print(f"   {marker} {group['responses']} responses, {texts}, "
+                  f"{group['error_codes']} error codes · {llms}")
+            print(f"      \"{sample}\"")
+    print("\n" + "="*70 + "\n")
+
+
+def _scan(args) -> Dict[str, Any]:
+    """Read responses from the database or a snapshot and group them"""
+    from evaluator import LLMEvaluator
+    from db_pool import close_pool
+
+    evaluator = LLMEvaluator(stream=True, snapshot_path=args.snapshot, normalized=args.normalized)
+    try:
+        if not args.snapshot:
+            evaluator.connect_db()
+        if args.normalized:
+            evaluator.llm_names = evaluator.stored_llm_names()
+        responses = iter_responses(evaluator.iter_rows(), evaluator.llm_names)
+        return find_duplicates(responses, evaluator.llm_names, args.threshold, args.num_perm, args.shingle_size)
+    finally:
+        evaluator.close_db()
+        evaluator.close_cache()
+        close_pool()
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Find duplicate and near-duplicate LLM responses")
+    parser.add_argument(
+        '--threshold', type=float, default=DEDUP_THRESHOLD,
+        help=f"Estimated Jaccard similarity at which responses are grouped (default: {DEDUP_THRESHOLD})"
+    )
+    parser.add_argument(
+        '--num-perm', type=int, default=DEDUP_NUM_PERM,
+        help=f"MinHash signature length (default: {DEDUP_NUM_PERM})"
+    )
+    parser.add_argument(
+        '--shingle-size', type=int, default=DEDUP_SHINGLE_SIZE,
+        help=f"Words per shingle (default: {DEDUP_SHINGLE_SIZE})"
+    )
+    parser.add_argument(
+        '--snapshot', metavar='PATH',
+        help="Read responses from a snapshot file instead of the database"
+    )
+    parser.add_argument(
+        '--normalized', action='store_true',
+        help="Read responses from the llm_responses table"
+    )
+    parser.add_argument(
+        '--top', type=int, default=10,
+        help="Largest groups to print (default: 10)"
+    )
+    parser.add_argument(
+        '--output', default='duplicates.json',
+        help="Report file (default: duplicates.json)"
+    )
+    args = parser.parse_args()
+    if args.snapshot and args.normalized:
+        parser.error("--snapshot cannot be combined with --normalized")
+    if not 0 < args.threshold <= 1:
+        parser.error("--threshold must be in (0, 1]")
+    if args.num_perm < 1 or args.shingle_size < 1:
+        parser.error("--num-perm and --shingle-size must be positive")
+    return args
+
+
+def main():
+    """Find duplicate responses and save the report"""
+    args = parse_args()
+
+    print("🔍 Grouping responses...")
+    start = time.perf_counter()
+    report = _scan(args)
+    elapsed = time.perf_counter() - start
+
+    print_report(report, elapsed, args.top)
+
+    report['scan_date'] = datetime.now().isoformat()
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"💾 Report saved to {args.output}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,138 +2,589 @@
 Main LLM Evaluation Engine
 """
 
-import psycopg2
-from typing import Dict, List, Any
-from feature_extractor import FeatureExtractor
+import hashlib
+import sys
+import numpy as np
+from collections import OrderedDict
+from functools import partial
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Dict, List, Any, Collection, Iterable, Iterator, Tuple, NamedTuple
+from feature_extractor import FeatureExtractor, Features
 from scorer import Scorer
-from config import DB_CONFIG, LLM_NAMES, WEIGHTS
+from aggregator import ScoreAggregator, BreakdownAggregator
+from feature_cache import FeatureCache
+from profiler import PROFILER
+from config import (
+    LLM_NAMES, WEIGHTS, STREAM_ITERSIZE, WORKER_CHUNK_SIZE, EVAL_STATE_PATH,
+    ASYNC_QUEUE_SIZE, BOOTSTRAP_RESAMPLES, SPEED_QUANTILE, DEDUP_CACHE_SIZE
+)
+
+# Modules only some modes need (the database driver, pyarrow, asyncio,
+# process pools, bootstrapping) are imported where they are used, so e.g.
+# an offline snapshot evaluation never loads psycopg2
+if TYPE_CHECKING:
+    from db_pool import ConnectionPool
+    from incremental import IncrementalState
+
+
+RESPONSES_COLUMNS = """
+    id,
+    error_category,
+    error_code,
+    error_message,
+    groq_response,
+    mistral_response,
+    cohere_response,
+    openrouter_response,
+    openrouter_hermes_response,
+    groq_response_time,
+    mistral_response_time,
+    cohere_response_time,
+    openrouter_response_time,
+    openrouter_hermes_response_time
+"""
+
+# Column names of a RESPONSES_QUERY row (row layout of snapshot reads)
+ROW_COLUMNS = [column.strip() for column in RESPONSES_COLUMNS.split(',')]
+
+RESPONSES_QUERY = f"""
+SELECT {RESPONSES_COLUMNS}
+FROM llm_error_analysis
+ORDER BY id
+"""
+
+# Pending entries of the change log of incremental evaluation, oldest
+# first (see src/database/upgrade-evaluation-incremental.sql)
+CHANGES_QUERY = """
+SELECT change_id, row_id
+FROM llm_responses_changes
+ORDER BY change_id
+"""
+
+# Change log entries applied to the incremental state
+DRAIN_CHANGES_QUERY = "DELETE FROM llm_responses_changes WHERE change_id = ANY(%s)"
+
+# Normalized storage (see src/database/upgrade-llm-responses.sql): one row
+# per stored response, ordered by error; errors without stored responses
+# still appear once with a NULL llm_name
+NORMALIZED_QUERY = """
+SELECT e.id, e.error_category, e.error_code, r.llm_name, r.response_text, r.response_time_ms
+FROM llm_error_analysis e
+LEFT JOIN llm_responses r ON r.error_id = e.id AND r.llm_name = ANY(%s)
+ORDER BY e.id
+"""
+
+# LLMs (of the given names) with at least one stored response text
+STORED_LLMS_QUERY = """
+SELECT wanted.llm_name
+FROM unnest(%s::text[]) AS wanted (llm_name)
+WHERE EXISTS (
+    SELECT 1 FROM llm_responses r
+    WHERE r.llm_name = wanted.llm_name AND r.response_text IS NOT NULL
+)
+"""
+
+# (text, response_time) column positions in a RESPONSES_QUERY row
+LLM_COLUMNS = {
+    'groq': (4, 9),
+    'mistral': (5, 10),
+    'cohere': (6, 11),
+    'openrouter_llama': (7, 12),
+    # OpenRouter Mistral (same as Llama in our schema)
+    'openrouter_mistral': (7, 12),
+    'openrouter_hermes': (8, 13),
+}
+
+# Wide response column of every LLM (response_features.response_column)
+LLM_RESPONSE_COLUMNS = {
+    llm_name: ROW_COLUMNS[text_index][:-len('_response')]
+    for llm_name, (text_index, _) in LLM_COLUMNS.items()
+}
+
+# Features computed by PostgreSQL (see sql_features.py): one row per stored
+# response column, ordered by error; errors without feature rows still
+# appear once with a NULL response_column
+SQL_FEATURES_QUERY = f"""
+SELECT e.id, e.error_category, e.error_code, f.response_column, f.response_time, f.is_error,
+       {', '.join('f.' + name for name in FeatureExtractor.FEATURE_NAMES)}
+FROM llm_error_analysis e
+LEFT JOIN response_features f ON f.error_id = e.id AND f.response_column = ANY(%s)
+ORDER BY e.id
+"""
+
+# Rows by id: rows whose features PostgreSQL has not computed, or rows named
+# by the change log (rows deleted since are missing)
+RESPONSES_BY_ID_QUERY = f"""
+SELECT {RESPONSES_COLUMNS}
+FROM llm_error_analysis
+WHERE id = ANY(%s)
+ORDER BY id
+"""
+
+# Tables written by ResultsStore (see src/database/create-evaluation-results.sql);
+# to_regclass returns NULL for a missing table
+RESULTS_TABLES = ['evaluation_runs', 'evaluation_scores']
+RESULTS_TABLES_QUERY = f"SELECT {', '.join(f'to_regclass({table!r})' for table in RESULTS_TABLES)}"
+
+# (label, criterion, maximum points) of the criterion lines in the run description
+DESCRIPTION_CRITERIA = [
+    ('Technical Accuracy', 'technical_accuracy', 25),
+    ('Solution Quality', 'solution_quality', 25),
+    ('Clarity', 'clarity', 20),
+    ('Conciseness', 'conciseness', 10),
+    ('Speed', 'speed', 10),
+    ('Reliability', 'reliability', 10),
+]
+
+
+class DatabaseSetupError(RuntimeError):
+    """A table the evaluation writes to has not been created"""
+
+
+class ResponseRow(NamedTuple):
+    """One error read from normalized storage"""
+    id: int
+    error_category: str
+    error_code: str
+    # llm_name -> (text, response_time_ms); LLMs without a stored response are absent
+    responses: Dict[str, Tuple[str, int]]
+
+
+class FeatureRow(NamedTuple):
+    """One error read from response_features"""
+    id: int
+    error_category: str
+    error_code: str
+    # response column -> (response_time, is_error, *features); missing columns are absent
+    responses: Dict[str, Tuple]
+
+
+class ResponseRecord:
+    """
+    One LLM response of a row
+
+    Slots instead of a per-response dict; the category and code strings are
+    interned, so the responses of all rows share one copy of each.
+    """
+
+    __slots__ = ('id', 'error_category', 'error_code', 'text', 'response_time', 'is_error')
+
+    def __init__(self, id: int, error_category: str, error_code: str, text: str, response_time: int):
+        self.id = id
+        self.error_category = error_category
+        self.error_code = error_code
+        self.text = text
+        self.response_time = response_time
+        self.is_error = text.startswith('Error:') if text else True
+
+
+def _intern(value: Any) -> Any:
+    """Interned copy of a string (other values unchanged)"""
+    return sys.intern(value) if type(value) is str else value
+
+
+class FeatureTable(NamedTuple):
+    """Columnar features of a chunk of rows, one entry per row and LLM"""
+    features: np.ndarray
+    times: np.ndarray
+    is_error: np.ndarray
+    llm_codes: np.ndarray
+    row_ids: np.ndarray
+    error_categories: List[str]
+    error_codes: List[str]
 
 
 class LLMEvaluator:
     """Evaluate and compare LLM performances"""
 
-    def __init__(self):
+    def __init__(self, stream: bool = False, itersize: int = STREAM_ITERSIZE,
+                 workers: int = 1, chunk_size: int = WORKER_CHUNK_SIZE,
+                 feature_cache_path: str = None, vectorized: bool = False,
+                 incremental: bool = False, full: bool = False, check: bool = False,
+                 state_path: str = EVAL_STATE_PATH, async_pipeline: bool = False,
+                 queue_size: int = ASYNC_QUEUE_SIZE, pool: 'ConnectionPool' = None,
+                 snapshot_path: str = None, normalized: bool = False, sql_features: bool = False,
+                 bootstrap_resamples: int = BOOTSTRAP_RESAMPLES, speed_quantile: float = SPEED_QUANTILE,
+                 dedup: bool = False, dedup_cache_size: int = DEDUP_CACHE_SIZE):
+        """
+        Args:
+            stream: Read rows through a server-side cursor and aggregate on the fly
+            itersize: Rows fetched per round trip in streaming mode
+            workers: Number of scoring processes (1 = score in this process)
+            chunk_size: Rows sent to a worker process at a time
+            feature_cache_path: SQLite feature cache file (None = no cache)
+            vectorized: Score `chunk_size` rows at a time with Scorer.score_batch
+            incremental: Only score rows added or changed since the last run
+            full: Rebuild the incremental state from scratch
+            check: Verify incremental results against a full evaluation
+            state_path: SQLite file holding the incremental state
+            async_pipeline: Fetch, score and write concurrently (asyncio pipeline)
+            queue_size: Chunks buffered between two stages of the async pipeline
+            pool: Connection pool to borrow from (default: the shared get_pool())
+            snapshot_path: Evaluate a snapshot file (see snapshot.py) offline
+                instead of the database
+            normalized: Read responses from the llm_responses table instead
+                of the wide per-LLM columns
+            sql_features: Score features computed by PostgreSQL (response_features,
+                see sql_features.py) instead of extracting them from the texts
+            bootstrap_resamples: Bootstrap resamples for confidence intervals
+                of the averages (0 = none)
+            speed_quantile: Score speed by this response time quantile per
+                LLM instead of the average speed points (None = average)
+            dedup: Extract the features of each distinct response text once
+                per run; identical texts (e.g. the openrouter_response column
+                read by two LLMs) reuse them
+            dedup_cache_size: Distinct texts whose features dedup keeps (the
+                least recently used are dropped)
+        """
         self.conn = None
+        self.write_conn = None
         self.extractor = FeatureExtractor()
         self.scorer = Scorer()
+        # Criteria with a non-zero weight and the features they read;
+        # no other feature is computed
+        self.weights = WEIGHTS
+        self.criteria = Scorer.active_criteria(self.weights)
+        self.required_features = Scorer.required_features(self.criteria)
+        # The async pipeline always reads through a server-side cursor
+        self.stream = stream or async_pipeline
+        self.itersize = itersize
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.feature_cache_path = feature_cache_path
+        self.feature_cache = FeatureCache(feature_cache_path) if feature_cache_path else None
+        self.vectorized = vectorized
+        self.incremental = incremental
+        self.full = full
+        self.check = check
+        self.results_store = None
+        self.breakdown = None
+        self.state_path = state_path
+        self.async_pipeline = async_pipeline
+        self.queue_size = queue_size
+        self.pool = pool
+        self.snapshot_path = snapshot_path
+        self.normalized = normalized
+        self.sql_features = sql_features
+        self.bootstrap_resamples = bootstrap_resamples
+        self.speed_quantile = speed_quantile
+        self.dedup = dedup
+        self.dedup_cache_size = dedup_cache_size
+        # Text hash -> required features of recently seen texts (dedup), least
+        # recently used first
+        self._text_features: 'OrderedDict[bytes, Features]' = OrderedDict()
+        self.reused_features = 0
+        self.dedup_extracted = 0
+        # LLMs evaluated in this run (normalized storage drops LLMs without responses)
+        self.llm_names = list(LLM_NAMES)
 
     def connect_db(self):
-        """Connect to PostgreSQL database"""
-        self.conn = psycopg2.connect(**DB_CONFIG)
+        """Borrow database connections from the connection pool"""
+        if self.pool is None:
+            from db_pool import get_pool
+            self.pool = get_pool()
+        if self.async_pipeline:
+            # Results are written while the reading cursor is still open
+            self.conn, self.write_conn = self.pool.getconns(2)
+        else:
+            self.conn = self.pool.getconn()
         print("✅ Database connected")
 
-    def close_db(self):
-        """Close database connection"""
+    def close_db(self, discard: bool = False):
+        """
+        Return database connections to the pool (uncommitted work is rolled back)
+
+        Args:
+            discard: Close them instead, e.g. after the server went away
+        """
+        if self.write_conn:
+            self._release(self.write_conn, discard)
+            self.write_conn = None
         if self.conn:
-            self.conn.close()
+            self._release(self.conn, discard)
+            self.conn = None
             print("✅ Database connection closed")
 
-    def fetch_all_responses(self) -> Dict[str, List[Dict[str, Any]]]:
+    def _release(self, conn, discard: bool = False):
+        # Connections assigned directly (not borrowed) are simply closed
+        if self.pool:
+            self.pool.putconn(conn, close=discard)
+        else:
+            conn.close()
+
+    def close_cache(self):
+        """Flush and close the feature cache"""
+        if self.feature_cache:
+            self.feature_cache.close()
+            self.feature_cache = None
+
+    @staticmethod
+    def _row_responses(row: Tuple, llm_names: List[str]) -> Iterator[Tuple[str, str, int]]:
         """
-        Fetch all LLM responses from database
+        (llm_name, text, response_time) of every LLM in a row, in llm_names order
+
+        Args:
+            row: RESPONSES_QUERY row or ResponseRow; a response missing from
+                a ResponseRow reads like a NULL column
+        """
+        if isinstance(row, ResponseRow):
+            for llm_name in llm_names:
+                text, response_time = row.responses.get(llm_name, (None, None))
+                yield llm_name, text, response_time
+        else:
+            for llm_name in llm_names:
+                text_index, time_index = LLM_COLUMNS[llm_name]
+                yield llm_name, row[text_index], row[time_index]
+
+    @staticmethod
+    def _unpack_row(row: Tuple, llm_names: List[str] = LLM_NAMES) -> List[Tuple[str, ResponseRecord]]:
+        """
+        Split one llm_error_analysis row into per-LLM response records
+
+        Args:
+            row: Row selected by RESPONSES_QUERY or a ResponseRow
+            llm_names: LLMs to unpack
 
         Returns:
-            Dictionary mapping LLM names to list of response objects
+            List of (llm_name, response_obj) in llm_names order
         """
-        cursor = self.conn.cursor()
+        id, error_category, error_code = row[0], _intern(row[1]), _intern(row[2])
+
+        return [
+            (llm_name, ResponseRecord(id, error_category, error_code, text, response_time))
+            for llm_name, text, response_time in LLMEvaluator._row_responses(row, llm_names)
+        ]
+
+    @staticmethod
+    def _group_responses(rows: Iterator[Tuple]) -> Iterator[ResponseRow]:
+        """Fold NORMALIZED_QUERY rows into one ResponseRow per error"""
+        current = None
+        for row_id, error_category, error_code, llm_name, text, response_time in rows:
+            if current is None or current.id != row_id:
+                if current is not None:
+                    yield current
+                current = ResponseRow(row_id, error_category, error_code, {})
+            if llm_name is not None:
+                current.responses[llm_name] = (text, response_time)
+        if current is not None:
+            yield current
 
-        query = """
-        SELECT
-            id,
-            error_category,
-            error_code,
-            error_message,
-            groq_response,
-            mistral_response,
-            cohere_response,
-            openrouter_response,
-            openrouter_hermes_response,
-            groq_response_time,
-            mistral_response_time,
-            cohere_response_time,
-            openrouter_response_time,
-            openrouter_hermes_response_time
-        FROM llm_error_analysis
-        ORDER BY id
-        """
-
-        cursor.execute(query)
-        rows = cursor.fetchall()
+    @staticmethod
+    def _group_feature_rows(rows: Iterator[Tuple]) -> Iterator[FeatureRow]:
+        """Fold SQL_FEATURES_QUERY rows into one FeatureRow per error"""
+        current = None
+        for row_id, error_category, error_code, response_column, *values in rows:
+            if current is None or current.id != row_id:
+                if current is not None:
+                    yield current
+                current = FeatureRow(row_id, error_category, error_code, {})
+            if response_column is not None:
+                current.responses[response_column] = values
+        if current is not None:
+            yield current
+
+    def stored_llm_names(self) -> List[str]:
+        """
+        LLMs of config.LLM_NAMES with responses in llm_responses
+
+        Returns:
+            LLM names in LLM_NAMES order
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(STORED_LLMS_QUERY, (LLM_NAMES,))
+        stored = {row[0] for row in cursor.fetchall()}
         cursor.close()
 
+        for llm_name in LLM_NAMES:
+            if llm_name not in stored:
+                print(f"   ⚠️  No stored responses for {llm_name}, skipped")
+        if not stored:
+            raise ValueError("llm_responses holds no responses for config.LLM_NAMES")
+        return [llm_name for llm_name in LLM_NAMES if llm_name in stored]
+
+    def fetch_all_responses(self) -> Dict[str, List[ResponseRecord]]:
+        """
+        Fetch all LLM responses from database
+
+        Returns:
+            Dictionary mapping LLM names to list of response records
+        """
+        rows = list(self.iter_rows())
+
         # Organize by LLM
-        llm_responses = {llm: [] for llm in LLM_NAMES}
+        llm_responses = {llm: [] for llm in self.llm_names}
+
+        with PROFILER.stage('unpack', len(rows)):
+            for row in rows:
+                for llm_name, response_obj in self._unpack_row(row, self.llm_names):
+                    llm_responses[llm_name].append(response_obj)
 
-        for row in rows:
-            (id, error_category, error_code, error_message,
-             groq_resp, mistral_resp, cohere_resp,
-             openrouter_resp, openrouter_hermes_resp,
-             groq_time, mistral_time, cohere_time,
-             openrouter_time, openrouter_hermes_time) = row
-
-            # Groq
-            llm_responses['groq'].append({
-                'id': id,
-                'error_category': error_category,
-                'error_code': error_code,
-                'text': groq_resp,
-                'response_time': groq_time,
-                'is_error': groq_resp.startswith('Error:') if groq_resp else True
-            })
-
-            # Mistral
-            llm_responses['mistral'].append({
-                'id': id,
-                'error_category': error_category,
-                'error_code': error_code,
-                'text': mistral_resp,
-                'response_time': mistral_time,
-                'is_error': mistral_resp.startswith('Error:') if mistral_resp else True
-            })
-
-            # Cohere
-            llm_responses['cohere'].append({
-                'id': id,
-                'error_category': error_category,
-                'error_code': error_code,
-                'text': cohere_resp,
-                'response_time': cohere_time,
-                'is_error': cohere_resp.startswith('Error:') if cohere_resp else True
-            })
-
-            # OpenRouter Llama
-            llm_responses['openrouter_llama'].append({
-                'id': id,
-                'error_category': error_category,
-                'error_code': error_code,
-                'text': openrouter_resp,
-                'response_time': openrouter_time,
-                'is_error': openrouter_resp.startswith('Error:') if openrouter_resp else True
-            })
-
-            # OpenRouter Mistral (same as Llama in our schema)
-            llm_responses['openrouter_mistral'].append({
-                'id': id,
-                'error_category': error_category,
-                'error_code': error_code,
-                'text': openrouter_resp,  # Same column
-                'response_time': openrouter_time,
-                'is_error': openrouter_resp.startswith('Error:') if openrouter_resp else True
-            })
-
-            # OpenRouter Hermes
-            llm_responses['openrouter_hermes'].append({
-                'id': id,
-                'error_category': error_category,
-                'error_code': error_code,
-                'text': openrouter_hermes_resp,
-                'response_time': openrouter_hermes_time,
-                'is_error': openrouter_hermes_resp.startswith('Error:') if openrouter_hermes_resp else True
-            })
-
-        print(f"📊 Fetched {len(rows)} responses for {len(LLM_NAMES)} LLMs")
         return llm_responses
 
+    def iter_rows(self, query: str = RESPONSES_QUERY, params: Tuple = None) -> Iterator[Tuple]:
+        """
+        Iterate over raw llm_error_analysis rows
+
+        In streaming mode rows come from a server-side cursor `itersize` at a
+        time; otherwise the whole result set is fetched at once. With
+        normalized storage the responses of each error are read from
+        llm_responses and yielded as one ResponseRow; SQL_FEATURES_QUERY
+        rows are folded into one FeatureRow per error.
+
+        Args:
+            query: Query selecting RESPONSES_COLUMNS first
+            params: Query parameters
+
+        Yields:
+            Rows selected by `query` (ResponseRow with normalized storage,
+            FeatureRow for SQL_FEATURES_QUERY)
+        """
+        if self.snapshot_path:
+            if query is not RESPONSES_QUERY:
+                raise ValueError("Snapshots only support full evaluations, not incremental ones")
+            row_count = 0
+            for chunk in PROFILER.iterate('snapshot.read', self.iter_snapshot()):
+                row_count += len(chunk)
+                yield from chunk
+            print(f"📊 Read {row_count} responses for {len(self.llm_names)} LLMs from {self.snapshot_path}")
+            return
+
+        if self.normalized:
+            if query is not RESPONSES_QUERY:
+                raise ValueError("Normalized storage only supports full evaluations, not incremental ones")
+            query, params = NORMALIZED_QUERY, (self.llm_names,)
+
+        if self.stream:
+            cursor = self.conn.cursor(name='llm_evaluation_stream')
+            cursor.itersize = self.itersize
+        else:
+            cursor = self.conn.cursor()
+        row_count = 0
+
+        try:
+            with PROFILER.stage('db.execute'):
+                cursor.execute(query, params)
+            if self.stream:
+                source = PROFILER.iterate('db.fetch', cursor)
+            else:
+                with PROFILER.stage('db.fetch') as stage:
+                    source = cursor.fetchall()
+                    stage.rows = len(source)
+            if self.normalized:
+                source = self._group_responses(source)
+            elif query is SQL_FEATURES_QUERY:
+                source = self._group_feature_rows(source)
+            for row in source:
+                row_count += 1
+                yield row
+        finally:
+            cursor.close()
+
+        verb = "Streamed" if self.stream else "Fetched"
+        print(f"📊 {verb} {row_count} responses for {len(self.llm_names)} LLMs")
+
+    def iter_snapshot(self, chunk_size: int = None) -> Iterator[List[Tuple]]:
+        """
+        Read the snapshot file in chunks of RESPONSES_QUERY-shaped rows
+
+        Only the columns in ROW_COLUMNS are decoded (error_message is not
+        part of a snapshot and reads as None).
+
+        Args:
+            chunk_size: Rows per chunk (default: itersize)
+
+        Yields:
+            Lists of rows
+        """
+        from snapshot import SnapshotReader
+
+        reader = SnapshotReader(self.snapshot_path)
+        try:
+            yield from reader.iter_chunks(ROW_COLUMNS, chunk_size or self.itersize)
+        finally:
+            reader.close()
+
+    def stream_responses(self) -> Iterator[Tuple[str, ResponseRecord]]:
+        """
+        Stream LLM responses through a server-side cursor
+
+        Rows are fetched `itersize` at a time, so only one batch of rows is
+        held in memory.
+
+        Yields:
+            (llm_name, response_obj) pairs
+        """
+        for row in self.iter_rows():
+            yield from self._unpack_row(row, self.llm_names)
+
+    def _emit_score(self, row_id: int, error_category: str, error_code: str,
+                    llm_name: str, scores: Dict[str, float], response_time: float = None):
+        """Feed per-response scores to the breakdowns and the results store"""
+        self.breakdown.add(row_id, error_category, error_code, llm_name, scores, response_time)
+        if self.results_store:
+            self.results_store.add_score(row_id, llm_name, scores)
+
+    def _emit_row_winner(self, row_id: int, best_llm: str, worst_llm: str):
+        """Pass a row's best/worst LLM to the results store (if saving)"""
+        if self.results_store:
+            self.results_store.add_row_winner(row_id, best_llm, worst_llm)
+
+    def _extract_function(self) -> Callable[[str], Features]:
+        """
+        Feature extraction of this run (through the feature cache if any)
+
+        With dedup, the required features of a text are computed once and
+        kept without the text; identical texts get the same Features. At
+        most `dedup_cache_size` texts are kept, the least recently used
+        are dropped.
+        """
+        extract = self.feature_cache.extract if self.feature_cache else self.extractor.extract
+        if not self.dedup:
+            return extract
+
+        text_features = self._text_features
+        required = self.required_features
+        size = max(self.dedup_cache_size, 1)
+
+        def extract_once(text: str) -> Features:
+            if not text:
+                return extract(text)
+            key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+            features = text_features.get(key)
+            if features is None:
+                computed = extract(text)
+                features = text_features[key] = Features.from_dict({name: computed[name] for name in required})
+                self.dedup_extracted += 1
+                if len(text_features) > size:
+                    text_features.popitem(last=False)
+            else:
+                text_features.move_to_end(key)
+                self.reused_features += 1
+            return features
+
+        return extract_once
+
+    def score_responses(
+        self, responses: Iterator[Tuple[str, ResponseRecord]]
+    ) -> Iterator[Tuple[str, ResponseRecord, Dict[str, float]]]:
+        """
+        Extract features and score a stream of responses
+
+        Yields:
+            (llm_name, response_obj, scores) triples
+        """
+        extract = self._extract_function()
+
+        for llm_name, response_obj in responses:
+            features = extract(response_obj.text)
+            scores = self.scorer.score_response(
+                features,
+                response_obj.response_time,
+                response_obj.is_error,
+                self.weights
+            )
+            yield llm_name, response_obj, scores
+
     def evaluate_all_llms(self) -> Dict[str, Any]:
         """
         Evaluate all LLMs and return comprehensive results
@@ -143,92 +594,657 @@ class LLMEvaluator:
         """
         print("\n🔍 Starting LLM evaluation...\n")
 
-        # Fetch data
-        llm_responses = self.fetch_all_responses()
-
-        # Calculate scores for each LLM
-        llm_scores = {}
-        llm_details = {}
-
-        for llm_name, responses in llm_responses.items():
-            print(f"⚙️  Evaluating {llm_name}...")
-
-            total_score = 0.0
-            valid_count = 0
-            criterion_totals = {
-                'technical_accuracy': 0,
-                'solution_quality': 0,
-                'clarity': 0,
-                'conciseness': 0,
-                'speed': 0,
-                'reliability': 0
-            }
-
-            for response_obj in responses:
-                # Extract features
-                features = self.extractor.extract(response_obj['text'])
-
-                # Score response
-                scores = self.scorer.score_response(
-                    features,
-                    response_obj['response_time'],
-                    response_obj['is_error'],
-                    WEIGHTS
+        with PROFILER.stage('evaluate') as stage:
+            aggregator = self._score_all()
+            stage.rows = max(aggregator.counts.values())
+
+        for llm_name in self.llm_names:
+            print(f"   ✅ {llm_name}: {aggregator.average(llm_name):.2f}/100")
+
+        if self.feature_cache and self.feature_cache.hits + self.feature_cache.misses:
+            self.feature_cache.flush()
+            cache = self.feature_cache
+            print(f"   💾 Feature cache: {cache.hits} hits, {cache.misses} misses")
+        if self.reused_features:
+            print(f"   ♻️  {self.reused_features} responses reused the features of an identical text "
+                  f"({self.dedup_extracted} texts extracted)")
+
+        results = self.summarize(aggregator)
+        best_llm = results['best_llm']
+        worst_llm = results['worst_llm']
+
+        print(f"\n🏆 Best LLM: {best_llm} ({results['scores'][best_llm]:.2f})")
+        print(f"💔 Worst LLM: {worst_llm} ({results['scores'][worst_llm]:.2f})\n")
+
+        if self.bootstrap_resamples:
+            confidence = self.confidence_intervals()
+            if confidence:
+                results['confidence'] = confidence
+
+        return results
+
+    def summarize(self, aggregator: ScoreAggregator) -> Dict[str, Any]:
+        """
+        Results of the aggregates and breakdowns
+
+        Args:
+            aggregator: Aggregator over all rows
+
+        Returns:
+            Scores, ranking, details, row wins and category / error code breakdowns
+        """
+        results = aggregator.results(self.speed_quantile, self.weights)
+        results.update(self.breakdown.results(self.speed_quantile, self.weights))
+        if self.speed_quantile is not None:
+            results['speed_quantile'] = self.speed_quantile
+        return results
+
+    def confidence_intervals(self) -> Dict[str, Any]:
+        """
+        Bootstrap the per-row scores kept by the breakdown
+
+        Returns:
+            Intervals and win probabilities (see bootstrap.bootstrap), None
+            with fewer than two rows
+        """
+        _, row_scores = self.breakdown.row_score_matrix()
+        if len(row_scores) < 2:
+            print("   ⚠️  Too few rows for confidence intervals, skipped\n")
+            return None
+        from bootstrap import bootstrap
+
+        with PROFILER.stage('bootstrap', len(row_scores)):
+            confidence = bootstrap(
+                row_scores, self.llm_names, self.bootstrap_resamples, workers=self.workers, criteria=self.criteria
+            )
+
+        best_llm = max(confidence['llms'], key=lambda llm: confidence['llms'][llm]['best_probability'])
+        print(f"📏 {confidence['confidence']:.0%} intervals from {self.bootstrap_resamples} resamples; "
+              f"{best_llm} is best in {confidence['llms'][best_llm]['best_probability']:.1%}\n")
+        return confidence
+
+    def _score_all(self) -> ScoreAggregator:
+        """
+        Score every row with the configured evaluation mode
+
+        Returns:
+            Aggregator over all rows
+        """
+        if self.normalized:
+            self.llm_names = self.stored_llm_names()
+        self.breakdown = BreakdownAggregator(
+            self.llm_names, on_row_winner=self._emit_row_winner, keep_row_scores=self.bootstrap_resamples > 0
+        )
+
+        if self.incremental:
+            aggregator = self.evaluate_incremental()
+        elif self.sql_features:
+            aggregator = self.evaluate_sql_features()
+        elif self.async_pipeline:
+            aggregator = self.evaluate_async()
+        elif self.workers > 1:
+            aggregator = self.evaluate_parallel()
+        elif self.vectorized:
+            aggregator = self.evaluate_vectorized()
+        elif self.stream:
+            aggregator = ScoreAggregator(self.llm_names)
+            for llm_name, response_obj, scores in self.score_responses(self.stream_responses()):
+                aggregator.add(llm_name, scores, response_obj.response_time)
+                self._emit_score(
+                    response_obj.id, response_obj.error_category, response_obj.error_code,
+                    llm_name, scores, response_obj.response_time
                 )
+        else:
+            aggregator = ScoreAggregator(self.llm_names)
+            llm_responses = self.fetch_all_responses()
+
+            for llm_name, responses in llm_responses.items():
+                print(f"⚙️  Evaluating {llm_name}...")
 
-                total_score += scores['total']
-                valid_count += 1
+                pairs = ((llm_name, response_obj) for response_obj in responses)
+                for _, response_obj, scores in self.score_responses(pairs):
+                    aggregator.add(llm_name, scores, response_obj.response_time)
+                    self._emit_score(
+                        response_obj.id, response_obj.error_category, response_obj.error_code,
+                        llm_name, scores, response_obj.response_time
+                    )
 
-                # Accumulate criterion scores
-                for criterion in criterion_totals.keys():
-                    criterion_totals[criterion] += scores[criterion]
+        return aggregator
+
+    def evaluate_incremental(self) -> ScoreAggregator:
+        """
+        Score only rows added, changed or deleted since the last run
 
-            # Calculate averages
-            avg_score = total_score / valid_count if valid_count > 0 else 0
+        Stored per-row scores of changed and deleted rows are subtracted from
+        the running aggregates before the new scores are added, so the result
+        equals a full evaluation (see check_incremental).
 
-            avg_criterion_scores = {
-                criterion: total / valid_count if valid_count > 0 else 0
-                for criterion, total in criterion_totals.items()
-            }
+        Returns:
+            Aggregator over all rows
+        """
+        from incremental import IncrementalState
 
-            llm_scores[llm_name] = avg_score
-            llm_details[llm_name] = {
-                'average_score': avg_score,
-                'total_responses': len(responses),
-                'valid_responses': valid_count,
-                'criterion_scores': avg_criterion_scores
-            }
+        state = IncrementalState(self.state_path)
 
-            print(f"   ✅ {llm_name}: {avg_score:.2f}/100")
+        try:
+            if self.full:
+                print("♻️  Rebuilding incremental state from scratch")
+                state.reset()
 
-        # Ranking
-        ranked_llms = sorted(llm_scores.items(), key=lambda x: x[1], reverse=True)
+            aggregator = state.load_aggregator()
+            self.breakdown = state.load_breakdown(on_row_winner=self._emit_row_winner)
+            self.catch_up(state, aggregator)
+            return aggregator
+        except BaseException:
+            state.rollback()
+            raise
+        finally:
+            state.close()
 
-        best_llm = ranked_llms[0][0]
-        worst_llm = ranked_llms[-1][0]
+    def catch_up(self, state: 'IncrementalState', aggregator: ScoreAggregator):
+        """
+        Apply every pending change log entry and commit the state
 
-        print(f"\n🏆 Best LLM: {best_llm} ({llm_scores[best_llm]:.2f})")
-        print(f"💔 Worst LLM: {worst_llm} ({llm_scores[worst_llm]:.2f})\n")
+        A state that never scored every row (new, reset or rebuilt) scores
+        all rows instead. The applied entries are deleted from the change log
+        on self.conn but not committed: the run's results (finish_run) or
+        the caller commit them. Should that commit fail, the next run applies
+        the entries again, which replaces the same scores.
 
-        return {
-            'scores': llm_scores,
-            'details': llm_details,
-            'ranking': ranked_llms,
-            'best_llm': best_llm,
-            'worst_llm': worst_llm
+        Args:
+            state: Open incremental state
+            aggregator: Running aggregates restored from the state (updated in place)
+        """
+        # Read before the rows: entries committed later stay in the log
+        change_ids, row_ids = self.read_changes()
+
+        if state.synced:
+            print(f"⚙️  Incremental evaluation of {len(change_ids)} change log entries...")
+            changed_rows, deleted_rows = self.apply_changes(state, aggregator, row_ids)
+        else:
+            print("⚙️  Incremental evaluation: scoring every row once...")
+            changed_rows, deleted_rows = self.rescore_rows(state, aggregator, self.iter_rows()), 0
+
+        if self.bootstrap_resamples:
+            self.breakdown.add_row_scores(*state.score_matrix(self.llm_names))
+        state.commit_run(aggregator, self.breakdown)
+        self.drain_changes(change_ids)
+
+        print(f"   🔁 {changed_rows} new/changed rows scored, {deleted_rows} deleted rows removed")
+
+    def read_changes(self, limit: int = None) -> Tuple[List[int], List[int]]:
+        """
+        Pending change log entries, oldest first
+
+        Args:
+            limit: Most entries to read (None = all)
+
+        Returns:
+            (change ids, distinct row ids in order of their first entry)
+        """
+        cursor = self.conn.cursor()
+        if limit is None:
+            cursor.execute(CHANGES_QUERY)
+        else:
+            cursor.execute(CHANGES_QUERY + "LIMIT %s", (limit,))
+        entries = cursor.fetchall()
+        cursor.close()
+        return [entry[0] for entry in entries], list(dict.fromkeys(entry[1] for entry in entries))
+
+    def drain_changes(self, change_ids: List[int]):
+        """Delete applied change log entries (not committed, see catch_up)"""
+        if not change_ids:
+            return
+        cursor = self.conn.cursor()
+        cursor.execute(DRAIN_CHANGES_QUERY, (change_ids,))
+        cursor.close()
+
+    def apply_changes(self, state: 'IncrementalState', aggregator: ScoreAggregator,
+                      row_ids: List[int]) -> Tuple[int, int]:
+        """
+        Re-score changed rows and remove deleted ones (not committed)
+
+        Args:
+            state: Open incremental state
+            aggregator: Running aggregates (updated in place)
+            row_ids: Rows named by change log entries
+
+        Returns:
+            (rows scored, rows removed)
+        """
+        changed_rows = deleted_rows = 0
+        for start in range(0, len(row_ids), self.chunk_size):
+            chunk_ids = row_ids[start:start + self.chunk_size]
+            cursor = self.conn.cursor()
+            with PROFILER.stage('db.fetch', len(chunk_ids)):
+                cursor.execute(RESPONSES_BY_ID_QUERY, (chunk_ids,))
+                rows = cursor.fetchall()
+            cursor.close()
+
+            found = {row[0] for row in rows}
+            deleted = [row_id for row_id in chunk_ids if row_id not in found]
+            self.remove_rows(state, aggregator, deleted)
+            changed_rows += self.rescore_rows(state, aggregator, rows)
+            deleted_rows += len(deleted)
+        return changed_rows, deleted_rows
+
+    def rescore_rows(self, state: 'IncrementalState', aggregator: ScoreAggregator,
+                     rows: Iterator[Tuple]) -> int:
+        """
+        Replace the stored scores of new or changed rows (not committed)
+
+        Args:
+            state: Open incremental state
+            aggregator: Running aggregates (updated in place)
+            rows: Rows selected by RESPONSES_QUERY
+
+        Returns:
+            Number of rows scored
+        """
+        changed_rows = 0
+        scored = []
+
+        for row in rows:
+            row_id = row[0]
+            changed_rows += 1
+
+            self._remove_stored_row(state, aggregator, row_id)
+
+            for llm_name, response_obj, scores in self.score_responses(self._unpack_row(row, self.llm_names)):
+                error_category, error_code = response_obj.error_category, response_obj.error_code
+                response_time = response_obj.response_time
+                aggregator.add(llm_name, scores, response_time)
+                scored.append((row_id, error_category, error_code, llm_name, scores, response_time))
+                self._emit_score(row_id, error_category, error_code, llm_name, scores, response_time)
+
+            if len(scored) >= self.chunk_size * len(self.llm_names):
+                state.write_scores(scored)
+                scored = []
+
+        state.write_scores(scored)
+        return changed_rows
+
+    def remove_rows(self, state: 'IncrementalState', aggregator: ScoreAggregator, row_ids: Iterable[int]):
+        """Subtract deleted rows from the running aggregates and forget them (not committed)"""
+        row_ids = list(row_ids)
+        for row_id in row_ids:
+            self._remove_stored_row(state, aggregator, row_id)
+        state.delete_rows(row_ids)
+
+    def _remove_stored_row(self, state: 'IncrementalState', aggregator: ScoreAggregator, row_id: int):
+        """Subtract a row's previously stored scores from the running aggregates"""
+        stored = state.row_scores(row_id)
+        if stored is None:
+            return
+        error_category, error_code, llm_scores = stored
+        for llm_name, scores, response_time in llm_scores:
+            aggregator.remove(llm_name, scores, response_time)
+        self.breakdown.remove_row(error_category, error_code, llm_scores)
+
+    def check_incremental(self, results: Dict[str, Any]) -> bool:
+        """
+        Compare incremental results with a full in-memory evaluation
+
+        Args:
+            results: Results of an incremental evaluate_all_llms()
+
+        Returns:
+            True if both evaluations produce identical results
+        """
+        print("🔎 Checking incremental results against a full evaluation...")
+
+        aggregator = ScoreAggregator(self.llm_names)
+        breakdown = BreakdownAggregator(self.llm_names)
+        for llm_name, response_obj, scores in self.score_responses(self.stream_responses()):
+            aggregator.add(llm_name, scores, response_obj.response_time)
+            breakdown.add(
+                response_obj.id, response_obj.error_category, response_obj.error_code,
+                llm_name, scores, response_obj.response_time
+            )
+        full_results = aggregator.results(self.speed_quantile, self.weights)
+        full_results.update(breakdown.results(self.speed_quantile, self.weights))
+
+        consistent = full_results == {
+            key: value for key, value in results.items() if key not in ('confidence', 'speed_quantile')
         }
+        if consistent:
+            print("   ✅ Incremental and full results match\n")
+        else:
+            for llm_name in self.llm_names:
+                print(f"   ❌ {llm_name}: incremental {results['scores'].get(llm_name)} "
+                      f"vs full {full_results['scores'].get(llm_name)}")
+        return consistent
 
-    def save_to_database(self, results: Dict[str, Any]):
+    def build_feature_table(self, rows: List[Tuple], feature_names: Collection[str] = None) -> FeatureTable:
+        """
+        Extract features of a chunk of rows into columnar arrays
+
+        Args:
+            rows: Rows selected by RESPONSES_QUERY
+            feature_names: Features to compute (default: required_features,
+                the only ones dedup keeps); the other columns are 0.0
+
+        Returns:
+            FeatureTable with one entry per row and LLM (row-major, LLMs in
+            llm_names order); llm_codes index into llm_names
+        """
+        if feature_names is None:
+            extract = self._extract_function()
+            feature_names = self.required_features
+        else:
+            extract = self.feature_cache.extract if self.feature_cache else self.extractor.extract
+        to_row = partial(FeatureExtractor.to_row, names=feature_names)
+
+        feature_rows = []
+        times = []
+        is_error = []
+        llm_codes = []
+        row_ids = []
+        error_categories = []
+        error_codes = []
+
+        for row in rows:
+            for code, (llm_name, text, response_time) in enumerate(self._row_responses(row, self.llm_names)):
+                feature_rows.append(to_row(extract(text)))
+                times.append(np.nan if response_time is None else response_time)
+                is_error.append(text.startswith('Error:') if text else True)
+                llm_codes.append(code)
+                row_ids.append(row[0])
+                error_categories.append(row[1])
+                error_codes.append(row[2])
+
+        return FeatureTable(
+            features=np.array(feature_rows, dtype=np.float64).reshape(-1, len(FeatureExtractor.FEATURE_NAMES)),
+            times=np.array(times, dtype=np.float64),
+            is_error=np.array(is_error, dtype=bool),
+            llm_codes=np.array(llm_codes, dtype=np.intp),
+            row_ids=np.array(row_ids, dtype=np.int64),
+            error_categories=error_categories,
+            error_codes=error_codes
+        )
+
+    def evaluate_vectorized(self) -> ScoreAggregator:
         """
-        Save best_llm, worst_llm, and description to database
+        Score rows chunk by chunk with Scorer.score_batch
 
-        Updates each record with:
-        - best_llm: name of the best performing LLM
-        - worst_llm: name of the worst performing LLM
-        - description: detailed comparison text
+        Returns:
+            Aggregator over all rows
         """
-        print("\n💾 Saving results to database...")
+        print(f"⚙️  Scoring in vectorized batches of {self.chunk_size} rows...")
+
+        aggregator = ScoreAggregator(self.llm_names)
+        rows = self.iter_rows()
+
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+
+            with PROFILER.stage('build_feature_table', len(chunk)):
+                table = self.build_feature_table(chunk)
+            self._score_table(aggregator, table)
+
+        return aggregator
+
+    def _score_table(self, aggregator: ScoreAggregator, table: FeatureTable):
+        """Score a FeatureTable and feed the aggregates, breakdowns and results store"""
+        scores = self.scorer.score_batch(table.features, table.times, table.is_error, self.weights, self.criteria)
+        aggregator.add_batch(table.llm_codes, scores, table.times)
+        self.breakdown.add_batch(
+            table.row_ids, table.error_categories, table.error_codes, table.llm_codes, scores, table.times
+        )
+
+        if self.results_store:
+            columns = [scores[key].tolist() for key in Scorer.CRITERIA + ['total']]
+            for i, (row_id, code) in enumerate(zip(table.row_ids.tolist(), table.llm_codes.tolist())):
+                row_scores = {key: column[i] for key, column in zip(Scorer.CRITERIA + ['total'], columns)}
+                self.results_store.add_score(row_id, self.llm_names[code], row_scores)
+
+    def sql_features_installed(self) -> bool:
+        """Whether response_features was computed by this extractor (see sql_features.py)"""
+        from sql_features import FEATURES_VERSION, installed_version
+
+        version = installed_version(self.conn)
+        if version == FEATURES_VERSION:
+            return True
+        if version is None:
+            print("   ⚠️  response_features is not installed (python sql_features.py --install)")
+        else:
+            print(f"   ⚠️  response_features was computed by another extractor version "
+                  f"({version}, expected {FEATURES_VERSION}); run python sql_features.py --install")
+        print("   ⚠️  Extracting features in Python instead")
+        return False
+
+    def build_sql_feature_table(self, rows: List[FeatureRow]) -> Tuple[FeatureTable, int]:
+        """
+        Collect features computed by PostgreSQL into columnar arrays
+
+        Rows missing any response column (e.g. inserted while the trigger
+        was not installed) are read again with their texts and extracted
+        here; rows deleted in the meantime are skipped.
+
+        Args:
+            rows: FeatureRows of SQL_FEATURES_QUERY
+
+        Returns:
+            (FeatureTable as build_feature_table, number of rows extracted in Python)
+        """
+        extract = self._extract_function()
+        to_row = partial(FeatureExtractor.to_row, names=self.required_features)
+        columns = [LLM_RESPONSE_COLUMNS[llm_name] for llm_name in self.llm_names]
+
+        missing = [row.id for row in rows if any(column not in row.responses for column in columns)]
+        texts = {}
+        if missing:
+            cursor = self.conn.cursor()
+            cursor.execute(RESPONSES_BY_ID_QUERY, (missing,))
+            texts = {text_row[0]: text_row for text_row in cursor.fetchall()}
+            cursor.close()
+
+        feature_rows = []
+        times = []
+        is_error = []
+        llm_codes = []
+        row_ids = []
+        error_categories = []
+        error_codes = []
 
+        for row in rows:
+            if row.id in texts:
+                responses = (
+                    (response_time, text.startswith('Error:') if text else True, to_row(extract(text)))
+                    for _, text, response_time in self._row_responses(texts[row.id], self.llm_names)
+                )
+            elif any(column not in row.responses for column in columns):
+                continue
+            else:
+                responses = (
+                    (values[0], values[1], values[2:]) for values in map(row.responses.get, columns)
+                )
+
+            for code, (response_time, error, features) in enumerate(responses):
+                feature_rows.append(features)
+                times.append(np.nan if response_time is None else response_time)
+                is_error.append(error)
+                llm_codes.append(code)
+                row_ids.append(row.id)
+                error_categories.append(row.error_category)
+                error_codes.append(row.error_code)
+
+        table = FeatureTable(
+            features=np.array(feature_rows, dtype=np.float64).reshape(-1, len(FeatureExtractor.FEATURE_NAMES)),
+            times=np.array(times, dtype=np.float64),
+            is_error=np.array(is_error, dtype=bool),
+            llm_codes=np.array(llm_codes, dtype=np.intp),
+            row_ids=np.array(row_ids, dtype=np.int64),
+            error_categories=error_categories,
+            error_codes=error_codes
+        )
+        return table, len(texts)
+
+    def evaluate_sql_features(self) -> ScoreAggregator:
+        """
+        Score features computed by PostgreSQL chunk by chunk
+
+        Only the small numeric rows of response_features are transferred,
+        not the response texts. Without an up-to-date response_features
+        this is evaluate_vectorized.
+
+        Returns:
+            Aggregator over all rows
+        """
+        if not self.sql_features_installed():
+            return self.evaluate_vectorized()
+
+        print(f"⚙️  Scoring features computed by PostgreSQL in batches of {self.chunk_size} rows...")
+
+        aggregator = ScoreAggregator(self.llm_names)
+        columns = sorted({LLM_RESPONSE_COLUMNS[llm_name] for llm_name in self.llm_names})
+        rows = self.iter_rows(SQL_FEATURES_QUERY, (columns,))
+        extracted = 0
+
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+
+            with PROFILER.stage('build_feature_table', len(chunk)):
+                table, chunk_extracted = self.build_sql_feature_table(chunk)
+            extracted += chunk_extracted
+            self._score_table(aggregator, table)
+
+        if extracted:
+            print(f"   ⚠️  {extracted} rows had no features in response_features and were extracted in Python")
+        return aggregator
+
+    def evaluate_parallel(self) -> ScoreAggregator:
+        """
+        Score rows in worker processes
+
+        Rows are sharded into chunks of `chunk_size`; each worker returns the
+        partial sums and breakdowns of its chunk and the parent merges them. At most two
+        chunks per worker are in flight, so memory stays bounded in
+        streaming mode.
+
+        Returns:
+            Aggregator over all rows
+        """
+        print(f"⚙️  Scoring with {self.workers} worker processes "
+              f"(chunk size {self.chunk_size})...")
+
+        from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+        aggregator = ScoreAggregator(self.llm_names)
+        rows = self.iter_rows()
+        max_pending = self.workers * 2
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                 initargs=(self.feature_cache_path, self.dedup)) as pool:
+            pending = set()
+            while True:
+                chunk = list(islice(rows, self.chunk_size))
+                if chunk:
+                    pending.add(pool.submit(
+                        score_rows, chunk, self.results_store is not None,
+                        PROFILER.enabled, self.llm_names, self.bootstrap_resamples > 0
+                    ))
+
+                if pending and (not chunk or len(pending) >= max_pending):
+                    with PROFILER.stage('parallel.wait'):
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        partial, partial_breakdown, scored, profile = future.result()
+                        if profile:
+                            PROFILER.merge(profile)
+                        aggregator.merge(partial)
+                        self.breakdown.merge(partial_breakdown)
+                        for row_id, llm_name, scores in scored:
+                            self.results_store.add_score(row_id, llm_name, scores)
+
+                if not chunk and not pending:
+                    break
+
+        return aggregator
+
+    def evaluate_async(self) -> ScoreAggregator:
+        """
+        Fetch, score and write concurrently
+
+        Chunks of `chunk_size` rows are read from a server-side cursor (see
+        iter_rows) in an I/O thread, scored by `workers` processes (see score_rows) and their
+        scores and row winners written by a second thread through the
+        results store, while the next chunks are fetched and scored. Bounded
+        queues between the stages provide backpressure (see AsyncPipeline).
+
+        Returns:
+            Aggregator over all rows
+        """
+        print(f"⚙️  Async pipeline: {self.workers} scoring processes, "
+              f"chunk size {self.chunk_size}, queue size {self.queue_size}...")
+
+        from async_pipeline import AsyncPipeline
+
+        aggregator = ScoreAggregator(self.llm_names)
+        store = self.results_store
+        # The results store belongs to the writer thread; winners published
+        # by merges are handed over with the chunk's scores
+        winners = []
+        self.breakdown.on_row_winner = lambda *winner: winners.append(winner)
+
+        rows = self.iter_rows()
+
+        def fetch_chunk() -> List[Tuple]:
+            return list(islice(rows, self.chunk_size))
+
+        def merge(result):
+            partial_aggregator, partial_breakdown, scored, profile = result
+            if profile:
+                PROFILER.merge(profile)
+            aggregator.merge(partial_aggregator)
+            self.breakdown.merge(partial_breakdown)
+            row_winners = winners[:]
+            winners.clear()
+            return (scored, row_winners) if store else None
+
+        def write(item):
+            scored, row_winners = item
+            with PROFILER.stage('async.write', len(scored)):
+                for row_id, llm_name, scores in scored:
+                    store.add_score(row_id, llm_name, scores)
+                for row_id, best_llm, worst_llm in row_winners:
+                    store.add_row_winner(row_id, best_llm, worst_llm)
+
+        pipeline = AsyncPipeline(
+            fetch_chunk,
+            partial(score_rows, keep_scores=store is not None, profile=PROFILER.enabled,
+                    llm_names=self.llm_names, keep_row_scores=self.bootstrap_resamples > 0),
+            merge,
+            write if store else None,
+            workers=self.workers,
+            queue_size=self.queue_size,
+            initializer=init_worker,
+            initargs=(self.feature_cache_path, self.dedup)
+        )
+
+        try:
+            pipeline.run()
+        finally:
+            rows.close()
+            self.breakdown.on_row_winner = self._emit_row_winner
+
+        return aggregator
+
+    @staticmethod
+    def build_description(results: Dict[str, Any]) -> str:
+        """
+        Build the detailed comparison report of a run
+
+        Args:
+            results: Output of evaluate_all_llms
+
+        Returns:
+            Report text
+        """
         best_llm = results['best_llm']
         worst_llm = results['worst_llm']
         best_score = results['scores'][best_llm]
@@ -253,12 +1269,11 @@ class LLMEvaluator:
         for rank, (llm_name, score) in enumerate(results['ranking'], 1):
             details = results['details'][llm_name]
             description += f"{rank}. {llm_name.upper()}: {score:.2f}/100\n"
-            description += f"   - Technical Accuracy: {details['criterion_scores']['technical_accuracy']:.2f}/25\n"
-            description += f"   - Solution Quality: {details['criterion_scores']['solution_quality']:.2f}/25\n"
-            description += f"   - Clarity: {details['criterion_scores']['clarity']:.2f}/20\n"
-            description += f"   - Conciseness: {details['criterion_scores']['conciseness']:.2f}/10\n"
-            description += f"   - Speed: {details['criterion_scores']['speed']:.2f}/10\n"
-            description += f"   - Reliability: {details['criterion_scores']['reliability']:.2f}/10\n"
+            for label, criterion, maximum in DESCRIPTION_CRITERIA:
+                points = details['criterion_scores'][criterion]
+                # Criteria with weight 0 are not scored (None)
+                shown = "not scored (weight 0)" if points is None else f"{points:.2f}/{maximum}"
+                description += f"   - {label}: {shown}\n"
             description += f"   Total Responses Evaluated: {details['total_responses']}\n\n"
 
         # Methodology
@@ -313,7 +1328,24 @@ class LLMEvaluator:
 
         # Average score
         avg_score = sum(results['scores'].values()) / len(results['scores'])
-        description += f"• Average Score Across All LLMs: {avg_score:.2f}/100\n\n"
+        description += f"• Average Score Across All LLMs: {avg_score:.2f}/100\n"
+
+        confidence = results.get('confidence')
+        if confidence:
+            level = f"{confidence['confidence']:.0%}"
+            low, high = confidence['llms'][best_llm]['interval']
+            description += (
+                f"• Statistical Confidence: {best_llm} ranks first in "
+                f"{confidence['llms'][best_llm]['best_probability']:.1%} of {confidence['resamples']} "
+                f"bootstrap resamples ({level} interval {low:.2f}-{high:.2f})\n"
+            )
+            runner_up = results['ranking'][1][0] if len(results['ranking']) > 1 else None
+            if runner_up:
+                description += (
+                    f"• {best_llm} beats {runner_up} in "
+                    f"{confidence['win_probabilities'][best_llm][runner_up]:.1%} of resamples\n"
+                )
+        description += "\n"
 
         description += "CONCLUSION:\n"
         description += f"{best_llm} emerged as the most reliable LLM for software error analysis,\n"
@@ -323,39 +1355,180 @@ class LLMEvaluator:
 
         description += "=" * 80 + "\n"
 
-        # Update all records
-        cursor = self.conn.cursor()
+        return description
 
-        query = """
-        UPDATE llm_error_analysis
-        SET
-            best_llm = %s,
-            worst_llm = %s,
-            description = %s
+    def save_to_database(self, results: Dict[str, Any]):
         """
+        Save the evaluation run to the database
 
-        cursor.execute(query, (best_llm, worst_llm, description))
-        self.conn.commit()
+        - evaluation_runs: best/worst LLM, results and description, once per run
+        - evaluation_scores: per-response scores, only rows whose scores changed
+        - llm_error_analysis: per-row best_llm/worst_llm, only rows whose values changed
+        """
+        print("\n💾 Saving results to database...")
 
-        updated_count = cursor.rowcount
-        cursor.close()
+        if self.results_store is None:
+            from results_store import ResultsStore
+            self.results_store = ResultsStore(self.conn)
+            self.results_store.start_run()
+
+        store = self.results_store
+        description = self.build_description(results)
 
-        print(f"   ✅ Updated {updated_count} records")
-        print(f"   - best_llm: {best_llm}")
-        print(f"   - worst_llm: {worst_llm}")
+        with PROFILER.stage('save'):
+            store.finish_run(results, description)
+
+        print(f"   ✅ Run #{store.run_id} stored in evaluation_runs")
+        print(f"   - evaluation_scores: {store.written} written, {store.unchanged} unchanged")
+        print(f"   - best_llm/worst_llm updated on {store.winners_updated} records")
         print(f"   - description: {len(description)} characters\n")
 
+    def check_results_tables(self):
+        """
+        Make sure the result tables exist before anything is scored
+
+        Raises:
+            DatabaseSetupError: evaluation_runs or evaluation_scores is missing
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(RESULTS_TABLES_QUERY)
+        found = cursor.fetchone()
+        cursor.close()
+        missing = [table for table, regclass in zip(RESULTS_TABLES, found) if regclass is None]
+        if missing:
+            tables = f"Table{'s' if len(missing) > 1 else ''} {', '.join(missing)}"
+            raise DatabaseSetupError(
+                f"{tables} not found; create the result tables with "
+                f"src/database/create-evaluation-results.sql first"
+            )
+
     def run(self) -> Dict[str, Any]:
         """
         Run complete evaluation pipeline
 
         Returns:
             Evaluation results
+
+        Raises:
+            DatabaseSetupError: The result tables have not been created
         """
+        if self.snapshot_path:
+            # Offline: nothing is read from or written to the database
+            print(f"📂 Evaluating snapshot {self.snapshot_path} (offline)")
+            try:
+                return self.evaluate_all_llms()
+            finally:
+                self.close_cache()
+
+        from results_store import ResultsStore
+
         try:
             self.connect_db()
+            self.check_results_tables()
+            self.results_store = ResultsStore(self.write_conn or self.conn)
+            self.results_store.start_run()
             results = self.evaluate_all_llms()
+            if self.incremental and self.check:
+                with PROFILER.stage('check'):
+                    self.check_incremental(results)
             self.save_to_database(results)
             return results
         finally:
             self.close_db()
+            self.close_cache()
+
+
+def instrument_pipeline():
+    """
+    Time the per-response functions of the pipeline with PROFILER
+
+    Covers every FeatureExtractor helper, the feature cache, scoring and the
+    database writes; call after PROFILER.enable().
+    """
+    from incremental import IncrementalState
+    from results_store import ResultsStore
+
+    helpers = [
+        name for name, value in vars(FeatureExtractor).items()
+        if isinstance(value, staticmethod) and name.startswith('_')
+    ]
+    PROFILER.instrument(FeatureExtractor, ['extract'] + helpers, 'extract')
+    PROFILER.instrument(FeatureCache, ['extract', 'flush'], 'cache')
+    PROFILER.instrument(Scorer, ['score_response', 'score_batch'], 'score')
+    PROFILER.instrument(LLMEvaluator, ['_unpack_row'], 'unpack')
+    PROFILER.instrument(ResultsStore, ['flush', 'flush_winners', 'finish_run'], 'db.results')
+    PROFILER.instrument(IncrementalState, ['row_scores', 'write_scores', 'commit_run'], 'state')
+
+
+# Evaluator of a scoring worker process, created by init_worker
+_worker_evaluator = None
+
+
+def init_worker(feature_cache_path: str = None, dedup: bool = False):
+    """
+    Create the evaluator of a scoring worker process (pool initializer)
+
+    The process keeps it, and its feature cache connection, for all of its
+    chunks. Stale cache entries were purged when the parent opened the cache.
+
+    Args:
+        feature_cache_path: SQLite feature cache file (None = no cache)
+        dedup: Extract each distinct text once (see LLMEvaluator)
+    """
+    global _worker_evaluator
+    _worker_evaluator = LLMEvaluator(dedup=dedup)
+    if feature_cache_path:
+        _worker_evaluator.feature_cache_path = feature_cache_path
+        _worker_evaluator.feature_cache = FeatureCache(feature_cache_path, purge=False)
+
+
+def score_rows(rows: List[Tuple], keep_scores: bool = False, profile: bool = False,
+               llm_names: List[str] = None, keep_row_scores: bool = False
+               ) -> Tuple[ScoreAggregator, BreakdownAggregator, List[Tuple], Dict]:
+    """
+    Score a chunk of llm_error_analysis rows (worker process entry point)
+
+    Uses the evaluator created by init_worker (a plain one if the process
+    was started without it).
+
+    Args:
+        rows: Rows selected by RESPONSES_QUERY
+        keep_scores: Also return per-response scores
+        profile: Collect stage timings for the chunk
+        llm_names: LLMs to score (default: LLM_NAMES)
+        keep_row_scores: Keep per-row scores in the breakdown (for bootstrapping)
+
+    Returns:
+        Partial sums and breakdown (with collected row winners) for the
+        chunk, if requested a list of (row_id, llm_name, scores), and the
+        chunk's PROFILER snapshot (None unless profiling)
+    """
+    if profile:
+        if not PROFILER.enabled:
+            PROFILER.enable()
+            instrument_pipeline()
+        PROFILER.reset()
+    if _worker_evaluator is None:
+        init_worker()
+    evaluator = _worker_evaluator
+    llm_names = llm_names or LLM_NAMES
+    aggregator = ScoreAggregator(llm_names)
+    breakdown = BreakdownAggregator(llm_names, keep_row_scores=keep_row_scores)
+    scored = []
+
+    try:
+        responses = (pair for row in rows for pair in LLMEvaluator._unpack_row(row, llm_names))
+        for llm_name, response_obj, scores in evaluator.score_responses(responses):
+            aggregator.add(llm_name, scores, response_obj.response_time)
+            breakdown.add(
+                response_obj.id, response_obj.error_category, response_obj.error_code,
+                llm_name, scores, response_obj.response_time
+            )
+            if keep_scores:
+                scored.append((response_obj.id, llm_name, scores))
+    finally:
+        # Worker processes are not closed down cleanly, so write every chunk's features
+        if evaluator.feature_cache:
+            evaluator.feature_cache.flush()
+
+    return aggregator, breakdown, scored, PROFILER.snapshot() if profile else None
@@ -0,0 +1,153 @@
+"""
+Persistent Feature Cache for Re-evaluations
+"""
+
+import hashlib
+import json
+import sqlite3
+from typing import Dict, Tuple
+import config
+import feature_extractor
+import keyword_matcher
+import text_analyzer
+from feature_extractor import FEATURE_NAMES, FeatureExtractor, Features
+
+
+# Bumped whenever the layout of cached feature data changes
+CACHE_FORMAT = 3
+
+
+def _extractor_version() -> str:
+    """
+    Fingerprint of everything that influences extracted features
+
+    Changes to the extraction code or to any keyword list produce a new
+    version, which invalidates previously cached features.
+    """
+    digest = hashlib.sha256(str(CACHE_FORMAT).encode('utf-8'))
+    for module in (feature_extractor, keyword_matcher, text_analyzer):
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    keywords = [
+        config.TECHNICAL_KEYWORDS, config.ERROR_KEYWORDS, config.SOLUTION_KEYWORDS,
+        config.CAUSE_KEYWORDS, config.ALTERNATIVE_KEYWORDS
+    ]
+    digest.update(json.dumps(keywords, ensure_ascii=False).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+EXTRACTOR_VERSION = _extractor_version()
+
+
+class FeatureCache:
+    """
+    SQLite-backed cache of FeatureExtractor results keyed by text hash
+
+    Only features are cached; scores are always recomputed, so changing
+    WEIGHTS or score thresholds does not invalidate the cache. Entries hold
+    the features computed for a text so far (a JSON object); features
+    missing from a hit are computed on demand and written back.
+    """
+
+    FLUSH_SIZE = 1000
+
+    def __init__(self, path: str = config.FEATURE_CACHE_PATH, purge: bool = True):
+        """
+        Open (or create) the cache file
+
+        Args:
+            path: SQLite file path
+            purge: Drop features computed by an older extractor (scans the
+                whole table; worker processes leave it to the parent)
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        # Features to write with the number of them already stored,
+        # serialized at flush() time so features computed after extract()
+        # returned are included
+        self._pending: Dict[bytes, Tuple[Features, int]] = {}
+
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS features ("
+            " key BLOB PRIMARY KEY, version TEXT NOT NULL, data TEXT NOT NULL)"
+        )
+        if purge:
+            self.conn.execute("DELETE FROM features WHERE version != ?", (EXTRACTOR_VERSION,))
+            self.conn.commit()
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        """Hash response text"""
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def extract(self, text: str) -> Features:
+        """
+        Return cached features for a text, extracting them on a miss
+
+        Args:
+            text: LLM response text
+
+        Returns:
+            Features (same as FeatureExtractor.extract)
+        """
+        if not text or text.startswith('Error:'):
+            return FeatureExtractor.extract(text)
+
+        key = self._key(text)
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.hits += 1
+            return pending[0]
+
+        row = self.conn.execute(
+            "SELECT data FROM features WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None:
+            self.hits += 1
+            values = json.loads(row[0])
+            features = Features.from_dict(values, text)
+            if len(values) < len(FEATURE_NAMES):
+                self._add_pending(key, features, len(values))
+            return features
+
+        self.misses += 1
+        features = FeatureExtractor.extract(text)
+        self._add_pending(key, features, 0)
+        return features
+
+    def _add_pending(self, key: bytes, features: Features, stored: int):
+        """Queue features for writing, flushing the ones queued before when full"""
+        if len(self._pending) >= self.FLUSH_SIZE:
+            self.flush()
+        self._pending[key] = (features, stored)
+
+    def flush(self):
+        """Write pending features that gained values since they were stored"""
+        if not self._pending:
+            return
+        rows = []
+        for key, (features, stored) in self._pending.items():
+            computed = features.computed()
+            if len(computed) > stored:
+                rows.append((key, EXTRACTOR_VERSION, json.dumps(computed)))
+        if rows:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO features (key, version, data) VALUES (?, ?, ?)", rows
+            )
+            self.conn.commit()
+        self._pending = {}
+
+    def close(self):
+        """Flush and close the cache"""
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
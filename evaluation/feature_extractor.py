@@ -2,133 +2,204 @@
 Feature Extraction from LLM Responses
 """
 
-import re
-from typing import Dict, Any
-from config import (
-    TECHNICAL_KEYWORDS, SOLUTION_KEYWORDS, CAUSE_KEYWORDS,
-    ALTERNATIVE_KEYWORDS
-)
+from typing import Dict, Any, List, Collection, Tuple
+from keyword_matcher import KEYWORD_MATCHER
+from text_analyzer import TextAnalyzer
+
+
+# Column order of the feature table used by Scorer.score_batch
+FEATURE_NAMES = [
+    'word_count',
+    'code_blocks',
+    'headings',
+    'bullet_points',
+    'numbered_lists',
+    'technical_terms',
+    'has_error_keyword',
+    'has_solution_keyword',
+    'has_cause_keyword',
+    'has_alternative_keyword',
+    'paragraph_count',
+    'has_visual_markers',
+    'sentence_count',
+    'avg_sentence_length',
+]
+
+# FeatureExtractor helper computing each group of features, in helper result order
+FEATURE_SOURCES = {
+    '_count_words': ('word_count',),
+    '_count_code_blocks': ('code_blocks',),
+    '_analyze_lines': ('headings', 'bullet_points', 'numbered_lists', 'paragraph_count'),
+    '_count_keywords': (
+        'technical_terms', 'has_error_keyword', 'has_solution_keyword',
+        'has_cause_keyword', 'has_alternative_keyword'
+    ),
+    '_find_visual_markers': ('has_visual_markers',),
+    '_count_sentences': ('sentence_count', 'avg_sentence_length'),
+}
+
+# Feature name -> helper computing it
+FEATURE_SOURCE = {name: helper for helper, names in FEATURE_SOURCES.items() for name in names}
+
+
+class Features:
+    """
+    Features of one response
+
+    A fixed set of slots instead of a 14-key dict per response. Values are
+    read as attributes or, like a dict, by name (features['word_count']).
+
+    Features created with the response text are computed on first read,
+    together with the others of their FEATURE_SOURCES group, and kept in
+    their slot: scoring only pays for the features its criteria read.
+    """
+
+    __slots__ = tuple(FEATURE_NAMES) + ('_text',)
+
+    def __init__(self, *values: Any, text: str = None):
+        """
+        Args:
+            values: One value per FEATURE_NAMES entry, in that order (or none)
+            text: Response text to compute features without a value from
+        """
+        for name, value in zip(FEATURE_NAMES, values):
+            setattr(self, name, value)
+        if text is not None:
+            self._text = text
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any], text: str = None) -> 'Features':
+        """
+        Features from some values keyed by name (e.g. computed())
+
+        Args:
+            values: Known feature values
+            text: Response text to compute the other features from
+        """
+        features = cls(text=text)
+        for name, value in values.items():
+            setattr(features, name, value)
+        return features
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for empty slots, i.e. features not computed yet
+        helper = FEATURE_SOURCE.get(name)
+        if helper is None:
+            raise AttributeError(name)
+        for feature, value in zip(FEATURE_SOURCES[helper], getattr(FeatureExtractor, helper)(self._text)):
+            setattr(self, feature, value)
+        return object.__getattribute__(self, name)
+
+    def __getitem__(self, name: str) -> Any:
+        return getattr(self, name)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Features):
+            return self.values() == other.values()
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Features({self.to_dict()})"
+
+    def values(self) -> List[Any]:
+        """Values in FEATURE_NAMES order (computes all features)"""
+        return [getattr(self, name) for name in FEATURE_NAMES]
+
+    def computed(self) -> Dict[str, Any]:
+        """Features computed so far, keyed by name"""
+        computed = {}
+        for name in FEATURE_NAMES:
+            try:
+                computed[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        return computed
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Features as a dict keyed by FEATURE_NAMES"""
+        return dict(zip(FEATURE_NAMES, self.values()))
 
 
 class FeatureExtractor:
     """Extract features from LLM response text"""
 
+    FEATURE_NAMES = FEATURE_NAMES
+
+    FEATURE_INDEX = {name: index for index, name in enumerate(FEATURE_NAMES)}
+
     @staticmethod
-    def extract(text: str) -> Dict[str, Any]:
+    def extract(text: str) -> Features:
         """
-        Extract all features from response text
+        Extract features from response text
+
+        Nothing is computed here: each feature is computed when it is first
+        read (see Features), so only the features the active scoring
+        criteria need (Scorer.required_features) cost anything.
 
         Args:
             text: LLM response text
 
         Returns:
-            Dictionary of features
+            Features of the text
         """
         if not text or text.startswith('Error:'):
             return FeatureExtractor._empty_features()
-
-        return {
-            'word_count': FeatureExtractor._count_words(text),
-            'code_blocks': FeatureExtractor._count_code_blocks(text),
-            'headings': FeatureExtractor._count_headings(text),
-            'bullet_points': FeatureExtractor._count_bullet_points(text),
-            'numbered_lists': FeatureExtractor._count_numbered_lists(text),
-            'technical_terms': FeatureExtractor._count_technical_terms(text),
-            'has_error_keyword': FeatureExtractor._has_keywords(text, ['hata', 'error', 'kod']),
-            'has_solution_keyword': FeatureExtractor._has_keywords(text, SOLUTION_KEYWORDS),
-            'has_cause_keyword': FeatureExtractor._has_keywords(text, CAUSE_KEYWORDS),
-            'has_alternative_keyword': FeatureExtractor._has_keywords(text, ALTERNATIVE_KEYWORDS),
-            'paragraph_count': FeatureExtractor._count_paragraphs(text),
-            'has_visual_markers': FeatureExtractor._has_visual_markers(text),
-            'sentence_count': FeatureExtractor._count_sentences(text),
-            'avg_sentence_length': FeatureExtractor._avg_sentence_length(text),
-        }
-
-    @staticmethod
-    def _empty_features() -> Dict[str, Any]:
-        """Return empty feature dict for failed responses"""
-        return {
-            'word_count': 0,
-            'code_blocks': 0,
-            'headings': 0,
-            'bullet_points': 0,
-            'numbered_lists': 0,
-            'technical_terms': 0,
-            'has_error_keyword': False,
-            'has_solution_keyword': False,
-            'has_cause_keyword': False,
-            'has_alternative_keyword': False,
-            'paragraph_count': 0,
-            'has_visual_markers': False,
-            'sentence_count': 0,
-            'avg_sentence_length': 0,
-        }
+        return Features(text=text)
 
     @staticmethod
-    def _count_words(text: str) -> int:
-        """Count words in text"""
-        return len(text.split())
+    def to_row(features: Features, names: Collection[str] = None) -> List[float]:
+        """
+        Convert features to one row of the columnar feature table
 
-    @staticmethod
-    def _count_code_blocks(text: str) -> int:
-        """Count code blocks (```)"""
-        return text.count('```') // 2
+        Args:
+            features: Output of extract() (or a dict keyed by FEATURE_NAMES)
+            names: Features to read (default: all); the others are 0.0 and
+                are not computed
 
-    @staticmethod
-    def _count_headings(text: str) -> int:
-        """Count markdown headings"""
-        return len(re.findall(r'^#+\s', text, re.MULTILINE))
+        Returns:
+            Feature values in FEATURE_NAMES order (booleans as 0.0/1.0)
+        """
+        if names is None:
+            return [float(features[name]) for name in FEATURE_NAMES]
+        return [float(features[name]) if name in names else 0.0 for name in FEATURE_NAMES]
 
     @staticmethod
-    def _count_bullet_points(text: str) -> int:
-        """Count bullet points"""
-        return len(re.findall(r'^\s*[-*•]\s', text, re.MULTILINE))
+    def _empty_features() -> Features:
+        """Return empty features for failed responses"""
+        return Features(0, 0, 0, 0, 0, 0, False, False, False, False, 0, False, 0, 0)
 
-    @staticmethod
-    def _count_numbered_lists(text: str) -> int:
-        """Count numbered lists"""
-        return len(re.findall(r'^\s*\d+[\.)]\s', text, re.MULTILINE))
+    # Helpers computing one FEATURE_SOURCES group each
 
     @staticmethod
-    def _count_technical_terms(text: str) -> int:
-        """Count technical keywords"""
-        text_lower = text.lower()
-        count = 0
-        for keyword in TECHNICAL_KEYWORDS:
-            count += text_lower.count(keyword.lower())
-        return count
+    def _count_words(text: str) -> Tuple[int]:
+        """Count whitespace-separated words"""
+        return len(text.split()),
 
     @staticmethod
-    def _has_keywords(text: str, keywords: list) -> bool:
-        """Check if text contains any of the keywords"""
-        text_lower = text.lower()
-        return any(keyword.lower() in text_lower for keyword in keywords)
+    def _count_code_blocks(text: str) -> Tuple[int]:
+        """Count fenced code blocks"""
+        return text.count('```') // 2,
 
     @staticmethod
-    def _count_paragraphs(text: str) -> int:
-        """Count paragraphs"""
-        paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-        return len(paragraphs)
+    def _analyze_lines(text: str) -> Tuple[int, int, int, int]:
+        """Count headings, bullet points, numbered list items and paragraphs in one pass"""
+        return TextAnalyzer.analyze_lines(text)
 
     @staticmethod
-    def _has_visual_markers(text: str) -> bool:
-        """Check for emoji/visual markers"""
-        markers = ['✅', '❌', '🔍', '⚠️', '💡', '🚀', '📝', '🎯', '⏱️', '💾']
-        return any(marker in text for marker in markers)
+    def _count_keywords(text: str) -> Tuple[int, bool, bool, bool, bool]:
+        """Count technical/error/solution/cause/alternative keywords in one pass"""
+        counts = KEYWORD_MATCHER.scan(text.lower())
+        return (
+            counts['technical'], counts['error'] > 0, counts['solution'] > 0,
+            counts['cause'] > 0, counts['alternative'] > 0
+        )
 
     @staticmethod
-    def _count_sentences(text: str) -> int:
-        """Count sentences"""
-        # Simple sentence detection
-        sentences = re.split(r'[.!?]+', text)
-        return len([s for s in sentences if s.strip()])
+    def _find_visual_markers(text: str) -> Tuple[bool]:
+        """Whether the text contains visual markers"""
+        return TextAnalyzer.has_visual_markers(text),
 
     @staticmethod
-    def _avg_sentence_length(text: str) -> float:
-        """Calculate average sentence length"""
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        if not sentences:
-            return 0
-        total_words = sum(len(s.split()) for s in sentences)
-        return total_words / len(sentences)
+    def _count_sentences(text: str) -> Tuple[int, float]:
+        """Count sentences and their average length in words"""
+        return TextAnalyzer.sentence_stats(text)
@@ -0,0 +1,250 @@
+"""
+State Store for Incremental Evaluation
+"""
+
+import hashlib
+import json
+import sqlite3
+from typing import Dict, List, Any, Callable, Iterable, Optional, Tuple
+import numpy as np
+import config
+import scorer
+from aggregator import ScoreAggregator, BreakdownAggregator
+from feature_cache import EXTRACTOR_VERSION
+from scorer import Scorer
+
+
+# Bumped whenever the layout of the state file changes
+STATE_FORMAT = 5
+
+
+def _scoring_version() -> str:
+    """
+    Fingerprint of everything that influences stored scores
+
+    Stored per-row scores and aggregates are only valid for the weights,
+    thresholds, scoring code and extractor they were computed with; any
+    change forces a full rebuild.
+    """
+    digest = hashlib.sha256()
+    with open(scorer.__file__, 'rb') as f:
+        digest.update(f.read())
+    settings = [
+        STATE_FORMAT, config.WEIGHTS, config.LLM_NAMES,
+        config.WORD_COUNT_OPTIMAL, config.WORD_COUNT_ACCEPTABLE, config.WORD_COUNT_POOR,
+        config.RESPONSE_TIME_EXCELLENT, config.RESPONSE_TIME_GOOD, config.RESPONSE_TIME_ACCEPTABLE,
+        EXTRACTOR_VERSION
+    ]
+    digest.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+SCORING_VERSION = _scoring_version()
+
+SCORE_COLUMNS = Scorer.CRITERIA + ['total']
+
+
+class IncrementalState:
+    """
+    Running per-LLM aggregates and per-row scores
+
+    Per-row scores are kept so that rows which changed or were deleted since
+    the last run can be subtracted from the aggregates exactly. Which rows
+    changed comes from the database's change log (llm_responses_changes,
+    see src/database/upgrade-evaluation-incremental.sql), not from this file.
+    """
+
+    def __init__(self, path: str = config.EVAL_STATE_PATH):
+        """
+        Open (or create) the state file
+
+        Args:
+            path: SQLite file path
+        """
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._create_row_scores()
+        self.conn.commit()
+
+        if self._get('scoring_version') != SCORING_VERSION:
+            if self._get('scoring_version') is not None:
+                print("⚠️  Scoring configuration changed, rebuilding incremental state")
+            self.reset()
+
+    def _create_row_scores(self):
+        """Create the per-row scores table"""
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS row_scores ("
+            " row_id INTEGER NOT NULL, llm_name TEXT NOT NULL,"
+            " error_category TEXT, error_code TEXT, response_time REAL, "
+            + ", ".join(f"{column} REAL NOT NULL" for column in SCORE_COLUMNS) +
+            ", PRIMARY KEY (row_id, llm_name))"
+        )
+
+    def _get(self, key: str) -> Any:
+        """Read a meta value"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set(self, key: str, value: Any):
+        """Write a meta value (inside the current transaction)"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value))
+        )
+
+    def reset(self):
+        """Forget all aggregates and row scores"""
+        self.conn.execute("DELETE FROM meta")
+        self.conn.execute("DROP TABLE IF EXISTS row_scores")
+        self._create_row_scores()
+        self._set('scoring_version', SCORING_VERSION)
+        self.conn.commit()
+
+    @property
+    def synced(self) -> bool:
+        """Whether every row has been scored once (later runs only apply the change log)"""
+        return bool(self._get('synced'))
+
+    def load_aggregator(self) -> ScoreAggregator:
+        """Restore the running aggregates"""
+        state = self._get('aggregates')
+        return ScoreAggregator.from_state(state) if state else ScoreAggregator()
+
+    def load_breakdown(self, on_row_winner: Callable[[int, str, str], None] = None) -> BreakdownAggregator:
+        """Restore the per-category / per-code breakdowns and row win counts"""
+        state = self._get('breakdown')
+        if state:
+            return BreakdownAggregator.from_state(state, on_row_winner=on_row_winner)
+        return BreakdownAggregator(on_row_winner=on_row_winner)
+
+    def row_scores(self, row_id: int) -> Optional[Tuple[str, str, List[Tuple[str, Dict[str, float], float]]]]:
+        """
+        Stored scores of one row
+
+        Returns:
+            (error_category, error_code, [(llm_name, scores, response_time), ...]),
+            or None if the row was never scored
+        """
+        rows = self.conn.execute(
+            f"SELECT error_category, error_code, llm_name, response_time, {', '.join(SCORE_COLUMNS)} "
+            "FROM row_scores WHERE row_id = ?",
+            (row_id,)
+        ).fetchall()
+        if not rows:
+            return None
+        return rows[0][0], rows[0][1], [(row[2], dict(zip(SCORE_COLUMNS, row[4:])), row[3]) for row in rows]
+
+    def score_matrix(self, llm_names: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Stored scores of every row, including uncommitted writes of this run
+
+        Args:
+            llm_names: LLM order of the second axis
+
+        Returns:
+            (row_ids, scores) sorted by row id, scores of shape
+            (rows, len(llm_names), len(SCORE_COLUMNS)); rows missing an LLM
+            are left out
+        """
+        llm_index = {llm_name: index for index, llm_name in enumerate(llm_names)}
+        rows: Dict[int, List[Any]] = {}
+        for row in self.conn.execute(
+            f"SELECT row_id, llm_name, {', '.join(SCORE_COLUMNS)} FROM row_scores ORDER BY row_id"
+        ):
+            index = llm_index.get(row[1])
+            if index is not None:
+                rows.setdefault(row[0], [None] * len(llm_names))[index] = row[2:]
+
+        complete = {row_id: values for row_id, values in rows.items() if None not in values}
+        return (
+            np.fromiter(complete, dtype=np.int64, count=len(complete)),
+            np.array(list(complete.values()), dtype=np.float64).reshape(-1, len(llm_names), len(SCORE_COLUMNS))
+        )
+
+    def delete_rows(self, row_ids: Iterable[int]):
+        """Drop stored scores of rows (committed by commit_run)"""
+        self.conn.executemany(
+            "DELETE FROM row_scores WHERE row_id = ?", [(row_id,) for row_id in row_ids]
+        )
+
+    def write_scores(self, scored_rows: Iterable[Tuple[int, str, str, str, Dict[str, float], float]]):
+        """
+        Store per-row scores (committed by commit_run)
+
+        Args:
+            scored_rows: (row_id, error_category, error_code, llm_name, scores,
+                response_time) for re-scored responses
+        """
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO row_scores "
+            f"(row_id, error_category, error_code, llm_name, response_time, {', '.join(SCORE_COLUMNS)}) "
+            f"VALUES (?, ?, ?, ?, ?, {', '.join('?' for _ in SCORE_COLUMNS)})",
+            (
+                (row_id, error_category, error_code, llm_name, response_time,
+                 *(scores[column] for column in SCORE_COLUMNS))
+                for row_id, error_category, error_code, llm_name, scores, response_time in scored_rows
+            )
+        )
+
+    def refresh_latency_extremes(self, aggregator: ScoreAggregator, breakdown: BreakdownAggregator):
+        """
+        Restore exact min/max response times of stale latency sketches
+
+        A sketch goes stale when the response holding its min or max is
+        removed; the extremes are then read back from the stored row scores,
+        including uncommitted writes of this run.
+
+        Args:
+            aggregator: Running aggregates (updated in place)
+            breakdown: Per-category / per-code breakdowns (updated in place)
+        """
+        scopes = [('all', {None: aggregator}), ('category', breakdown.categories), ('code', breakdown.error_codes)]
+        if not any(sketch.stale for _, groups in scopes for group in groups.values()
+                   for sketch in group.latencies.values()):
+            return
+
+        # (scope, group key, llm_name) -> [min, max]
+        extremes: Dict[Tuple[str, Optional[str], str], List[float]] = {}
+        for error_category, error_code, llm_name, minimum, maximum in self.conn.execute(
+            "SELECT error_category, error_code, llm_name, MIN(response_time), MAX(response_time) "
+            "FROM row_scores WHERE response_time IS NOT NULL GROUP BY error_category, error_code, llm_name"
+        ):
+            for scope, key in (('all', None), ('category', BreakdownAggregator.group_key(error_category)),
+                               ('code', BreakdownAggregator.group_key(error_code))):
+                known = extremes.setdefault((scope, key, llm_name), [minimum, maximum])
+                known[0] = min(known[0], minimum)
+                known[1] = max(known[1], maximum)
+
+        for scope, groups in scopes:
+            for key, group in groups.items():
+                for llm_name, sketch in group.latencies.items():
+                    if sketch.stale:
+                        sketch.set_extremes(*extremes.get((scope, key, llm_name), (None, None)))
+
+    def commit_run(self, aggregator: ScoreAggregator, breakdown: BreakdownAggregator):
+        """
+        Store aggregates and commit the run atomically
+
+        Stale latency extremes are refreshed first (see refresh_latency_extremes).
+
+        Args:
+            aggregator: Updated running aggregates
+            breakdown: Updated per-category / per-code breakdowns
+        """
+        self.refresh_latency_extremes(aggregator, breakdown)
+        self._set('aggregates', aggregator.to_state())
+        self._set('breakdown', breakdown.to_state())
+        self._set('synced', True)
+        self.conn.commit()
+
+    def rollback(self):
+        """Discard uncommitted changes of a failed run"""
+        self.conn.rollback()
+
+    def close(self):
+        """Close the state file"""
+        self.conn.close()
@@ -0,0 +1,122 @@
+"""
+Single-pass Keyword Matching for Feature Extraction
+"""
+
+from collections import Counter
+from typing import Dict, List, Tuple
+from config import (
+    TECHNICAL_KEYWORDS, SOLUTION_KEYWORDS, CAUSE_KEYWORDS,
+    ALTERNATIVE_KEYWORDS, ERROR_KEYWORDS
+)
+
+
+class KeywordMatcher:
+    """
+    Count keyword occurrences for several keyword groups in one pass
+
+    Matching keeps the semantics of ``str.count``: every keyword is counted
+    as a non-overlapping substring of the lowercased text, while different
+    keywords may overlap each other. A keyword listed twice in a group is
+    counted twice.
+
+    Single-word keywords can never span whitespace, so each occurrence lies
+    inside exactly one whitespace-separated token. The text is therefore
+    split once and every distinct token is looked up in a memo of per-group
+    hit counts; the memo is shared across responses, so a token is only
+    matched against the keyword lists the first time it is seen. The few
+    multi-word keywords are counted directly on the text.
+    """
+
+    TOKEN_CACHE_SIZE = 200_000
+
+    def __init__(self, groups: Dict[str, List[str]]):
+        """
+        Build the matcher
+
+        Args:
+            groups: Mapping of group name to keyword list
+        """
+        self.group_names = list(groups.keys())
+
+        # keyword -> multiplicity per group
+        weights: Dict[str, List[int]] = {}
+        for index, keywords in enumerate(groups.values()):
+            for keyword in keywords:
+                keyword = keyword.lower()
+                weights.setdefault(keyword, [0] * len(self.group_names))[index] += 1
+
+        self._words: List[Tuple[str, Tuple[int, ...]]] = [
+            (keyword, tuple(w)) for keyword, w in weights.items() if not self._is_phrase(keyword)
+        ]
+        self._phrases: List[Tuple[str, Tuple[int, ...]]] = [
+            (keyword, tuple(w)) for keyword, w in weights.items() if self._is_phrase(keyword)
+        ]
+        self._empty = (0,) * len(self.group_names)
+        self._token_cache: Dict[str, Tuple[int, ...]] = {}
+
+    @staticmethod
+    def _is_phrase(keyword: str) -> bool:
+        """Check if keyword contains whitespace"""
+        return any(ch.isspace() for ch in keyword)
+
+    def _match_token(self, token: str) -> Tuple[int, ...]:
+        """Match a token against all single-word keywords and memoize it"""
+        counts = None
+        for keyword, weight in self._words:
+            if keyword in token:
+                occurrences = token.count(keyword)
+                if counts is None:
+                    counts = list(self._empty)
+                for index, w in enumerate(weight):
+                    counts[index] += w * occurrences
+
+        hits = tuple(counts) if counts is not None else self._empty
+        self._token_cache[token] = hits
+        return hits
+
+    def scan(self, text_lower: str, tokens: List[str] = None) -> Dict[str, int]:
+        """
+        Count keyword occurrences for every group
+
+        Args:
+            text_lower: Lowercased response text
+            tokens: Optional precomputed ``text_lower.split()``
+
+        Returns:
+            Dictionary mapping group name to total keyword count
+        """
+        if tokens is None:
+            tokens = text_lower.split()
+
+        cache = self._token_cache
+        if len(cache) >= self.TOKEN_CACHE_SIZE:
+            cache.clear()
+
+        totals = [0] * len(self.group_names)
+        empty = self._empty
+
+        for token, n in Counter(tokens).items():
+            hits = cache.get(token)
+            if hits is None:
+                hits = self._match_token(token)
+            if hits is not empty:
+                for index, c in enumerate(hits):
+                    totals[index] += c * n
+
+        for phrase, weight in self._phrases:
+            occurrences = text_lower.count(phrase)
+            if occurrences:
+                for index, w in enumerate(weight):
+                    totals[index] += w * occurrences
+
+        return dict(zip(self.group_names, totals))
+
+
+# Built once at import time from the config keyword lists
+KEYWORD_MATCHER = KeywordMatcher({
+    'technical': TECHNICAL_KEYWORDS,
+    'error': ERROR_KEYWORDS,
+    'solution': SOLUTION_KEYWORDS,
+    'cause': CAUSE_KEYWORDS,
+    'alternative': ALTERNATIVE_KEYWORDS,
+})
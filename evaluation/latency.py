@@ -0,0 +1,211 @@
+"""
+Streaming Response Time Quantiles
+"""
+
+import math
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+
+
+# Buckets per power of two; a bucket spans 1/SUB_BUCKETS of its lower bound,
+# so reported quantiles are within 0.4% of the exact order statistic
+SUB_BUCKETS = 128
+
+# Percentiles reported per LLM and error category
+QUANTILES = {'p50': 0.50, 'p95': 0.95, 'p99': 0.99}
+
+
+class LatencySketch:
+    """
+    Mergeable quantile sketch of response times (HDR-style log histogram)
+
+    Values are counted in logarithmic buckets found exactly with frexp, so
+    single values and NumPy batches land in the same buckets. Counts are
+    integers: adding, removing and merging are exact and order independent,
+    so serial, sharded and incremental evaluations report identical
+    percentiles. Memory depends on the spread of the values (at most
+    SUB_BUCKETS buckets per power of two), not on their number.
+
+    The exact smallest and largest values are tracked next to the buckets.
+    Removing one of them leaves the sketch unable to tell the next one, so
+    it is marked stale until set_extremes() restores them (see
+    IncrementalState.commit_run).
+    """
+
+    __slots__ = ('buckets', 'zeros', 'minimum', 'maximum', 'stale')
+
+    def __init__(self):
+        # Bucket index -> number of values
+        self.buckets: Dict[int, int] = {}
+        # Values <= 0 ms
+        self.zeros = 0
+        # Exact extremes (None without values)
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+        # Whether an extreme was removed since the extremes were last known
+        self.stale = False
+
+    @staticmethod
+    def bucket(value: float) -> int:
+        """Bucket index of a positive value"""
+        mantissa, exponent = math.frexp(value)
+        return exponent * SUB_BUCKETS + int((mantissa * 2 - 1) * SUB_BUCKETS)
+
+    @staticmethod
+    def bucket_value(index: int) -> float:
+        """Midpoint of a bucket"""
+        exponent, sub_bucket = divmod(index, SUB_BUCKETS)
+        return math.ldexp(1 + (sub_bucket + 0.5) / SUB_BUCKETS, exponent - 1)
+
+    def add(self, value: Optional[float], count: int = 1):
+        """
+        Count a response time
+
+        Args:
+            value: Response time in ms; None and NaN (unknown) are ignored
+            count: Number of occurrences (negative to remove)
+        """
+        if value is None or value != value:
+            return
+        if count > 0:
+            self._extend(float(value), float(value))
+        elif value == self.minimum or value == self.maximum:
+            self.stale = True
+        if value <= 0:
+            self.zeros += count
+        else:
+            self._count(self.bucket(value), count)
+        if count < 0 and not self.zeros and not self.buckets:
+            self.set_extremes(None, None)
+
+    def _extend(self, minimum: float, maximum: float):
+        """Widen the extremes to include a range of added values"""
+        if self.minimum is None or minimum < self.minimum:
+            self.minimum = minimum
+        if self.maximum is None or maximum > self.maximum:
+            self.maximum = maximum
+
+    def set_extremes(self, minimum: Optional[float], maximum: Optional[float]):
+        """
+        Restore the exact extremes of a stale sketch
+
+        Args:
+            minimum: Smallest value counted (None without values)
+            maximum: Largest value counted (None without values)
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.stale = False
+
+    def _count(self, index: int, count: int):
+        """Change the count of a bucket, dropping empty buckets"""
+        remaining = self.buckets.get(index, 0) + count
+        if remaining:
+            self.buckets[index] = remaining
+        else:
+            del self.buckets[index]
+
+    def remove(self, value: Optional[float]):
+        """Uncount a response time passed to add() before"""
+        self.add(value, -1)
+
+    def add_many(self, values: np.ndarray):
+        """
+        Count an array of response times (NaN = unknown), as add() does
+
+        Args:
+            values: Response times in ms
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self._extend(float(values.min()), float(values.max()))
+        positive = values[values > 0]
+        self.zeros += len(values) - len(positive)
+        if not len(positive):
+            return
+
+        mantissas, exponents = np.frexp(positive)
+        indices = (
+            exponents.astype(np.int64) * SUB_BUCKETS
+            + np.floor((mantissas * 2 - 1) * SUB_BUCKETS).astype(np.int64)
+        )
+        for index, count in zip(*(array.tolist() for array in np.unique(indices, return_counts=True))):
+            self._count(index, count)
+
+    def merge(self, other: 'LatencySketch'):
+        """Add all values of another sketch"""
+        if other.minimum is not None:
+            self._extend(other.minimum, other.maximum)
+        self.stale = self.stale or other.stale
+        self.zeros += other.zeros
+        for index, count in other.buckets.items():
+            self._count(index, count)
+
+    @property
+    def count(self) -> int:
+        """Number of values"""
+        return self.zeros + sum(self.buckets.values())
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Nearest-rank quantile: the smallest value at or above a fraction q of all values
+
+        Args:
+            q: Quantile in [0, 1] (0 = smallest value)
+
+        Returns:
+            Response time in ms (bucket midpoint), None without values
+        """
+        count = self.count
+        if not count:
+            return None
+        rank = max(1, math.ceil(round(q * count, 9)))
+        seen = self.zeros
+        if seen >= rank:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return self.bucket_value(index)
+        return self.bucket_value(max(self.buckets))
+
+    def extremes(self) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Smallest and largest value
+
+        Returns:
+            (min, max) in ms; exact unless the sketch is stale, when the
+            extreme buckets' midpoints are returned instead
+        """
+        if self.stale:
+            return self.quantile(0.0), self.quantile(1.0)
+        return self.minimum, self.maximum
+
+    def summary(self) -> Dict[str, Any]:
+        """Number of timed responses and their min/p50/p95/p99/max in ms (None without values)"""
+        minimum, maximum = self.extremes()
+        values = [('min', minimum)] + [(name, self.quantile(q)) for name, q in QUANTILES.items()]
+        values.append(('max', maximum))
+        summary: Dict[str, Any] = {'responses': self.count}
+        for name, value in values:
+            summary[name] = round(value, 1) if value is not None else None
+        return summary
+
+    def to_state(self) -> Dict[str, Any]:
+        """Serialize the counts and extremes (JSON-compatible, exact)"""
+        return {
+            'zeros': self.zeros, 'buckets': sorted(self.buckets.items()),
+            'min': self.minimum, 'max': self.maximum, 'stale': self.stale
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'LatencySketch':
+        """Restore a sketch serialized with to_state()"""
+        sketch = cls()
+        sketch.zeros = state['zeros']
+        sketch.buckets = {int(index): count for index, count in state['buckets']}
+        sketch.minimum = state['min']
+        sketch.maximum = state['max']
+        sketch.stale = state['stale']
+        return sketch
@@ -2,26 +2,41 @@
 Main script to run LLM evaluation
 """
 
+import argparse
 import json
+import os
 import sys
 from datetime import datetime
-from evaluator import LLMEvaluator
+from config import (
+    STREAM_ITERSIZE, WORKER_CHUNK_SIZE, FEATURE_CACHE_PATH, ASYNC_QUEUE_SIZE, BOOTSTRAP_RESAMPLES,
+    SPEED_QUANTILE, SERVICE_HOST, SERVICE_PORT, WATCH_CHANNEL, WATCH_MAX_DELAY, WATCH_BATCH_SIZE
+)
+
+# The evaluator, database driver and profiler are imported by the commands
+# that need them, so `score-text` and `report` start without them
+
+COMMANDS = ['evaluate', 'score-text', 'report', 'serve', 'watch']
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
-    import os
-    os.system('chcp 65001 >nul')
     sys.stdout.reconfigure(encoding='utf-8')
     sys.stderr.reconfigure(encoding='utf-8')
 
 
-def print_results(results):
+def format_points(points, maximum):
+    """Average criterion points as 'x/maximum' (None: weight 0, not scored)"""
+    return "not scored (weight 0)" if points is None else f"{points:.2f}/{maximum}"
+
+
+def print_results(results, evaluation_date=None):
     """Print evaluation results in a nice format"""
+    evaluation_date = evaluation_date or datetime.now()
+
     print("\n" + "="*70)
     print("📊 LLM EVALUATION RESULTS")
     print("="*70 + "\n")
 
-    print(f"📅 Evaluation Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    print(f"📅 Evaluation Date: {evaluation_date.strftime('%Y-%m-%d %H:%M:%S')}\n")
 
     # Rankings
     print("🏆 OVERALL RANKING:\n")
@@ -42,19 +57,70 @@ def print_results(results):
     for llm_name in [llm for llm, _ in results['ranking']]:
         details = results['details'][llm_name]
         print(f"   {llm_name.upper()}:")
-        print(f"      Technical Accuracy:  {details['criterion_scores']['technical_accuracy']:.2f}/25")
-        print(f"      Solution Quality:    {details['criterion_scores']['solution_quality']:.2f}/25")
-        print(f"      Clarity:             {details['criterion_scores']['clarity']:.2f}/20")
-        print(f"      Conciseness:         {details['criterion_scores']['conciseness']:.2f}/10")
-        print(f"      Speed:               {details['criterion_scores']['speed']:.2f}/10")
-        print(f"      Reliability:         {details['criterion_scores']['reliability']:.2f}/10")
+        criterion_scores = details['criterion_scores']
+        print(f"      Technical Accuracy:  {format_points(criterion_scores['technical_accuracy'], 25)}")
+        print(f"      Solution Quality:    {format_points(criterion_scores['solution_quality'], 25)}")
+        print(f"      Clarity:             {format_points(criterion_scores['clarity'], 20)}")
+        print(f"      Conciseness:         {format_points(criterion_scores['conciseness'], 10)}")
+        speed_basis = ""
+        if 'speed_quantile' in results and criterion_scores['speed'] is not None:
+            speed_basis = f"  (p{results['speed_quantile'] * 100:g} latency)"
+        print(f"      Speed:               {format_points(criterion_scores['speed'], 10)}{speed_basis}")
+        print(f"      Reliability:         {format_points(criterion_scores['reliability'], 10)}")
         print(f"      ─────────────────────────────────────")
         print(f"      TOTAL:               {details['average_score']:.2f}/100\n")
 
-    print("="*70 + "\n")
+    print("-"*70 + "\n")
+
+    # Latency percentiles (not in files written by older versions)
+    if all('latency' in results['details'][llm_name] for llm_name, _ in results['ranking']):
+        print("⏱️  RESPONSE TIME PERCENTILES (ms):\n")
+        print(f"   {'':25} {'min':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  timed")
+        for llm_name, _ in results['ranking']:
+            latency = results['details'][llm_name]['latency']
+            values = ' '.join(
+                f"{latency[key]:>9.0f}" if latency[key] is not None else f"{'-':>9}"
+                for key in ('min', 'p50', 'p95', 'p99', 'max')
+            )
+            print(f"   {llm_name.upper().ljust(25)} {values}  {latency['responses']}")
+        print("\n" + "-"*70 + "\n")
+
+    # Per-row winners
+    print("🎯 PER-ERROR WINS (best / worst on individual errors):\n")
+    for llm_name, wins in sorted(results['row_wins'].items(), key=lambda item: -item[1]['best']):
+        print(f"   {llm_name.upper().ljust(25)} {wins['best']:>6} best  {wins['worst']:>6} worst")
 
+    print("\n" + "-"*70 + "\n")
+
+    # Bootstrap confidence intervals
+    if 'confidence' in results:
+        confidence = results['confidence']
+        print(f"📏 {confidence['confidence']:.0%} CONFIDENCE INTERVALS "
+              f"({confidence['resamples']} bootstrap resamples over {confidence['rows']} errors):\n")
+        for llm_name, _ in results['ranking']:
+            stats = confidence['llms'][llm_name]
+            low, high = stats['interval']
+            print(f"   {llm_name.upper().ljust(25)} {low:6.2f} - {high:6.2f}   "
+                  f"best in {stats['best_probability']:6.1%}")
+
+        ranked = [llm for llm, _ in results['ranking']]
+        print("\n   Win probability vs. next in ranking:")
+        for better, worse in zip(ranked, ranked[1:]):
+            print(f"      {better} > {worse}: {confidence['win_probabilities'][better][worse]:.1%}")
+
+        print("\n" + "-"*70 + "\n")
+
+    # Per-category breakdown
+    print("🗂️  BEST / WORST BY ERROR CATEGORY:\n")
+    for category, summary in results['categories'].items():
+        print(f"   {str(category).ljust(30)} ({summary['responses']} errors)")
+        print(f"      🏆 {summary['best_llm'].ljust(22)} {summary['scores'][summary['best_llm']]:.2f}")
+        print(f"      💔 {summary['worst_llm'].ljust(22)} {summary['scores'][summary['worst_llm']]:.2f}")
 
-def save_results(results, filename='evaluation_results.json'):
+    print("\n" + "="*70 + "\n")
+
+
+def save_results(results, filename='evaluation_results.json', quiet=False):
     """Save results to JSON file"""
     output = {
         'evaluation_date': datetime.now().isoformat(),
@@ -68,28 +134,448 @@ def save_results(results, filename='evaluation_results.json'):
             'name': results['worst_llm'],
             'score': results['scores'][results['worst_llm']]
         },
-        'detailed_scores': results['details']
+        'detailed_scores': results['details'],
+        'row_wins': results['row_wins'],
+        'categories': results['categories'],
+        'error_codes': results['error_codes']
     }
+    if 'confidence' in results:
+        output['confidence'] = results['confidence']
+    if 'speed_quantile' in results:
+        output['speed_quantile'] = results['speed_quantile']
 
-    with open(filename, 'w', encoding='utf-8') as f:
+    # Replaced in one step, so `report` never reads a half-written file
+    # while `watch` keeps updating it
+    temp_filename = f"{filename}.tmp"
+    with open(temp_filename, 'w', encoding='utf-8') as f:
         json.dump(output, f, indent=2, ensure_ascii=False)
+    os.replace(temp_filename, filename)
 
-    print(f"💾 Results saved to {filename}\n")
+    if not quiet:
+        print(f"💾 Results saved to {filename}\n")
 
 
-def main():
-    """Main execution"""
+def load_results(filename='evaluation_results.json'):
+    """
+    Read results written by save_results
+
+    Returns:
+        (results in the shape of LLMEvaluator.run(), evaluation date)
+    """
+    with open(filename, encoding='utf-8') as f:
+        saved = json.load(f)
+
+    results = {
+        'scores': saved['scores'],
+        'ranking': [(llm, score) for llm, score in saved['ranking']],
+        'best_llm': saved['best_llm']['name'],
+        'worst_llm': saved['worst_llm']['name'],
+        'details': saved['detailed_scores'],
+        # Not present in files written by older versions
+        'row_wins': saved.get('row_wins', {}),
+        'categories': saved.get('categories', {}),
+        'error_codes': saved.get('error_codes', {})
+    }
+    if 'confidence' in saved:
+        results['confidence'] = saved['confidence']
+    if 'speed_quantile' in saved:
+        results['speed_quantile'] = saved['speed_quantile']
+    return results, datetime.fromisoformat(saved['evaluation_date'])
+
+
+def save_profile(args, filename):
+    """Write the stage profile collected with --profile"""
+    from profiler import PROFILER
+
+    meta = {
+        'mode': (
+            'incremental' if args.incremental else
+            'sql_features' if args.sql_features else
+            'async' if args.async_pipeline else
+            'parallel' if args.workers > 1 else
+            'vectorized' if args.vectorized else
+            'stream' if args.stream else 'batch'
+        ),
+        'workers': args.workers,
+        'chunk_size': args.chunk_size,
+        'itersize': args.itersize,
+        'queue_size': args.queue_size,
+        'feature_cache': not args.no_feature_cache,
+        'snapshot': args.snapshot,
+        'normalized': args.normalized,
+        'sql_features': args.sql_features,
+        'bootstrap': args.bootstrap,
+        'speed_quantile': args.speed_quantile,
+        'dedup': args.dedup
+    }
+    cprofile_file = os.path.splitext(filename)[0] + '.prof'
+    PROFILER.write(filename, meta, cprofile_file)
+    PROFILER.disable()
+
+    print(f"⏱️  Profile saved to {filename}")
+    if args.profile_cprofile:
+        print(f"   cProfile data saved to {cprofile_file} (python -m pstats {cprofile_file})")
+    print()
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments
+
+    Without a command, `evaluate` is run, so `python main.py --stream`
+    keeps working.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS + ['-h', '--help']:
+        argv = ['evaluate'] + argv
+
+    parser = argparse.ArgumentParser(description="LLM evaluation")
+    commands = parser.add_subparsers(dest='command', metavar='command')
+
+    evaluate_parser = commands.add_parser(
+        'evaluate', help="Score all responses in the database (or a snapshot) and save the results (default)"
+    )
+    evaluate_parser.add_argument(
+        '--stream', action='store_true',
+        help="Stream rows through a server-side cursor instead of fetching the whole table"
+    )
+    evaluate_parser.add_argument(
+        '--itersize', type=int, default=STREAM_ITERSIZE,
+        help=f"Rows fetched per round trip in streaming mode (default: {STREAM_ITERSIZE})"
+    )
+    evaluate_parser.add_argument(
+        '--workers', type=int, default=1,
+        help="Number of scoring processes (default: 1, score in this process)"
+    )
+    evaluate_parser.add_argument(
+        '--chunk-size', type=int, default=WORKER_CHUNK_SIZE,
+        help=f"Rows per chunk sent to a worker process (default: {WORKER_CHUNK_SIZE})"
+    )
+    evaluate_parser.add_argument(
+        '--vectorized', action='store_true',
+        help="Score --chunk-size rows at a time with NumPy array operations"
+    )
+    evaluate_parser.add_argument(
+        '--async', dest='async_pipeline', action='store_true',
+        help="Fetch, score (--workers processes) and write results concurrently"
+    )
+    evaluate_parser.add_argument(
+        '--queue-size', type=int, default=ASYNC_QUEUE_SIZE,
+        help=f"With --async: chunks buffered between pipeline stages (default: {ASYNC_QUEUE_SIZE})"
+    )
+    evaluate_parser.add_argument(
+        '--incremental', action='store_true',
+        help="Only score rows added or changed since the last incremental run"
+    )
+    evaluate_parser.add_argument(
+        '--full', action='store_true',
+        help="With --incremental: rebuild the incremental state from scratch"
+    )
+    evaluate_parser.add_argument(
+        '--check', action='store_true',
+        help="With --incremental: verify the result against a full evaluation"
+    )
+    evaluate_parser.add_argument(
+        '--snapshot', metavar='PATH',
+        help="Evaluate a snapshot file offline instead of the database (see snapshot.py)"
+    )
+    evaluate_parser.add_argument(
+        '--normalized', action='store_true',
+        help="Read responses from the llm_responses table (see upgrade-llm-responses.sql)"
+    )
+    evaluate_parser.add_argument(
+        '--sql-features', action='store_true',
+        help="Read features computed by PostgreSQL instead of the texts (see sql_features.py)"
+    )
+    evaluate_parser.add_argument(
+        '--speed-quantile', type=float, default=SPEED_QUANTILE, metavar='Q',
+        help="Score speed by each LLM's Q response time quantile, e.g. 0.95 (default: average speed points)"
+    )
+    evaluate_parser.add_argument(
+        '--bootstrap', type=int, default=BOOTSTRAP_RESAMPLES, metavar='N',
+        help=f"Bootstrap resamples for confidence intervals, 0 = off (default: {BOOTSTRAP_RESAMPLES})"
+    )
+    evaluate_parser.add_argument(
+        '--feature-cache', default=FEATURE_CACHE_PATH,
+        help=f"Feature cache file reused across runs (default: {FEATURE_CACHE_PATH})"
+    )
+    evaluate_parser.add_argument(
+        '--no-feature-cache', action='store_true',
+        help="Extract features for every response without using the cache"
+    )
+    evaluate_parser.add_argument(
+        '--dedup', action='store_true',
+        help="Extract the features of each distinct response text once per run (see duplicates.py)"
+    )
+    evaluate_parser.add_argument(
+        '--profile', action='store_true',
+        help="Record wall time, calls and rows/sec per pipeline stage and extractor helper"
+    )
+    evaluate_parser.add_argument(
+        '--profile-cprofile', action='store_true',
+        help="With --profile: also run the evaluation under cProfile"
+    )
+    evaluate_parser.add_argument(
+        '--profile-memory', action='store_true',
+        help="With --profile: also trace memory allocations with tracemalloc"
+    )
+    evaluate_parser.add_argument(
+        '--profile-output', default='evaluation_profile.json',
+        help="Profile output file (default: evaluation_profile.json)"
+    )
+
+    score_text_parser = commands.add_parser(
+        'score-text', help="Score texts offline, e.g. as a pre-commit or CI check"
+    )
+    score_text_parser.add_argument(
+        'files', nargs='*', metavar='FILE',
+        help="Text files to score, - for stdin (default: stdin)"
+    )
+    score_text_parser.add_argument(
+        '--response-time', type=float, metavar='MS',
+        help="Response time used for the speed score (default: unknown, 0 points)"
+    )
+    score_text_parser.add_argument(
+        '--min-score', type=float, metavar='SCORE',
+        help="Exit with status 1 if any text scores below SCORE/100"
+    )
+    score_text_parser.add_argument(
+        '--json', action='store_true',
+        help="Print one JSON object per text"
+    )
+
+    report_parser = commands.add_parser('report', help="Print the results of the last evaluation")
+    report_parser.add_argument(
+        '--results', default='evaluation_results.json',
+        help="Results file written by evaluate (default: evaluation_results.json)"
+    )
+
+    serve_parser = commands.add_parser(
+        'serve', help="Score responses as they arrive (HTTP or JSON lines, see service.py)"
+    )
+    serve_parser.add_argument(
+        '--host', default=SERVICE_HOST,
+        help=f"Address to listen on (default: {SERVICE_HOST})"
+    )
+    serve_parser.add_argument(
+        '--port', type=int, default=SERVICE_PORT,
+        help=f"HTTP port (default: {SERVICE_PORT})"
+    )
+    serve_parser.add_argument(
+        '--stdio', action='store_true',
+        help="Read JSON-lines requests from stdin and answer on stdout instead of HTTP"
+    )
+
+    watch_parser = commands.add_parser(
+        'watch', help="Keep the results current as rows change (LISTEN/NOTIFY, see watcher.py)"
+    )
+    watch_parser.add_argument(
+        '--channel', default=WATCH_CHANNEL,
+        help=f"NOTIFY channel of the change trigger (default: {WATCH_CHANNEL})"
+    )
+    watch_parser.add_argument(
+        '--max-delay', type=float, default=WATCH_MAX_DELAY,
+        help=f"Longest a change waits for its micro-batch, in seconds (default: {WATCH_MAX_DELAY:g})"
+    )
+    watch_parser.add_argument(
+        '--batch-size', type=int, default=WATCH_BATCH_SIZE,
+        help=f"Waiting rows that start a micro-batch at once (default: {WATCH_BATCH_SIZE})"
+    )
+    watch_parser.add_argument(
+        '--speed-quantile', type=float, default=SPEED_QUANTILE, metavar='Q',
+        help="Score speed by each LLM's Q response time quantile (see evaluate)"
+    )
+    watch_parser.add_argument(
+        '--feature-cache', default=FEATURE_CACHE_PATH,
+        help=f"SQLite feature cache file (default: {FEATURE_CACHE_PATH})"
+    )
+    watch_parser.add_argument(
+        '--no-feature-cache', action='store_true',
+        help="Extract features without the cache"
+    )
+    watch_parser.add_argument(
+        '--results', default='evaluation_results.json',
+        help="Results file rewritten after every batch (default: evaluation_results.json)"
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == 'evaluate':
+        if args.snapshot and args.incremental:
+            evaluate_parser.error("--snapshot cannot be combined with --incremental")
+        if args.normalized and (args.incremental or args.snapshot):
+            evaluate_parser.error("--normalized cannot be combined with --incremental or --snapshot")
+        if args.sql_features and (args.incremental or args.snapshot or args.normalized or args.async_pipeline
+                                  or args.workers > 1 or args.vectorized):
+            evaluate_parser.error(
+                "--sql-features cannot be combined with --incremental, --snapshot, --normalized, "
+                "--async, --workers or --vectorized"
+            )
+        if (args.full or args.check) and not args.incremental:
+            evaluate_parser.error("--full and --check require --incremental")
+        # Each of these selects its own scoring path; a combination would
+        # silently run only one of them
+        if args.incremental and (args.workers > 1 or args.vectorized or args.async_pipeline):
+            evaluate_parser.error("--incremental cannot be combined with --workers, --vectorized or --async")
+        if args.vectorized and (args.workers > 1 or args.async_pipeline):
+            evaluate_parser.error("--vectorized cannot be combined with --workers or --async")
+        if args.speed_quantile is not None and not 0 < args.speed_quantile <= 1:
+            evaluate_parser.error("--speed-quantile must be in (0, 1]")
+        args.profile = args.profile or args.profile_cprofile or args.profile_memory
+    if args.command == 'watch':
+        if args.max_delay < 0 or args.batch_size < 1:
+            watch_parser.error("--max-delay must be >= 0 and --batch-size >= 1")
+        if args.speed_quantile is not None and not 0 < args.speed_quantile <= 1:
+            watch_parser.error("--speed-quantile must be in (0, 1]")
+    return args
+
+
+def read_texts(files):
+    """Yield (name, text) of each file; stdin for '-' or no files"""
+    for name in files or ['-']:
+        if name == '-':
+            yield '<stdin>', sys.stdin.read()
+        else:
+            with open(name, encoding='utf-8') as f:
+                yield name, f.read()
+
+
+def score_text(args):
+    """
+    Score texts without the database
+
+    Only the feature extractor and scorer are loaded, so a call takes a few
+    tens of milliseconds.
+
+    Returns:
+        Exit status: 1 if a text scored below --min-score, else 0
+    """
+    from scorer import Scorer
+    from service import score_response
+
+    status = 0
+    for name, text in read_texts(args.files):
+        scores = score_response(text, args.response_time)['scores']
+        passed = args.min_score is None or scores['total'] >= args.min_score
+        if not passed:
+            status = 1
+
+        if args.json:
+            print(json.dumps({'file': name, 'scores': scores, 'passed': passed}, ensure_ascii=False))
+        else:
+            criteria = ", ".join(
+                f"{criterion} {scores[criterion]:.0f}" for criterion in Scorer.CRITERIA
+            )
+            print(f"{'✅' if passed else '❌'} {name}: {scores['total']:.2f}/100 ({criteria})")
+
+    return status
+
+
+def report(args):
+    """
+    Print the results saved by the last evaluation
+
+    Returns:
+        Exit status: 1 if there are no saved results, else 0
+    """
+    try:
+        results, evaluation_date = load_results(args.results)
+    except FileNotFoundError:
+        print(f"❌ {args.results} not found, run `python main.py evaluate` first")
+        return 1
+
+    print_results(results, evaluation_date)
+    return 0
+
+
+def serve(args):
+    """Run the scoring service until interrupted (or stdin is closed)"""
+    from service import serve_http, serve_stdio
+
+    if args.stdio:
+        serve_stdio()
+    else:
+        serve_http(args.host, args.port)
+
+
+def watch(args):
+    """Keep evaluation_results.json current until interrupted"""
+    from db_pool import close_pool
+    from evaluator import LLMEvaluator
+    from watcher import EvaluationWatcher
+
+    print("\n" + "="*70)
+    print("🚀 LLM EVALUATION WATCHER")
+    print("="*70 + "\n")
+
+    # Bootstrap intervals are left to full evaluations; resampling after
+    # every micro-batch would dominate the latency
+    evaluator = LLMEvaluator(
+        incremental=True,
+        feature_cache_path=None if args.no_feature_cache else args.feature_cache,
+        bootstrap_resamples=0,
+        speed_quantile=args.speed_quantile
+    )
+    watcher = EvaluationWatcher(
+        evaluator, channel=args.channel, max_delay=args.max_delay, batch_size=args.batch_size,
+        on_results=lambda results: save_results(results, args.results, quiet=True)
+    )
+    print(f"💾 Results are kept current in {args.results}\n")
+    try:
+        watcher.run()
+    finally:
+        close_pool()
+
+
+def evaluate(args):
+    """Run the evaluation, print the results and save them"""
+    from evaluator import DatabaseSetupError, LLMEvaluator, instrument_pipeline
+    from profiler import PROFILER
+
     print("\n" + "="*70)
     print("🚀 LLM EVALUATION SYSTEM")
     print("="*70 + "\n")
 
+    if args.profile:
+        PROFILER.enable(cprofile=args.profile_cprofile, memory=args.profile_memory)
+        instrument_pipeline()
+
     # Run evaluation
-    evaluator = LLMEvaluator()
-    results = evaluator.run()
+    evaluator = LLMEvaluator(
+        stream=args.stream,
+        itersize=args.itersize,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        feature_cache_path=None if args.no_feature_cache else args.feature_cache,
+        vectorized=args.vectorized,
+        incremental=args.incremental,
+        full=args.full,
+        check=args.check,
+        async_pipeline=args.async_pipeline,
+        queue_size=args.queue_size,
+        snapshot_path=args.snapshot,
+        normalized=args.normalized,
+        sql_features=args.sql_features,
+        bootstrap_resamples=args.bootstrap,
+        speed_quantile=args.speed_quantile,
+        dedup=args.dedup
+    )
+    try:
+        results = evaluator.run()
+    except DatabaseSetupError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        # Offline snapshot evaluations never open the connection pool
+        if not args.snapshot:
+            from db_pool import close_pool
+            close_pool()
 
     # Print results (to console and file)
     print_results(results)
 
+    if args.profile:
+        PROFILER.print_summary()
+
     # Save detailed report to text file
     with open('evaluation_report.txt', 'w', encoding='utf-8') as f:
         original_stdout = sys.stdout
@@ -102,8 +588,27 @@ def main():
     # Save results
     save_results(results)
 
+    if args.profile:
+        save_profile(args, args.profile_output)
+
     print("✅ Evaluation complete!\n")
 
 
+def main():
+    """Main execution"""
+    args = parse_args()
+
+    if args.command == 'score-text':
+        sys.exit(score_text(args))
+    elif args.command == 'report':
+        sys.exit(report(args))
+    elif args.command == 'serve':
+        serve(args)
+    elif args.command == 'watch':
+        watch(args)
+    else:
+        evaluate(args)
+
+
 if __name__ == "__main__":
     main()
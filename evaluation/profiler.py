@@ -0,0 +1,295 @@
+"""
+Stage-Level Profiling of the Evaluation Pipeline
+"""
+
+import cProfile
+import io
+import json
+import platform
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from typing import Dict, List, Any, Callable, Iterable, Iterator
+import config
+
+
+class StageStats:
+    """Wall time, call count and processed rows of one stage"""
+
+    __slots__ = ('wall', 'calls', 'rows')
+
+    def __init__(self):
+        self.wall = 0.0
+        self.calls = 0
+        self.rows = 0
+
+
+class Profiler:
+    """
+    Collect per-stage timings of an evaluation run
+
+    Disabled by default: stage() and iterate() then add no timing calls,
+    and functions are only wrapped by instrument() while profiling is
+    enabled. Stage names are dotted (e.g. 'extract._count_words'); nested
+    stages are included in their parent's time.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stages: Dict[str, StageStats] = {}
+        self._patched: List[tuple] = []
+        self._cprofile = None
+        self._memory = False
+        self._started = None
+
+    def enable(self, cprofile: bool = False, memory: bool = False):
+        """
+        Start collecting timings
+
+        Args:
+            cprofile: Also run cProfile over the whole run
+            memory: Also trace allocations with tracemalloc
+        """
+        self.enabled = True
+        self._started = time.perf_counter()
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._memory = True
+        if cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def disable(self):
+        """Stop collecting timings and restore instrumented functions"""
+        if self._cprofile:
+            self._cprofile.disable()
+        for owner, name, original in reversed(self._patched):
+            setattr(owner, name, original)
+        self._patched = []
+        self.enabled = False
+
+    def reset(self):
+        """Zero collected timings (instrumented wrappers keep their stats objects)"""
+        for stats in self.stages.values():
+            stats.wall = 0.0
+            stats.calls = 0
+            stats.rows = 0
+
+    def _stats(self, name: str) -> StageStats:
+        """Get or create the stats of a stage"""
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        return stats
+
+    def record(self, name: str, wall: float, rows: int = 0, calls: int = 1):
+        """Add a measurement to a stage"""
+        stats = self._stats(name)
+        stats.wall += wall
+        stats.calls += calls
+        stats.rows += rows
+
+    @contextmanager
+    def stage(self, name: str, rows: int = 0) -> Iterator[StageStats]:
+        """
+        Time a block
+
+        Yields:
+            Stats of the block; assign `.rows` to report throughput when the
+            row count is only known at the end
+        """
+        block = StageStats()
+        block.rows = rows
+        if not self.enabled:
+            yield block
+            return
+
+        start = time.perf_counter()
+        try:
+            yield block
+        finally:
+            self.record(name, time.perf_counter() - start, block.rows)
+
+    def iterate(self, name: str, iterable: Iterable) -> Iterator:
+        """
+        Time the production of each item of an iterable (one row per item)
+
+        Only the time spent inside the iterable is counted, not the time the
+        consumer spends on each item.
+        """
+        if not self.enabled:
+            yield from iterable
+            return
+
+        stats = self._stats(name)
+        stats.calls += 1
+        iterator = iter(iterable)
+        clock = time.perf_counter
+        while True:
+            start = clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                stats.wall += clock() - start
+                return
+            stats.wall += clock() - start
+            stats.rows += 1
+            yield item
+
+    def timed(self, name: str, function: Callable) -> Callable:
+        """Wrap a function so that each call is recorded under `name`"""
+        clock = time.perf_counter
+        stats = self._stats(name)
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stats.wall += clock() - start
+                stats.calls += 1
+                stats.rows += 1
+
+        return wrapper
+
+    def instrument(self, owner: Any, names: List[str], prefix: str):
+        """
+        Replace methods of a class (or module functions) with timed wrappers
+
+        Wrappers are removed again by disable().
+
+        Args:
+            owner: Class or module holding the functions
+            names: Attribute names to wrap
+            prefix: Stage name prefix, e.g. 'extract'
+        """
+        if not self.enabled:
+            return
+
+        for name in names:
+            original = owner.__dict__[name] if isinstance(owner, type) else getattr(owner, name)
+            if isinstance(original, staticmethod):
+                wrapped = staticmethod(self.timed(f"{prefix}.{name}", original.__func__))
+            else:
+                wrapped = self.timed(f"{prefix}.{name}", original)
+            self._patched.append((owner, name, original))
+            setattr(owner, name, wrapped)
+
+    def snapshot(self) -> Dict[str, List[float]]:
+        """Picklable copy of the collected stats (e.g. from a worker process)"""
+        return {name: [s.wall, s.calls, s.rows] for name, s in self.stages.items() if s.calls}
+
+    def merge(self, snapshot: Dict[str, List[float]]):
+        """Add stats collected elsewhere (see snapshot())"""
+        for name, (wall, calls, rows) in snapshot.items():
+            self.record(name, wall, rows, calls)
+
+    def report(self, meta: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Build the machine-readable profile
+
+        Args:
+            meta: Extra run information (mode, row counts, ...)
+
+        Returns:
+            Dictionary with run metadata, per-stage stats and optional
+            cProfile / tracemalloc summaries
+        """
+        total = time.perf_counter() - self._started if self._started else 0.0
+
+        stages = {}
+        for name in sorted(self.stages):
+            stats = self.stages[name]
+            if not stats.calls:
+                continue
+            throughput = stats.rows or stats.calls
+            stages[name] = {
+                'wall_s': round(stats.wall, 6),
+                'calls': stats.calls,
+                'rows': stats.rows,
+                'rows_per_s': round(throughput / stats.wall, 1) if stats.wall > 0 else None,
+                'share': round(stats.wall / total, 4) if total > 0 else None
+            }
+
+        profile = {
+            'created_at': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'total_wall_s': round(total, 6),
+            'keyword_counts': {
+                'technical': len(config.TECHNICAL_KEYWORDS),
+                'error': len(config.ERROR_KEYWORDS),
+                'solution': len(config.SOLUTION_KEYWORDS),
+                'cause': len(config.CAUSE_KEYWORDS),
+                'alternative': len(config.ALTERNATIVE_KEYWORDS)
+            },
+            'run': meta or {},
+            'stages': stages
+        }
+
+        if self._cprofile:
+            profile['cprofile'] = self._cprofile_top()
+        if self._memory and tracemalloc.is_tracing():
+            profile['memory'] = self._memory_summary()
+
+        return profile
+
+    def _cprofile_top(self, limit: int = 30) -> List[Dict[str, Any]]:
+        """Functions with the highest cumulative time"""
+        stats = pstats.Stats(self._cprofile, stream=io.StringIO())
+        entries = []
+        for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+            entries.append({
+                'function': f"{filename}:{line}({function})",
+                'calls': calls,
+                'own_s': round(own, 6),
+                'cumulative_s': round(cumulative, 6)
+            })
+        entries.sort(key=lambda entry: -entry['cumulative_s'])
+        return entries[:limit]
+
+    @staticmethod
+    def _memory_summary(limit: int = 15) -> Dict[str, Any]:
+        """Current/peak traced memory and the largest allocation sites"""
+        current, peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics('lineno')[:limit]
+        return {
+            'current_bytes': current,
+            'peak_bytes': peak,
+            'top_allocations': [
+                {'location': str(stat.traceback), 'bytes': stat.size, 'blocks': stat.count}
+                for stat in top
+            ]
+        }
+
+    def write(self, path: str, meta: Dict[str, Any] = None, cprofile_path: str = None):
+        """
+        Write the JSON profile (and the raw cProfile data, if collected)
+
+        Args:
+            path: JSON output file
+            meta: Extra run information
+            cprofile_path: pstats output file (loadable with `python -m pstats`)
+        """
+        profile = self.report(meta)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, indent=2, ensure_ascii=False)
+        if self._cprofile and cprofile_path:
+            self._cprofile.dump_stats(cprofile_path)
+
+    def print_summary(self, limit: int = 15):
+        """Print the slowest stages"""
+        report = self.report()
+        print("⏱️  PROFILE (slowest stages):\n")
+        slowest = sorted(report['stages'].items(), key=lambda item: -item[1]['wall_s'])[:limit]
+        for name, stats in slowest:
+            rate = f"{stats['rows_per_s']:>12,.0f}/s" if stats['rows_per_s'] else " " * 14
+            print(f"   {name.ljust(36)} {stats['wall_s']:9.3f} s {stats['calls']:>9} calls {rate}")
+        print()
+
+
+# Shared profiler, enabled by `main.py --profile`
+PROFILER = Profiler()
@@ -0,0 +1,158 @@
+"""
+Persistence of Evaluation Runs and Per-Response Scores
+"""
+
+import json
+from typing import Dict, List, Any, Tuple
+from psycopg2.extras import execute_values
+from scorer import Scorer
+from config import RESULTS_PAGE_SIZE
+
+
+SCORE_COLUMNS = Scorer.CRITERIA + ['total']
+
+# Unchanged scores are skipped by the WHERE clause, so their rows are not rewritten
+UPSERT_SCORES_QUERY = f"""
+INSERT INTO evaluation_scores (error_id, llm_name, {', '.join(SCORE_COLUMNS)}, run_id)
+VALUES %s
+ON CONFLICT (error_id, llm_name) DO UPDATE SET
+    {', '.join(f'{column} = EXCLUDED.{column}' for column in SCORE_COLUMNS)},
+    run_id = EXCLUDED.run_id
+WHERE ({', '.join(f'evaluation_scores.{column}' for column in SCORE_COLUMNS)})
+    IS DISTINCT FROM ({', '.join(f'EXCLUDED.{column}' for column in SCORE_COLUMNS)})
+"""
+
+# Only rows whose winner changed are rewritten
+UPDATE_WINNERS_QUERY = """
+UPDATE llm_error_analysis AS t
+SET best_llm = v.best_llm, worst_llm = v.worst_llm
+FROM (VALUES %s) AS v (id, best_llm, worst_llm)
+WHERE t.id = v.id
+    AND (t.best_llm IS DISTINCT FROM v.best_llm OR t.worst_llm IS DISTINCT FROM v.worst_llm)
+"""
+
+
+class ResultsStore:
+    """
+    Write evaluation results to evaluation_runs / evaluation_scores
+
+    Per-response scores and per-row winners are buffered and written in pages
+    with execute_values. Nothing is committed until finish_run(), so a failed
+    run leaves the previous results untouched.
+    """
+
+    def __init__(self, conn, page_size: int = RESULTS_PAGE_SIZE):
+        """
+        Args:
+            conn: psycopg2 connection
+            page_size: Score rows per INSERT / winner rows per UPDATE statement
+        """
+        self.conn = conn
+        self.page_size = page_size
+        self.run_id = None
+        self.written = 0
+        self.unchanged = 0
+        self.winners_updated = 0
+        self._buffer: List[Tuple] = []
+        self._winners: List[Tuple] = []
+
+    def start_run(self) -> int:
+        """
+        Register a new evaluation run
+
+        Returns:
+            evaluation_runs.id of the run
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("INSERT INTO evaluation_runs DEFAULT VALUES RETURNING id")
+        self.run_id = cursor.fetchone()[0]
+        cursor.close()
+        return self.run_id
+
+    def add_score(self, error_id: int, llm_name: str, scores: Dict[str, float]):
+        """
+        Queue the scores of one response
+
+        Args:
+            error_id: llm_error_analysis.id
+            llm_name: LLM name
+            scores: Output of Scorer.score_response
+        """
+        self._buffer.append(
+            (error_id, llm_name, *(float(scores[column]) for column in SCORE_COLUMNS), self.run_id)
+        )
+        if len(self._buffer) >= self.page_size:
+            self.flush()
+
+    def add_row_winner(self, error_id: int, best_llm: str, worst_llm: str):
+        """
+        Queue the best/worst LLM of one llm_error_analysis row
+
+        Args:
+            error_id: llm_error_analysis.id
+            best_llm: LLM with the highest total score on the row
+            worst_llm: LLM with the lowest total score on the row
+        """
+        self._winners.append((error_id, best_llm, worst_llm))
+        if len(self._winners) >= self.page_size:
+            self.flush_winners()
+
+    def flush(self):
+        """Upsert queued scores and row winners"""
+        self.flush_winners()
+        if not self._buffer:
+            return
+
+        cursor = self.conn.cursor()
+        execute_values(cursor, UPSERT_SCORES_QUERY, self._buffer, page_size=len(self._buffer))
+        changed = max(cursor.rowcount, 0)
+        cursor.close()
+
+        self.written += changed
+        self.unchanged += len(self._buffer) - changed
+        self._buffer = []
+
+    def flush_winners(self):
+        """Write queued row winners"""
+        if not self._winners:
+            return
+
+        cursor = self.conn.cursor()
+        execute_values(cursor, UPDATE_WINNERS_QUERY, self._winners, page_size=len(self._winners))
+        self.winners_updated += max(cursor.rowcount, 0)
+        cursor.close()
+        self._winners = []
+
+    def finish_run(self, results: Dict[str, Any], description: str):
+        """
+        Store the run-level report and commit the run
+
+        Args:
+            results: Output of LLMEvaluator.evaluate_all_llms
+            description: Human readable report
+        """
+        self.flush()
+
+        report = {
+            'scores': results['scores'],
+            'ranking': results['ranking'],
+            'details': results['details']
+        }
+        if 'confidence' in results:
+            report['confidence'] = results['confidence']
+
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            UPDATE evaluation_runs
+            SET finished_at = CURRENT_TIMESTAMP,
+                best_llm = %s,
+                worst_llm = %s,
+                results = %s,
+                description = %s
+            WHERE id = %s
+            """,
+            (results['best_llm'], results['worst_llm'], json.dumps(report), description, self.run_id)
+        )
+        cursor.close()
+        self.conn.commit()
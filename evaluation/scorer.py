@@ -2,18 +2,61 @@
 Scoring Functions for LLM Evaluation
 """
 
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, FrozenSet, List
+from feature_extractor import FeatureExtractor, Features
 from config import (
     WORD_COUNT_OPTIMAL, WORD_COUNT_ACCEPTABLE, WORD_COUNT_POOR,
     RESPONSE_TIME_EXCELLENT, RESPONSE_TIME_GOOD, RESPONSE_TIME_ACCEPTABLE
 )
 
+# NumPy is imported in score_batch so scoring single responses does not load it
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class Scorer:
     """Score LLM responses based on various criteria"""
 
+    CRITERIA = [
+        'technical_accuracy',
+        'solution_quality',
+        'clarity',
+        'conciseness',
+        'speed',
+        'reliability'
+    ]
+
+    # Features read by each criterion's score function (and score_batch)
+    CRITERION_FEATURES = {
+        'technical_accuracy': ('has_error_keyword', 'has_cause_keyword', 'technical_terms', 'code_blocks'),
+        'solution_quality': ('has_solution_keyword', 'numbered_lists', 'bullet_points', 'code_blocks',
+                             'has_alternative_keyword'),
+        'clarity': ('headings', 'bullet_points', 'numbered_lists', 'paragraph_count', 'has_visual_markers'),
+        'conciseness': ('word_count',),
+        'speed': (),
+        'reliability': ()
+    }
+
+    @staticmethod
+    def active_criteria(weights: Dict[str, float]) -> List[str]:
+        """Criteria with a non-zero weight, in CRITERIA order; the others are not scored"""
+        return [criterion for criterion in Scorer.CRITERIA if weights.get(criterion)]
+
     @staticmethod
-    def score_technical_accuracy(features: Dict[str, Any]) -> float:
+    def required_features(criteria: List[str]) -> FrozenSet[str]:
+        """
+        Features needed to score the given criteria
+
+        Args:
+            criteria: Criterion names, e.g. active_criteria(weights)
+
+        Returns:
+            Names of FeatureExtractor features the criteria read
+        """
+        return frozenset(name for criterion in criteria for name in Scorer.CRITERION_FEATURES[criterion])
+
+    @staticmethod
+    def score_technical_accuracy(features: Features) -> float:
         """
         Score technical accuracy (0-25 points)
 
@@ -26,25 +69,25 @@ class Scorer:
         score = 0.0
 
         # Has error-related keywords
-        if features['has_error_keyword']:
+        if features.has_error_keyword:
             score += 5
 
         # Explains the cause
-        if features['has_cause_keyword']:
+        if features.has_cause_keyword:
             score += 5
 
         # Technical term density
-        tech_score = min(7, features['technical_terms'] // 3)
+        tech_score = min(7, features.technical_terms // 3)
         score += tech_score
 
         # Has code examples
-        if features['code_blocks'] > 0:
+        if features.code_blocks > 0:
             score += 8
 
         return min(25.0, score)
 
     @staticmethod
-    def score_solution_quality(features: Dict[str, Any]) -> float:
+    def score_solution_quality(features: Features) -> float:
         """
         Score solution quality (0-25 points)
 
@@ -57,25 +100,25 @@ class Scorer:
         score = 0.0
 
         # Mentions solution
-        if features['has_solution_keyword']:
+        if features.has_solution_keyword:
             score += 5
 
         # Has structured steps
-        if features['numbered_lists'] > 0 or features['bullet_points'] > 2:
+        if features.numbered_lists > 0 or features.bullet_points > 2:
             score += 8
 
         # Code examples
-        if features['code_blocks'] > 0:
+        if features.code_blocks > 0:
             score += 8
 
         # Alternative approaches
-        if features['has_alternative_keyword']:
+        if features.has_alternative_keyword:
             score += 4
 
         return min(25.0, score)
 
     @staticmethod
-    def score_clarity(features: Dict[str, Any]) -> float:
+    def score_clarity(features: Features) -> float:
         """
         Score clarity and structure (0-20 points)
 
@@ -88,25 +131,25 @@ class Scorer:
         score = 0.0
 
         # Has headings
-        if features['headings'] > 0:
+        if features.headings > 0:
             score += 5
 
         # Has lists
-        if features['bullet_points'] > 0 or features['numbered_lists'] > 0:
+        if features.bullet_points > 0 or features.numbered_lists > 0:
             score += 5
 
         # Multiple paragraphs (good structure)
-        if features['paragraph_count'] >= 3:
+        if features.paragraph_count >= 3:
             score += 5
 
         # Visual markers for readability
-        if features['has_visual_markers']:
+        if features.has_visual_markers:
             score += 5
 
         return min(20.0, score)
 
     @staticmethod
-    def score_conciseness(features: Dict[str, Any]) -> float:
+    def score_conciseness(features: Features) -> float:
         """
         Score conciseness (0-10 points)
 
@@ -114,7 +157,7 @@ class Scorer:
         Acceptable: 200-1000 words
         Poor: <100 or >1500 words
         """
-        wc = features['word_count']
+        wc = features.word_count
 
         if WORD_COUNT_OPTIMAL[0] <= wc <= WORD_COUNT_OPTIMAL[1]:
             return 10.0
@@ -184,10 +227,13 @@ class Scorer:
         return total
 
     @staticmethod
-    def score_response(features: Dict[str, Any], response_time: float, is_error: bool, weights: Dict[str, float]) -> Dict[str, float]:
+    def score_response(features: Features, response_time: float, is_error: bool, weights: Dict[str, float]) -> Dict[str, float]:
         """
         Score a single response across all criteria
 
+        Criteria with zero weight are not scored (0.0), so features only
+        they read are never computed.
+
         Args:
             features: Extracted features
             response_time: Response time in ms
@@ -198,14 +244,121 @@ class Scorer:
             Dictionary with individual scores and total
         """
         scores = {
-            'technical_accuracy': Scorer.score_technical_accuracy(features),
-            'solution_quality': Scorer.score_solution_quality(features),
-            'clarity': Scorer.score_clarity(features),
-            'conciseness': Scorer.score_conciseness(features),
-            'speed': Scorer.score_response_time(response_time),
-            'reliability': Scorer.score_reliability(is_error)
+            'technical_accuracy': Scorer.score_technical_accuracy(features) if weights['technical_accuracy'] else 0.0,
+            'solution_quality': Scorer.score_solution_quality(features) if weights['solution_quality'] else 0.0,
+            'clarity': Scorer.score_clarity(features) if weights['clarity'] else 0.0,
+            'conciseness': Scorer.score_conciseness(features) if weights['conciseness'] else 0.0,
+            'speed': Scorer.score_response_time(response_time) if weights['speed'] else 0.0,
+            'reliability': Scorer.score_reliability(is_error) if weights['reliability'] else 0.0
         }
 
         scores['total'] = Scorer.calculate_weighted_score(scores, weights)
 
         return scores
+
+    @staticmethod
+    def score_batch(features_table: 'np.ndarray', times: 'np.ndarray', is_error: 'np.ndarray',
+                    weights: Dict[str, float], criteria: List[str] = None) -> Dict[str, 'np.ndarray']:
+        """
+        Score many responses at once with array operations
+
+        Produces exactly the same values as calling score_response row by row.
+        Only the columns of required_features(criteria) are read.
+
+        Args:
+            features_table: Array of shape (n, len(FeatureExtractor.FEATURE_NAMES))
+            times: Response times in ms, NaN where missing
+            is_error: Boolean array, True for failed responses
+            weights: Scoring weights
+            criteria: Criteria to score (default: active_criteria(weights));
+                the others are 0.0
+
+        Returns:
+            Dictionary mapping each criterion and 'total' to an array of n scores
+        """
+        # Imported here so scoring single responses does not load NumPy
+        import numpy as np
+
+        features_table = np.asarray(features_table, dtype=np.float64)
+        times = np.asarray(times, dtype=np.float64)
+        is_error = np.asarray(is_error, dtype=bool)
+
+        def column(name):
+            return features_table[:, FeatureExtractor.FEATURE_INDEX[name]]
+
+        if criteria is None:
+            criteria = Scorer.active_criteria(weights)
+        technical, solution, clarity, conciseness, speed, reliability = np.zeros((6, len(features_table)))
+
+        if 'solution_quality' in criteria or 'clarity' in criteria:
+            bullet_points = column('bullet_points')
+            numbered_lists = column('numbered_lists')
+
+        if 'technical_accuracy' in criteria:
+            technical = np.where(column('has_error_keyword') != 0, 5.0, 0.0)
+            technical += np.where(column('has_cause_keyword') != 0, 5.0, 0.0)
+            technical += np.minimum(7.0, np.floor_divide(column('technical_terms'), 3))
+            technical += np.where(column('code_blocks') > 0, 8.0, 0.0)
+            technical = np.minimum(25.0, technical)
+
+        if 'solution_quality' in criteria:
+            solution = np.where(column('has_solution_keyword') != 0, 5.0, 0.0)
+            solution += np.where((numbered_lists > 0) | (bullet_points > 2), 8.0, 0.0)
+            solution += np.where(column('code_blocks') > 0, 8.0, 0.0)
+            solution += np.where(column('has_alternative_keyword') != 0, 4.0, 0.0)
+            solution = np.minimum(25.0, solution)
+
+        if 'clarity' in criteria:
+            clarity = np.where(column('headings') > 0, 5.0, 0.0)
+            clarity += np.where((bullet_points > 0) | (numbered_lists > 0), 5.0, 0.0)
+            clarity += np.where(column('paragraph_count') >= 3, 5.0, 0.0)
+            clarity += np.where(column('has_visual_markers') != 0, 5.0, 0.0)
+            clarity = np.minimum(20.0, clarity)
+
+        if 'conciseness' in criteria:
+            wc = column('word_count')
+            conciseness = np.select(
+                [
+                    (WORD_COUNT_OPTIMAL[0] <= wc) & (wc <= WORD_COUNT_OPTIMAL[1]),
+                    (WORD_COUNT_ACCEPTABLE[0] <= wc) & (wc <= WORD_COUNT_ACCEPTABLE[1]),
+                    (WORD_COUNT_POOR[0] <= wc) & (wc <= WORD_COUNT_POOR[1]),
+                ],
+                [10.0, 7.0, 4.0],
+                default=1.0
+            )
+
+        if 'speed' in criteria:
+            speed = np.select(
+                [
+                    np.isnan(times),
+                    times < RESPONSE_TIME_EXCELLENT,
+                    times < RESPONSE_TIME_GOOD,
+                    times < RESPONSE_TIME_ACCEPTABLE,
+                ],
+                [0.0, 10.0, 7.0, 4.0],
+                default=1.0
+            )
+
+        if 'reliability' in criteria:
+            reliability = np.where(is_error, 0.0, 10.0)
+
+        scores = {
+            'technical_accuracy': technical,
+            'solution_quality': solution,
+            'clarity': clarity,
+            'conciseness': conciseness,
+            'speed': speed,
+            'reliability': reliability
+        }
+
+        # Same operation order as calculate_weighted_score
+        total = np.zeros(len(features_table))
+        total += (technical / 25.0) * 100 * weights['technical_accuracy']
+        total += (solution / 25.0) * 100 * weights['solution_quality']
+        total += (clarity / 20.0) * 100 * weights['clarity']
+        total += (conciseness / 10.0) * 100 * weights['conciseness']
+        total += (speed / 10.0) * 100 * weights['speed']
+        total += (reliability / 10.0) * 100 * weights['reliability']
+        scores['total'] = total
+
+        return scores
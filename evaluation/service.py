@@ -0,0 +1,189 @@
+"""
+Long-Running Scoring Service for Single Responses
+
+Scores responses as they arrive instead of evaluating the whole table. The
+keyword matchers, text analyzer and configuration are loaded once at startup
+and stay warm for every request.
+
+HTTP (POST /score, GET /health):
+    python main.py serve --port 8765
+
+JSON lines over stdin/stdout (one request per line, one reply per line):
+    python main.py serve --stdio
+
+A request is a response object or a list (batch) of them:
+    {"text": "...", "response_time": 1234, "id": "optional, echoed back"}
+
+The reply mirrors its shape: one result object, or a list with one result per
+response, each {"features": {...}, "scores": {...}} (see score_response).
+"""
+
+import json
+import sys
+import time
+from typing import Any, Dict, List, Union
+from feature_extractor import FeatureExtractor
+from scorer import Scorer
+from config import WEIGHTS, SERVICE_HOST, SERVICE_PORT, SERVICE_MAX_BODY
+
+
+# Scored once at startup so the first request does not pay for warm-up
+WARMUP_TEXT = (
+    "## Solution\n\nThe error is caused by a database connection timeout.\n\n"
+    "1. Check the configuration\n2. Restart the server\n\n```sql\nSELECT 1;\n```\n"
+)
+
+
+class RequestError(ValueError):
+    """Malformed scoring request (HTTP 400)"""
+
+
+def score_response(text: str, response_time: float = None) -> Dict[str, Any]:
+    """
+    Extract features of one response and score it
+
+    Args:
+        text: Response text; empty or starting with 'Error:' counts as failed,
+            as in the evaluator
+        response_time: Response time in ms (None = unknown, 0 speed points)
+
+    Returns:
+        {'features': FeatureExtractor features, 'scores': Scorer scores and 'total'}
+    """
+    features = FeatureExtractor.extract(text)
+    is_error = text.startswith('Error:') if text else True
+    return {
+        'features': features.to_dict(),
+        'scores': Scorer.score_response(features, response_time, is_error, WEIGHTS)
+    }
+
+
+def _score_item(item: Any) -> Dict[str, Any]:
+    """Validate and score one response object of a request"""
+    if not isinstance(item, dict):
+        raise RequestError("each response must be an object with a 'text' field")
+    text = item.get('text')
+    response_time = item.get('response_time')
+    if text is not None and not isinstance(text, str):
+        raise RequestError("'text' must be a string or null")
+    if response_time is not None and (
+        isinstance(response_time, bool) or not isinstance(response_time, (int, float))
+    ):
+        raise RequestError("'response_time' must be a number of milliseconds or null")
+
+    result = score_response(text, response_time)
+    if 'id' in item:
+        result['id'] = item['id']
+    return result
+
+
+def handle_request(request: Any) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Score a decoded request: one response object or a list of them
+
+    Raises:
+        RequestError: The request (or any response in a batch) is malformed;
+            nothing of a malformed batch is returned
+    """
+    if isinstance(request, list):
+        return [_score_item(item) for item in request]
+    return _score_item(request)
+
+
+def warm_up():
+    """Run one response through extraction and scoring"""
+    handle_request({'text': WARMUP_TEXT, 'response_time': 1000})
+
+
+def serve_stdio(stdin=None, stdout=None):
+    """
+    Answer JSON-lines requests until stdin is closed
+
+    Every input line gets exactly one output line, in order; malformed lines
+    are answered with {"error": "..."} and the worker keeps running.
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    warm_up()
+    print("✅ Scoring service ready (JSON lines on stdin/stdout)", file=sys.stderr)
+
+    for line in stdin:
+        if not line.strip():
+            continue
+        try:
+            reply = handle_request(json.loads(line))
+        except ValueError as e:  # also RequestError and invalid JSON
+            reply = {'error': str(e)}
+        stdout.write(json.dumps(reply, ensure_ascii=False) + "\n")
+        stdout.flush()
+
+
+def make_http_server(host: str = SERVICE_HOST, port: int = SERVICE_PORT):
+    """
+    HTTP server answering POST /score and GET /health
+
+    Connections are kept alive (HTTP/1.1) and each one is served by its own
+    thread. Use port 0 to pick a free port (see server.server_address).
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    started = time.time()
+
+    class ScoringHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body are written separately; without this, Nagle's
+        # algorithm and delayed ACKs add ~40 ms to keep-alive requests
+        disable_nagle_algorithm = True
+
+        def _reply(self, status: int, body: Any):
+            data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path != '/health':
+                self._reply(404, {'error': f"unknown path {self.path}"})
+                return
+            self._reply(200, {'status': 'ok', 'uptime_s': round(time.time() - started, 1)})
+
+        def do_POST(self):
+            if self.path != '/score':
+                self._reply(404, {'error': f"unknown path {self.path}"})
+                return
+            length = int(self.headers.get('Content-Length') or 0)
+            if length > SERVICE_MAX_BODY:
+                # The body is not read, so the connection cannot be reused
+                self.close_connection = True
+                self._reply(413, {'error': f"request body larger than {SERVICE_MAX_BODY} bytes"})
+                return
+            try:
+                reply = handle_request(json.loads(self.rfile.read(length)))
+            except ValueError as e:  # also RequestError and invalid JSON
+                self._reply(400, {'error': str(e)})
+                return
+            self._reply(200, reply)
+
+        def log_message(self, format, *args):
+            # One line per request would dominate the service's own cost
+            pass
+
+    server = ThreadingHTTPServer((host, port), ScoringHandler)
+    server.daemon_threads = True
+    return server
+
+
+def serve_http(host: str = SERVICE_HOST, port: int = SERVICE_PORT):
+    """Serve HTTP requests until interrupted"""
+    warm_up()
+    server = make_http_server(host, port)
+    host, port = server.server_address[:2]
+    print(f"✅ Scoring service listening on http://{host}:{port} (POST /score, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Scoring service stopped")
+    finally:
+        server.server_close()
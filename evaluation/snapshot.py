@@ -0,0 +1,257 @@
+"""
+Columnar Snapshots of llm_error_analysis for Offline Evaluation
+
+Export:
+    python snapshot.py --output llm_error_analysis.parquet [--chunk-size 10000]
+
+Evaluate without touching the database:
+    python main.py --snapshot llm_error_analysis.parquet
+
+`.parquet` files are written with Parquet, `.arrow` / `.feather` files with
+the Arrow IPC file format. Both are compressed (zstd by default), written one
+chunk (row group / record batch) at a time and read back memory-mapped and
+column-projected, so only the columns an evaluation needs are loaded.
+"""
+
+import argparse
+import os
+from datetime import datetime
+from typing import Iterator, List, Tuple
+from config import DB_CONFIG, SNAPSHOT_CHUNK_SIZE
+
+# Imported on first use (see _require_pyarrow); pyarrow is slow to import
+# and only needed for snapshots
+pa = None
+pq = None
+
+
+RESPONSE_COLUMNS = ['groq', 'mistral', 'cohere', 'openrouter', 'openrouter_hermes']
+
+# (column, Arrow type) of a snapshot; everything scoring needs
+SNAPSHOT_COLUMNS = [
+    ('id', 'int64'),
+    ('error_category', 'string'),
+    ('error_code', 'string'),
+] + [
+    (f"{llm}_response", 'string') for llm in RESPONSE_COLUMNS
+] + [
+    (f"{llm}_response_time", 'int32') for llm in RESPONSE_COLUMNS
+]
+
+SNAPSHOT_QUERY = f"""
+SELECT {', '.join(column for column, _ in SNAPSHOT_COLUMNS)}
+FROM llm_error_analysis
+ORDER BY id
+"""
+
+ARROW_EXTENSIONS = ('.arrow', '.feather')
+
+
+def _require_pyarrow():
+    global pa, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Snapshots need pyarrow: pip install pyarrow") from None
+        pa, pq = pyarrow, pyarrow.parquet
+
+
+def _schema() -> 'pa.Schema':
+    return pa.schema(
+        [(column, getattr(pa, arrow_type)()) for column, arrow_type in SNAPSHOT_COLUMNS],
+        metadata={
+            'source': 'llm_error_analysis',
+            'database': str(DB_CONFIG['database']),
+            'created_at': datetime.now().isoformat()
+        }
+    )
+
+
+def is_arrow_file(path: str) -> bool:
+    """Whether `path` uses the Arrow IPC format (else Parquet)"""
+    return path.lower().endswith(ARROW_EXTENSIONS)
+
+
+def export_snapshot(conn, path: str, chunk_size: int = SNAPSHOT_CHUNK_SIZE,
+                    compression: str = 'zstd') -> int:
+    """
+    Export llm_error_analysis to a Parquet or Arrow file
+
+    Rows are read through a server-side cursor and written `chunk_size` at a
+    time, so memory use does not grow with the table. The file is written
+    under a temporary name and renamed at the end; an interrupted export never
+    leaves a truncated snapshot behind.
+
+    Args:
+        conn: psycopg2 connection
+        path: Output file (.parquet, .arrow or .feather)
+        chunk_size: Rows per row group / record batch
+        compression: Codec, e.g. 'zstd', 'lz4', 'snappy' (Parquet) or None
+
+    Returns:
+        Number of exported rows
+    """
+    _require_pyarrow()
+    schema = _schema()
+    temp_path = f"{path}.tmp"
+
+    if is_arrow_file(path):
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+        writer = pa.ipc.new_file(temp_path, schema, options=options)
+    else:
+        writer = pq.ParquetWriter(temp_path, schema, compression=compression or 'none')
+
+    cursor = conn.cursor(name='llm_snapshot_export')
+    cursor.itersize = chunk_size
+    rows_written = 0
+    closed = False
+
+    try:
+        cursor.execute(SNAPSHOT_QUERY)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            columns = list(zip(*rows))
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            )
+            if is_arrow_file(path):
+                writer.write_batch(batch)
+            else:
+                writer.write_batch(batch, row_group_size=chunk_size)
+            rows_written += len(rows)
+        writer.close()
+        closed = True
+        os.replace(temp_path, path)
+    finally:
+        cursor.close()
+        if not closed:
+            try:
+                writer.close()
+            except Exception:
+                # Keep the error that stopped the export, not this one
+                pass
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return rows_written
+
+
+class SnapshotReader:
+    """
+    Read rows from a snapshot file, memory-mapped and column-projected
+
+    Only the requested columns are decoded; columns a snapshot does not
+    contain (e.g. error_message) come back as None.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Snapshot written by export_snapshot()
+        """
+        _require_pyarrow()
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Snapshot not found: {path}")
+        self.path = path
+        self.arrow = is_arrow_file(path)
+
+        if self.arrow:
+            self._source = pa.memory_map(path, 'r')
+            self.schema = pa.ipc.open_file(self._source).schema
+        else:
+            self._file = pq.ParquetFile(path, memory_map=True)
+            self.schema = self._file.schema_arrow
+
+    @property
+    def metadata(self) -> dict:
+        """Export metadata (source, database, created_at)"""
+        return {
+            key.decode('utf-8'): value.decode('utf-8')
+            for key, value in (self.schema.metadata or {}).items()
+        }
+
+    def _batches(self, columns: List[str], batch_size: int) -> Iterator['pa.RecordBatch']:
+        if self.arrow:
+            # Only the projected fields of each record batch are read
+            options = pa.ipc.IpcReadOptions(
+                included_fields=[self.schema.get_field_index(column) for column in columns]
+            )
+            reader = pa.ipc.open_file(self._source, options=options)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                for offset in range(0, batch.num_rows, batch_size):
+                    yield batch.slice(offset, batch_size)
+        else:
+            yield from self._file.iter_batches(batch_size=batch_size, columns=columns)
+
+    def iter_chunks(self, columns: List[str], chunk_size: int = SNAPSHOT_CHUNK_SIZE) -> Iterator[List[Tuple]]:
+        """
+        Iterate over the snapshot in chunks of row tuples
+
+        Args:
+            columns: Row layout, e.g. the columns selected by RESPONSES_QUERY
+            chunk_size: Rows per chunk
+
+        Yields:
+            Lists of tuples with one value per entry of `columns`
+        """
+        available = [column for column in columns if column in self.schema.names]
+
+        for batch in self._batches(available, chunk_size):
+            values = {
+                column: batch.column(i).to_pylist() for i, column in enumerate(batch.schema.names)
+            }
+            missing = [None] * batch.num_rows
+            yield list(zip(*(values.get(column, missing) for column in columns)))
+
+    def iter_rows(self, columns: List[str], chunk_size: int = SNAPSHOT_CHUNK_SIZE) -> Iterator[Tuple]:
+        """Iterate over single row tuples (see iter_chunks)"""
+        for chunk in self.iter_chunks(columns, chunk_size):
+            yield from chunk
+
+    def close(self):
+        """Release the memory map"""
+        if self.arrow:
+            self._source.close()
+        else:
+            self._file.close()
+
+
+def main():
+    """Export llm_error_analysis to a snapshot file"""
+    from db_pool import get_pool, close_pool
+
+    parser = argparse.ArgumentParser(description="Export llm_error_analysis to a columnar snapshot")
+    parser.add_argument(
+        '--output', default='llm_error_analysis.parquet',
+        help="Snapshot file: .parquet, .arrow or .feather (default: llm_error_analysis.parquet)"
+    )
+    parser.add_argument(
+        '--chunk-size', type=int, default=SNAPSHOT_CHUNK_SIZE,
+        help=f"Rows per row group / record batch (default: {SNAPSHOT_CHUNK_SIZE})"
+    )
+    parser.add_argument(
+        '--compression', default='zstd',
+        help="Compression codec: zstd, lz4, snappy (Parquet only) or none (default: zstd)"
+    )
+    args = parser.parse_args()
+    compression = None if args.compression == 'none' else args.compression
+
+    print(f"📦 Exporting llm_error_analysis to {args.output}...")
+    try:
+        with get_pool().connection() as conn:
+            rows = export_snapshot(conn, args.output, args.chunk_size, compression)
+    finally:
+        close_pool()
+
+    size_mb = os.path.getsize(args.output) / (1024 * 1024)
+    print(f"✅ {rows} rows exported ({size_mb:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
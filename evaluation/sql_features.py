@@ -0,0 +1,471 @@
+"""
+Feature Extraction Pushed Down into PostgreSQL
+
+Install (or refresh after changing the extractor or keyword lists):
+    python sql_features.py --install
+    python sql_features.py --output upgrade-response-features.sql   # for psql
+
+Verify against FeatureExtractor:
+    python sql_features.py --check [--limit 10000]
+
+Creates the `response_features` table with the FeatureExtractor features of
+every wide response column, computed in SQL and kept current by a trigger on
+llm_error_analysis. `main.py --sql-features` reads these small numeric rows
+instead of the response texts.
+
+The SQL is generated from the inputs of the Python extractor: the keyword
+lists in config, TextAnalyzer.VISUAL_MARKERS and Python's own Unicode tables
+for whitespace (str.split / str.isspace), decimal digits (str.isdecimal /
+re's \\d) and the case mappings that can produce keyword characters
+(str.lower). Results are therefore identical to FeatureExtractor and do not
+depend on the database locale. Needs PostgreSQL 15+ (regexp_count).
+"""
+
+import argparse
+import hashlib
+import re
+import sys
+import unicodedata
+from typing import Any, Dict, Iterable, List, Tuple
+import config
+from feature_cache import EXTRACTOR_VERSION
+from feature_extractor import FeatureExtractor
+from keyword_matcher import KEYWORD_MATCHER
+from text_analyzer import TextAnalyzer
+from evaluator import ROW_COLUMNS
+
+
+# Wide response columns, by prefix (groq -> groq_response / groq_response_time)
+RESPONSE_COLUMNS = [column[:-len('_response')] for column in ROW_COLUMNS if column.endswith('_response')]
+
+# SQL type of every feature
+FEATURE_TYPES = {
+    name: (
+        'BOOLEAN' if name.startswith('has_') else
+        'DOUBLE PRECISION' if name == 'avg_sentence_length' else
+        'INTEGER'
+    )
+    for name in FeatureExtractor.FEATURE_NAMES
+}
+
+# Rows compared with FeatureExtractor before an install is committed
+INSTALL_CHECK_ROWS = 200
+
+
+def _features_version() -> str:
+    """
+    Fingerprint of the generated SQL
+
+    Derived from its inputs (this file, the extractor and keyword lists, the
+    Unicode version) so evaluations can compare it without generating SQL.
+    """
+    digest = hashlib.sha256(EXTRACTOR_VERSION.encode('utf-8'))
+    with open(__file__, 'rb') as f:
+        digest.update(f.read())
+    digest.update(unicodedata.unidata_version.encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+FEATURES_VERSION = _features_version()
+
+
+def _literal(value: str) -> str:
+    """SQL string literal (escape string syntax, independent of standard_conforming_strings)"""
+    return "E'" + value.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+def _regex_escape(text: str) -> str:
+    """Escape the metacharacters of a PostgreSQL regular expression"""
+    return re.sub(r'([\\^$.|?*+()\[\]{}])', r'\\\1', text)
+
+
+def _char_class(chars: Iterable[str]) -> str:
+    """Contents of a regex bracket expression matching exactly `chars`"""
+    def escape(codepoint):
+        return f"\\u{codepoint:04x}" if codepoint <= 0xFFFF else f"\\U{codepoint:08x}"
+
+    codepoints = sorted(ord(char) for char in chars)
+    ranges = []
+    for codepoint in codepoints:
+        if ranges and ranges[-1][1] == codepoint - 1:
+            ranges[-1][1] = codepoint
+        else:
+            ranges.append([codepoint, codepoint])
+    return ''.join(
+        escape(first) if first == last else f"{escape(first)}-{escape(last)}"
+        for first, last in ranges
+    )
+
+
+def _unicode_tables(keyword_chars: set) -> Tuple[List[str], List[str], Dict[str, str]]:
+    """
+    Python's whitespace, decimal digits and the relevant lowercase mappings
+
+    Returns:
+        (whitespace, decimal digits, {char: lowercase}) where the mapping
+        holds every character whose str.lower() differs from it and contains
+        a keyword character; no other mapping can create or break a match
+    """
+    whitespace, digits, lower = [], [], {}
+    for codepoint in range(sys.maxunicode + 1):
+        char = chr(codepoint)
+        if char.isspace():
+            whitespace.append(char)
+        if char.isdecimal():
+            digits.append(char)
+        lowered = char.lower()
+        if lowered != char and keyword_chars.intersection(lowered):
+            lower[char] = lowered
+    return whitespace, digits, lower
+
+
+def _keyword_rows() -> List[Tuple[str, str, int]]:
+    """(group, lowercase keyword, multiplicity) as counted by KEYWORD_MATCHER"""
+    groups = {
+        'technical': config.TECHNICAL_KEYWORDS,
+        'error': config.ERROR_KEYWORDS,
+        'solution': config.SOLUTION_KEYWORDS,
+        'cause': config.CAUSE_KEYWORDS,
+        'alternative': config.ALTERNATIVE_KEYWORDS,
+    }
+    assert list(groups) == KEYWORD_MATCHER.group_names
+    rows = []
+    for group, keywords in groups.items():
+        weights: Dict[str, int] = {}
+        for keyword in keywords:
+            weights[keyword.lower()] = weights.get(keyword.lower(), 0) + 1
+        rows.extend((group, keyword, weight) for keyword, weight in weights.items())
+    return rows
+
+
+def features_function_sql() -> str:
+    """
+    CREATE FUNCTION response_text_features(text), one row of features
+
+    Mirrors FeatureExtractor.extract: failed responses (NULL, empty or
+    starting with 'Error:') get all-zero features; otherwise every feature
+    follows its Python definition in TextAnalyzer and KeywordMatcher.
+    """
+    keyword_rows = _keyword_rows()
+    keyword_chars = set(''.join(keyword for _, keyword, _ in keyword_rows))
+    assert all(char.lower() == char for char in keyword_chars)
+    whitespace, digits, lower = _unicode_tables(keyword_chars)
+
+    space = _char_class(whitespace)
+    word = _literal(f"[^{space}]+")
+    nonblank = _literal(f"[^{space}]")
+
+    # str.lower() restricted to the characters keyword matching can see;
+    # lower() under the "C" collation maps exactly ASCII A-Z
+    assert all('A' <= char <= 'Z' for char in lower if ord(char) <= 127)
+    others = {char: lowered for char, lowered in lower.items() if ord(char) > 127}
+    single = {char: lowered for char, lowered in others.items() if len(lowered) == 1}
+    lowered = f"translate(lowered, {_literal(''.join(single))}, {_literal(''.join(single.values()))})"
+    for char, lowered_chars in others.items():
+        if len(lowered_chars) > 1:
+            lowered = f"replace({lowered}, {_literal(char)}, {_literal(lowered_chars)})"
+
+    # Only technical terms are counted, the other groups just need any match
+    technical = ",\n        ".join(
+        f"({_literal(keyword)}, {weight})" for group, keyword, weight in keyword_rows if group == 'technical'
+    )
+    presence = []
+    for group in KEYWORD_MATCHER.group_names[1:]:
+        feature = f"has_{group}_keyword"
+        assert feature in FEATURE_TYPES
+        pattern = '|'.join(_regex_escape(keyword) for g, keyword, _ in keyword_rows if g == group)
+        presence.append(f"{feature} := {f'lowered ~ {_literal(pattern)}' if pattern else 'false'};")
+    presence = "\n  ".join(presence)
+    markers = " OR ".join(f"strpos(t, {_literal(marker)}) > 0" for marker in TextAnalyzer.VISUAL_MARKERS)
+    parameters = ",\n  ".join(f"OUT {name} {sql_type}" for name, sql_type in FEATURE_TYPES.items())
+    zeros = "\n    ".join(
+        f"{name} := {'false' if sql_type == 'BOOLEAN' else '0'};" for name, sql_type in FEATURE_TYPES.items()
+    )
+
+    return f"""
+CREATE OR REPLACE FUNCTION response_text_features(
+  t TEXT,
+  OUT is_error BOOLEAN,
+  {parameters}
+) AS $$
+DECLARE
+  lowered TEXT;
+  sentence_words INTEGER;
+BEGIN
+  IF t IS NULL OR t = '' OR starts_with(t, 'Error:') THEN
+    is_error := true;
+    {zeros}
+    RETURN;
+  END IF;
+
+  is_error := false;
+  word_count := regexp_count(t, {word});
+  code_blocks := (length(t) - length(replace(t, '```', ''))) / 3 / 2;
+  -- re.findall(r'^#+\\s', text, re.MULTILINE) and the like
+  headings := regexp_count(t, {_literal(f"^#+[{space}]")}, 1, 'n');
+  bullet_points := regexp_count(t, {_literal(f"^[{space}]*[-*•][{space}]")}, 1, 'n');
+  numbered_lists := regexp_count(t, {_literal(f"^[{space}]*[{_char_class(digits)}]+[.)][{space}]")}, 1, 'n');
+  has_visual_markers := {markers};
+
+  -- str.count of every keyword in the lowercased text
+  lowered := lower(t COLLATE "C");
+  IF lowered ~ {_literal(f"[{_char_class(others)}]")} THEN
+    lowered := {lowered};
+  END IF;
+  {presence}
+  SELECT coalesce(sum(c.n * k.weight), 0) INTO technical_terms
+  FROM (VALUES
+        {technical}
+  ) AS k (keyword, weight)
+  CROSS JOIN LATERAL (
+    SELECT CASE WHEN strpos(lowered, k.keyword) = 0 THEN 0
+                ELSE (length(lowered) - length(replace(lowered, k.keyword, ''))) / length(k.keyword)
+           END AS n
+  ) c;
+
+  -- Non-blank pieces of text.split('\\n\\n')
+  SELECT count(*) INTO paragraph_count
+  FROM string_to_table(t, E'\\n\\n') AS piece
+  WHERE piece ~ {nonblank};
+
+  -- Non-blank pieces of re.split(r'[.!?]+', text) and their words
+  SELECT count(*) FILTER (WHERE piece ~ {nonblank}), coalesce(sum(regexp_count(piece, {word})), 0)
+  INTO sentence_count, sentence_words
+  FROM regexp_split_to_table(t, '[.!?]+') AS piece;
+  avg_sentence_length := CASE WHEN sentence_count > 0
+                              THEN sentence_words::DOUBLE PRECISION / sentence_count ELSE 0 END;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE;
+"""
+
+
+def _response_values(row: str, positions: bool = False) -> str:
+    """VALUES list of (response_column, response_text, response_time[, position]) of a row variable"""
+    return ",\n      ".join(
+        f"('{column}', {row}.{column}_response, {row}.{column}_response_time"
+        f"{f', {position}' if positions else ''})"
+        for position, column in enumerate(RESPONSE_COLUMNS, 1)
+    )
+
+
+def install_sql() -> str:
+    """
+    Complete install script: table, functions, trigger and backfill
+
+    The table is rebuilt from scratch, so running it again after changing
+    the extractor refreshes every row.
+    """
+    feature_names = FeatureExtractor.FEATURE_NAMES
+    columns = ",\n    ".join(f"{name} {sql_type} NOT NULL" for name, sql_type in FEATURE_TYPES.items())
+    watched = ", ".join(
+        f"{column}_response, {column}_response_time" for column in RESPONSE_COLUMNS
+    )
+    changed = ",\n      ".join(
+        f"OLD.{column}_response IS DISTINCT FROM NEW.{column}_response OR "
+        f"OLD.{column}_response_time IS DISTINCT FROM NEW.{column}_response_time"
+        for column in RESPONSE_COLUMNS
+    )
+    insert_columns = f"error_id, response_column, response_time, is_error, {', '.join(feature_names)}"
+    updates = ",\n    ".join(
+        f"{name} = EXCLUDED.{name}" for name in ['response_time', 'is_error'] + feature_names
+    )
+
+    return f"""-- Feature extraction pushed down into PostgreSQL (evaluation/main.py --sql-features)
+--
+-- Generated by evaluation/sql_features.py (version {FEATURES_VERSION}); do not edit,
+-- regenerate after changing the extractor or the keyword lists.
+
+DROP TABLE IF EXISTS response_features;
+DROP FUNCTION IF EXISTS response_text_features(TEXT);
+
+CREATE TABLE response_features (
+    error_id INTEGER NOT NULL REFERENCES llm_error_analysis(id) ON DELETE CASCADE,
+    response_column TEXT NOT NULL,
+    response_time INTEGER,
+    is_error BOOLEAN NOT NULL,
+    {columns},
+    PRIMARY KEY (error_id, response_column)
+);
+{features_function_sql()}
+-- Recompute the features of changed responses only
+CREATE OR REPLACE FUNCTION sync_response_features() RETURNS trigger AS $$
+DECLARE
+  changed BOOLEAN[];
+BEGIN
+  IF TG_OP = 'UPDATE' THEN
+    changed := ARRAY[
+      {changed}
+    ];
+  ELSE
+    changed := array_fill(true, ARRAY[{len(RESPONSE_COLUMNS)}]);
+  END IF;
+  IF NOT (true = ANY(changed)) THEN
+    RETURN NULL;
+  END IF;
+
+  INSERT INTO response_features ({insert_columns})
+  SELECT NEW.id, c.response_column, c.response_time, f.*
+  FROM (VALUES
+      {_response_values('NEW', positions=True)}
+  ) AS c (response_column, response_text, response_time, position)
+  CROSS JOIN LATERAL response_text_features(c.response_text) f
+  WHERE changed[c.position]
+  ON CONFLICT (error_id, response_column) DO UPDATE SET
+    {updates};
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_sync_response_features ON llm_error_analysis;
+
+CREATE TRIGGER trg_sync_response_features
+AFTER INSERT OR UPDATE OF {watched} ON llm_error_analysis
+FOR EACH ROW
+EXECUTE FUNCTION sync_response_features();
+
+-- Backfill existing rows
+INSERT INTO response_features ({insert_columns})
+SELECT e.id, c.response_column, c.response_time, f.*
+FROM llm_error_analysis e
+CROSS JOIN LATERAL (VALUES
+      {_response_values('e')}
+) AS c (response_column, response_text, response_time)
+CROSS JOIN LATERAL response_text_features(c.response_text) f;
+
+-- Checked by evaluations before they trust the table
+CREATE OR REPLACE FUNCTION response_features_version() RETURNS TEXT AS $$
+  SELECT '{FEATURES_VERSION}'::TEXT
+$$ LANGUAGE sql IMMUTABLE;
+"""
+
+
+def installed_version(conn) -> str:
+    """Version of the installed response_features, None if not installed"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT to_regproc('response_features_version') IS NOT NULL")
+    installed = cursor.fetchone()[0]
+    version = None
+    if installed:
+        cursor.execute("SELECT response_features_version()")
+        version = cursor.fetchone()[0]
+    cursor.close()
+    return version
+
+
+def check(conn, limit: int = None, itersize: int = 2000) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Compare response_text_features() with FeatureExtractor
+
+    Args:
+        conn: psycopg2 connection
+        limit: Rows of llm_error_analysis to check (None = all)
+        itersize: Rows fetched per round trip
+
+    Returns:
+        (responses checked, mismatches as {'id', 'response_column', 'sql', 'python'})
+    """
+    query = f"""
+        SELECT e.id, c.response_column, c.response_text, f.*
+        FROM (SELECT * FROM llm_error_analysis ORDER BY id {'LIMIT %s' if limit else ''}) e
+        CROSS JOIN LATERAL (VALUES
+              {_response_values('e')}
+        ) AS c (response_column, response_text, response_time)
+        CROSS JOIN LATERAL response_text_features(c.response_text) f
+        ORDER BY e.id
+    """
+    cursor = conn.cursor(name='response_features_check')
+    cursor.itersize = itersize
+    cursor.execute(query, (limit,) if limit else None)
+
+    checked = 0
+    mismatches = []
+    for row_id, column, text, is_error, *values in cursor:
+        checked += 1
+        expected = FeatureExtractor.to_row(FeatureExtractor.extract(text))
+        expected_error = text.startswith('Error:') if text else True
+        if [float(value) for value in values] != expected or is_error != expected_error:
+            mismatches.append({
+                'id': row_id, 'response_column': column,
+                'sql': dict(zip(['is_error'] + FeatureExtractor.FEATURE_NAMES, [is_error] + values)),
+                'python': dict(zip(['is_error'] + FeatureExtractor.FEATURE_NAMES, [expected_error] + expected))
+            })
+    cursor.close()
+    return checked, mismatches
+
+
+def install(conn, check_rows: int = INSTALL_CHECK_ROWS):
+    """
+    Install response_features and backfill it in one transaction
+
+    The first `check_rows` rows are compared with FeatureExtractor before
+    committing; on any difference nothing is changed.
+
+    Raises:
+        RuntimeError: PostgreSQL older than 15, or SQL and Python features differ
+    """
+    cursor = conn.cursor()
+    cursor.execute("SHOW server_version_num")
+    if int(cursor.fetchone()[0]) < 150000:
+        raise RuntimeError("response_features needs PostgreSQL 15 or newer (regexp_count)")
+
+    try:
+        cursor.execute(install_sql())
+        cursor.execute("SELECT count(*) FROM response_features")
+        rows = cursor.fetchone()[0]
+        checked, mismatches = check(conn, check_rows)
+        if mismatches:
+            raise RuntimeError(
+                f"SQL features differ from FeatureExtractor for {len(mismatches)} of {checked} "
+                f"responses, e.g. {mismatches[0]}"
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute response features inside PostgreSQL")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument('--install', action='store_true',
+                        help="Create or refresh response_features, its trigger and backfill it")
+    action.add_argument('--output', metavar='PATH', help="Write the install script to PATH (for psql)")
+    action.add_argument('--check', action='store_true', help="Compare SQL features with FeatureExtractor")
+    parser.add_argument('--limit', type=int, help="With --check: rows of llm_error_analysis to check")
+    args = parser.parse_args()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(install_sql())
+        print(f"💾 Install script (version {FEATURES_VERSION}) written to {args.output}")
+        return
+
+    import psycopg2
+
+    conn = psycopg2.connect(**config.DB_CONFIG)
+    try:
+        if args.install:
+            rows = install(conn)
+            print(f"✅ response_features installed (version {FEATURES_VERSION}): {rows} responses")
+        else:
+            version = installed_version(conn)
+            if version != FEATURES_VERSION:
+                print(f"⚠️  Installed version {version} differs from {FEATURES_VERSION}, run --install")
+            checked, mismatches = check(conn, args.limit)
+            for mismatch in mismatches[:10]:
+                print(f"   ❌ id {mismatch['id']} {mismatch['response_column']}: "
+                      f"SQL {mismatch['sql']} vs Python {mismatch['python']}")
+            print(f"{'✅' if not mismatches else '❌'} {checked} responses checked, "
+                  f"{len(mismatches)} differ from FeatureExtractor")
+            if mismatches:
+                sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
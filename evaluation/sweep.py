@@ -0,0 +1,522 @@
+"""
+Parameter Sweep: Ranking Stability Under Many Scoring Configurations
+
+    python sweep.py --samples 10000
+    python sweep.py --grid --weight-step 0.1 --scales 0.75,1,1.25
+    python sweep.py --snapshot llm_error_analysis.parquet --samples 100000
+
+Features are extracted once (through the feature cache) into compact
+per-response arrays. Only conciseness and speed depend on the
+WORD_COUNT_* / RESPONSE_TIME_* thresholds, and only through how many
+responses of an LLM fall into each band, so the arrays are reduced to
+per-LLM cumulative counts over the distinct word counts and response times.
+Every configuration is then scored and ranked with a few array operations
+over all configurations at once, without touching the responses again; the
+averages equal a full evaluation with that configuration.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+import numpy as np
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, List, NamedTuple
+from feature_extractor import FeatureExtractor
+from scorer import Scorer
+from profiler import PROFILER
+from config import (
+    WEIGHTS, WORD_COUNT_OPTIMAL, WORD_COUNT_ACCEPTABLE, WORD_COUNT_POOR,
+    RESPONSE_TIME_EXCELLENT, RESPONSE_TIME_GOOD, RESPONSE_TIME_ACCEPTABLE,
+    WORKER_CHUNK_SIZE, FEATURE_CACHE_PATH
+)
+
+
+# Criteria whose scores do not depend on any swept threshold
+FIXED_CRITERIA = ['technical_accuracy', 'solution_quality', 'clarity', 'reliability']
+
+# Features read by FIXED_CRITERIA plus the word counts the swept thresholds apply to
+SWEEP_FEATURES = Scorer.required_features(FIXED_CRITERIA) | {'word_count'}
+
+# Maximum points per criterion (see Scorer.calculate_weighted_score)
+CRITERION_MAX = {
+    'technical_accuracy': 25.0,
+    'solution_quality': 25.0,
+    'clarity': 20.0,
+    'conciseness': 10.0,
+    'speed': 10.0,
+    'reliability': 10.0
+}
+
+WORD_COUNT_BOUNDS = ['optimal_min', 'optimal_max', 'acceptable_min', 'acceptable_max', 'poor_min', 'poor_max']
+RESPONSE_TIME_BOUNDS = ['excellent', 'good', 'acceptable']
+
+# Averages closer than this are treated as ties when ranking
+RANK_DECIMALS = 9
+
+
+class SweepFeatures(NamedTuple):
+    """Threshold-independent inputs of scoring, one entry per response"""
+    llm_names: List[str]
+    # Index into llm_names
+    llm_codes: np.ndarray
+    # Points per FIXED_CRITERIA (whole numbers, at most 25)
+    fixed_scores: np.ndarray
+    word_counts: np.ndarray
+    # Response time in ms, NaN where missing
+    times: np.ndarray
+
+
+class SweepConfigs(NamedTuple):
+    """Scoring configurations, one row per configuration"""
+    # Weights in Scorer.CRITERIA order
+    weights: np.ndarray
+    # Word count bands in WORD_COUNT_BOUNDS order
+    word_counts: np.ndarray
+    # Response time limits in RESPONSE_TIME_BOUNDS order
+    response_times: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def describe(self, index: int) -> Dict[str, Any]:
+        """One configuration in config.py terms"""
+        return {
+            'weights': dict(zip(Scorer.CRITERIA, self.weights[index].tolist())),
+            'word_count': dict(zip(WORD_COUNT_BOUNDS, self.word_counts[index].tolist())),
+            'response_time': dict(zip(RESPONSE_TIME_BOUNDS, self.response_times[index].tolist()))
+        }
+
+
+def extract_features(evaluator, chunk_size: int = WORKER_CHUNK_SIZE) -> SweepFeatures:
+    """
+    Extract the threshold-independent inputs of every response
+
+    Args:
+        evaluator: LLMEvaluator with its source (database or snapshot) set up
+        chunk_size: Rows per feature table
+
+    Returns:
+        SweepFeatures over all rows, LLMs in evaluator.llm_names order
+    """
+    llm_codes = []
+    fixed_scores = []
+    word_counts = []
+    times = []
+    word_count_index = FeatureExtractor.FEATURE_INDEX['word_count']
+
+    rows = evaluator.iter_rows()
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        with PROFILER.stage('build_feature_table', len(chunk)):
+            table = evaluator.build_feature_table(chunk, SWEEP_FEATURES)
+        scores = Scorer.score_batch(table.features, table.times, table.is_error, WEIGHTS, FIXED_CRITERIA)
+
+        llm_codes.append(table.llm_codes.astype(np.int8))
+        fixed_scores.append(np.column_stack([scores[c] for c in FIXED_CRITERIA]).astype(np.uint8))
+        word_counts.append(table.features[:, word_count_index].astype(np.int32))
+        times.append(table.times)
+
+    return SweepFeatures(
+        llm_names=list(evaluator.llm_names),
+        llm_codes=np.concatenate(llm_codes) if llm_codes else np.zeros(0, np.int8),
+        fixed_scores=np.concatenate(fixed_scores) if fixed_scores else np.zeros((0, len(FIXED_CRITERIA)), np.uint8),
+        word_counts=np.concatenate(word_counts) if word_counts else np.zeros(0, np.int32),
+        times=np.concatenate(times) if times else np.zeros(0)
+    )
+
+
+def save_features(features: SweepFeatures, path: str):
+    """Store extracted features for later sweeps (.npz)"""
+    np.savez_compressed(
+        path, llm_names=np.array(features.llm_names), llm_codes=features.llm_codes,
+        fixed_scores=features.fixed_scores, word_counts=features.word_counts, times=features.times
+    )
+
+
+def load_features(path: str) -> SweepFeatures:
+    """Load features written by save_features()"""
+    with np.load(path) as data:
+        return SweepFeatures(
+            llm_names=data['llm_names'].tolist(), llm_codes=data['llm_codes'],
+            fixed_scores=data['fixed_scores'], word_counts=data['word_counts'], times=data['times']
+        )
+
+
+def baseline_config() -> SweepConfigs:
+    """The configuration in config.py"""
+    return SweepConfigs(
+        weights=np.array([[WEIGHTS[c] for c in Scorer.CRITERIA]], dtype=np.float64),
+        word_counts=np.array([WORD_COUNT_OPTIMAL + WORD_COUNT_ACCEPTABLE + WORD_COUNT_POOR], dtype=np.float64),
+        response_times=np.array(
+            [[RESPONSE_TIME_EXCELLENT, RESPONSE_TIME_GOOD, RESPONSE_TIME_ACCEPTABLE]], dtype=np.float64
+        )
+    )
+
+
+def _concat(*configs: SweepConfigs) -> SweepConfigs:
+    return SweepConfigs(*(np.concatenate(arrays) for arrays in zip(*configs)))
+
+
+def random_configs(count: int, spread: float = 0.5, seed: int = None) -> SweepConfigs:
+    """
+    Random configurations around config.py (the first one is config.py itself)
+
+    Weights are drawn uniformly from all weightings summing to 1; each
+    threshold is scaled by a factor in [1 - spread, 1 + spread]. Bounds are
+    re-sorted so the bands stay nested (optimal within acceptable within
+    poor) and the response time limits ascending.
+
+    Args:
+        count: Number of configurations
+        spread: Relative threshold variation
+        seed: Random seed (None = random)
+    """
+    rng = np.random.default_rng(seed)
+    base = baseline_config()
+    samples = count - 1
+
+    def scale(values: np.ndarray) -> np.ndarray:
+        return np.round(values * rng.uniform(1 - spread, 1 + spread, (samples, values.shape[1])))
+
+    word_counts = scale(base.word_counts)
+    lows = -np.sort(-word_counts[:, 0::2], axis=1)
+    highs = np.sort(word_counts[:, 1::2], axis=1)
+    word_counts[:, 0::2] = lows
+    word_counts[:, 1::2] = highs
+
+    return _concat(base, SweepConfigs(
+        weights=rng.dirichlet(np.ones(len(Scorer.CRITERIA)), samples),
+        word_counts=word_counts,
+        response_times=np.sort(scale(base.response_times), axis=1)
+    ))
+
+
+def grid_configs(weight_step: float = 0.1, scales: List[float] = (0.75, 1.0, 1.25)) -> SweepConfigs:
+    """
+    Every weighting in steps of `weight_step` times every threshold scaling
+
+    Word count and response time thresholds are scaled independently by each
+    factor of `scales`, so there are
+    C(1/weight_step + 5, 5) * len(scales) ** 2 configurations
+    (e.g. 3003 * 9 for the defaults). config.py comes first.
+    """
+    steps = int(round(1 / weight_step))
+    criteria = len(Scorer.CRITERIA)
+
+    # Stars and bars: each choice of bar positions is one split of `steps`
+    bars = np.array(list(itertools.combinations(range(steps + criteria - 1), criteria - 1)))
+    edges = np.column_stack([np.full(len(bars), -1), bars, np.full(len(bars), steps + criteria - 1)])
+    weights = (np.diff(edges, axis=1) - 1) / steps
+
+    base = baseline_config()
+    scales = np.asarray(scales, dtype=np.float64)
+    word_scale, time_scale = (grid.ravel() for grid in np.meshgrid(scales, scales, indexing='ij'))
+    thresholds = len(word_scale)
+
+    return _concat(base, SweepConfigs(
+        weights=np.repeat(weights, thresholds, axis=0),
+        word_counts=np.tile(np.round(base.word_counts * word_scale[:, None]), (len(weights), 1)),
+        response_times=np.tile(np.round(base.response_times * time_scale[:, None]), (len(weights), 1))
+    ))
+
+
+class SweepStats:
+    """
+    Per-LLM sufficient statistics of SweepFeatures
+
+    The fixed criteria reduce to one mean per LLM; word counts and response
+    times to cumulative counts over their sorted distinct values, so the
+    number of responses of an LLM in any band is two binary searches.
+    """
+
+    def __init__(self, features: SweepFeatures):
+        llms = len(features.llm_names)
+        codes = features.llm_codes.astype(np.intp)
+
+        self.llm_names = features.llm_names
+        self.counts = np.bincount(codes, minlength=llms).astype(np.float64)
+        if not self.counts.all():
+            missing = [name for name, count in zip(self.llm_names, self.counts) if not count]
+            raise ValueError(f"No responses to sweep for {', '.join(missing)}")
+
+        self.fixed_means = np.column_stack([
+            np.bincount(codes, weights=features.fixed_scores[:, i], minlength=llms)
+            for i in range(len(FIXED_CRITERIA))
+        ]) / self.counts[:, None]
+
+        self.word_values, self.word_cumulative = self._cumulative(codes, features.word_counts, llms)
+        timed = ~np.isnan(features.times)
+        self.timed_counts = np.bincount(codes[timed], minlength=llms).astype(np.float64)
+        self.time_values, self.time_cumulative = self._cumulative(codes[timed], features.times[timed], llms)
+
+    @staticmethod
+    def _cumulative(codes: np.ndarray, values: np.ndarray, llms: int):
+        """Distinct values and, per LLM, the number of responses below each"""
+        distinct, positions = np.unique(values, return_inverse=True)
+        histogram = np.zeros((llms, len(distinct) + 1))
+        np.add.at(histogram, (codes, positions.ravel() + 1), 1)
+        return distinct, np.cumsum(histogram, axis=1)
+
+    def _below(self, values: np.ndarray, cumulative: np.ndarray, bound: np.ndarray, inclusive: bool = False):
+        """Responses per LLM with value < bound (<= if inclusive), shape (llms, configs)"""
+        return cumulative[:, np.searchsorted(values, bound, side='right' if inclusive else 'left')]
+
+    def _between(self, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+        """Responses per LLM with low <= word count <= high"""
+        return np.maximum(
+            self._below(self.word_values, self.word_cumulative, high, inclusive=True)
+            - self._below(self.word_values, self.word_cumulative, low), 0
+        )
+
+    def conciseness_means(self, bands: np.ndarray) -> np.ndarray:
+        """Mean conciseness points per LLM under each configuration, shape (llms, configs)"""
+        o_lo, o_hi, a_lo, a_hi, p_lo, p_hi = bands.T
+        optimal = self._between(o_lo, o_hi)
+        acceptable = self._between(a_lo, a_hi)
+        poor = self._between(p_lo, p_hi)
+        # Intersections of bands are bands too (inclusion-exclusion)
+        optimal_acceptable = self._between(np.maximum(o_lo, a_lo), np.minimum(o_hi, a_hi))
+        optimal_poor = self._between(np.maximum(o_lo, p_lo), np.minimum(o_hi, p_hi))
+        acceptable_poor = self._between(np.maximum(a_lo, p_lo), np.minimum(a_hi, p_hi))
+        all_bands = self._between(
+            np.maximum.reduce([o_lo, a_lo, p_lo]), np.minimum.reduce([o_hi, a_hi, p_hi])
+        )
+
+        only_acceptable = acceptable - optimal_acceptable
+        only_poor = poor - optimal_poor - acceptable_poor + all_bands
+        rest = self.counts[:, None] - optimal - only_acceptable - only_poor
+        return (10 * optimal + 7 * only_acceptable + 4 * only_poor + rest) / self.counts[:, None]
+
+    def speed_means(self, limits: np.ndarray) -> np.ndarray:
+        """Mean speed points per LLM under each configuration, shape (llms, configs)"""
+        # A response gets the points of the first limit it is below
+        limits = np.maximum.accumulate(limits, axis=1)
+        excellent, good, acceptable = (
+            self._below(self.time_values, self.time_cumulative, limits[:, i]) for i in range(3)
+        )
+        rest = self.timed_counts[:, None] - acceptable
+        return (10 * excellent + 7 * (good - excellent) + 4 * (acceptable - good) + rest) / self.counts[:, None]
+
+    def averages(self, configs: SweepConfigs) -> np.ndarray:
+        """
+        Average total score of every LLM under every configuration
+
+        Returns:
+            Array of shape (configs, llms)
+        """
+        means = np.empty((len(configs), len(self.llm_names), len(Scorer.CRITERIA)))
+        for i, criterion in enumerate(FIXED_CRITERIA):
+            means[:, :, Scorer.CRITERIA.index(criterion)] = self.fixed_means[:, i]
+        means[:, :, Scorer.CRITERIA.index('conciseness')] = self.conciseness_means(configs.word_counts).T
+        means[:, :, Scorer.CRITERIA.index('speed')] = self.speed_means(configs.response_times).T
+
+        scale = np.array([100 / CRITERION_MAX[c] for c in Scorer.CRITERIA])
+        return np.einsum('klc,kc->kl', means, configs.weights * scale)
+
+
+def rank(averages: np.ndarray) -> np.ndarray:
+    """
+    LLM indices of each configuration from best to worst
+
+    Ties keep llm_names order, like ScoreAggregator.results(). Averages are
+    rounded first so that exact ties, which come out as correctly rounded
+    equal values there, are not split by summation noise here.
+    """
+    return np.argsort(-np.round(averages, RANK_DECIMALS), axis=1, kind='stable')
+
+
+def summarize(llm_names: List[str], configs: SweepConfigs, averages: np.ndarray) -> Dict[str, Any]:
+    """
+    Ranking stability over all configurations
+
+    Args:
+        llm_names: LLMs in column order of `averages`
+        configs: Swept configurations (the first is the baseline)
+        averages: Result of SweepStats.averages()
+
+    Returns:
+        Dictionary with the baseline ranking, per-LLM best/worst shares, rank
+        and score ranges, and how often the baseline ranking is reproduced
+    """
+    count, llms = averages.shape
+    order = rank(averages)
+    ranks = np.empty_like(order)
+    ranks[np.arange(count)[:, None], order] = np.arange(1, llms + 1)
+
+    best = np.bincount(order[:, 0], minlength=llms) / count
+    worst = np.bincount(order[:, -1], minlength=llms) / count
+    baseline = order[0]
+
+    llm_stats = {}
+    for i, llm_name in enumerate(llm_names):
+        llm_stats[llm_name] = {
+            'best_share': float(best[i]),
+            'worst_share': float(worst[i]),
+            'mean_rank': float(ranks[:, i].mean()),
+            'rank_counts': np.bincount(ranks[:, i], minlength=llms + 1)[1:].tolist(),
+            'baseline_score': float(averages[0, i]),
+            'min_score': float(averages[:, i].min()),
+            'max_score': float(averages[:, i].max())
+        }
+
+    return {
+        'configurations': count,
+        'baseline_ranking': [llm_names[i] for i in baseline],
+        'same_ranking_share': float(np.all(order == baseline, axis=1).mean()),
+        'same_best_share': float((order[:, 0] == baseline[0]).mean()),
+        'same_worst_share': float((order[:, -1] == baseline[-1]).mean()),
+        'llms': llm_stats,
+        'most_different': configs.describe(int(np.argmax(np.sum(ranks != ranks[0], axis=1))))
+    }
+
+
+def print_summary(summary: Dict[str, Any], elapsed: float):
+    """Print the ranking stability table"""
+    print("\n" + "="*70)
+    print("🎛️  RANKING STABILITY")
+    print("="*70 + "\n")
+    print(f"   {summary['configurations']} configurations scored in {elapsed:.2f}s\n")
+    print(f"   {'LLM'.ljust(22)} {'baseline':>9} {'best':>7} {'worst':>7} {'mean rank':>10} {'score range':>16}")
+    for llm_name in summary['baseline_ranking']:
+        stats = summary['llms'][llm_name]
+        print(
+            f"   {llm_name.ljust(22)} {stats['baseline_score']:>9.2f} {stats['best_share']:>7.1%} "
+            f"{stats['worst_share']:>7.1%} {stats['mean_rank']:>10.2f} "
+            f"{stats['min_score']:>7.2f}-{stats['max_score']:<7.2f}"
+        )
+    print()
+    print(f"   Baseline ranking kept: {summary['same_ranking_share']:.1%}")
+    print(f"   Baseline best kept:    {summary['same_best_share']:.1%}")
+    print(f"   Baseline worst kept:   {summary['same_worst_share']:.1%}")
+    print("\n" + "="*70 + "\n")
+
+
+def _load_source(args) -> SweepFeatures:
+    """Extract features from the database or a snapshot"""
+    from evaluator import LLMEvaluator
+    from db_pool import close_pool
+
+    evaluator = LLMEvaluator(
+        stream=True,
+        feature_cache_path=None if args.no_feature_cache else args.feature_cache,
+        snapshot_path=args.snapshot,
+        normalized=args.normalized
+    )
+    try:
+        if not args.snapshot:
+            evaluator.connect_db()
+        if args.normalized:
+            evaluator.llm_names = evaluator.stored_llm_names()
+        features = extract_features(evaluator, args.chunk_size)
+        if evaluator.feature_cache:
+            evaluator.feature_cache.flush()
+        return features
+    finally:
+        evaluator.close_db()
+        evaluator.close_cache()
+        close_pool()
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Re-rank LLMs under many scoring configurations")
+    parser.add_argument(
+        '--samples', type=int, default=10000,
+        help="Number of random configurations (default: 10000)"
+    )
+    parser.add_argument(
+        '--spread', type=float, default=0.5,
+        help="Relative threshold variation of random configurations (default: 0.5)"
+    )
+    parser.add_argument('--seed', type=int, default=None, help="Random seed")
+    parser.add_argument(
+        '--grid', action='store_true',
+        help="Sweep a grid of weights and threshold scalings instead of random samples"
+    )
+    parser.add_argument(
+        '--weight-step', type=float, default=0.1,
+        help="With --grid: weight increment (default: 0.1)"
+    )
+    parser.add_argument(
+        '--scales', default='0.75,1,1.25',
+        help="With --grid: threshold scaling factors (default: 0.75,1,1.25)"
+    )
+    parser.add_argument(
+        '--snapshot', metavar='PATH',
+        help="Read responses from a snapshot file instead of the database"
+    )
+    parser.add_argument(
+        '--normalized', action='store_true',
+        help="Read responses from the llm_responses table"
+    )
+    parser.add_argument(
+        '--features', metavar='PATH',
+        help="Reuse features saved here (.npz) or save them after extraction"
+    )
+    parser.add_argument(
+        '--chunk-size', type=int, default=WORKER_CHUNK_SIZE,
+        help=f"Rows per feature extraction chunk (default: {WORKER_CHUNK_SIZE})"
+    )
+    parser.add_argument(
+        '--feature-cache', default=FEATURE_CACHE_PATH,
+        help=f"Feature cache file (default: {FEATURE_CACHE_PATH})"
+    )
+    parser.add_argument(
+        '--no-feature-cache', action='store_true',
+        help="Extract features without using the cache"
+    )
+    parser.add_argument(
+        '--output', default='sweep_results.json',
+        help="Results file (default: sweep_results.json)"
+    )
+    args = parser.parse_args()
+    if args.snapshot and args.normalized:
+        parser.error("--snapshot cannot be combined with --normalized")
+    if args.samples < 1:
+        parser.error("--samples must be positive")
+    return args
+
+
+def main():
+    """Run a parameter sweep"""
+    args = parse_args()
+
+    if args.features and os.path.exists(args.features):
+        print(f"📂 Loading features from {args.features}")
+        features = load_features(args.features)
+    else:
+        print("🔍 Extracting features...")
+        features = _load_source(args)
+        if args.features:
+            save_features(features, args.features)
+            print(f"💾 Features saved to {args.features}")
+    print(f"📊 {len(features.llm_codes)} responses of {len(features.llm_names)} LLMs")
+
+    if args.grid:
+        configs = grid_configs(args.weight_step, [float(s) for s in args.scales.split(',')])
+    else:
+        configs = random_configs(args.samples, args.spread, args.seed)
+
+    start = time.perf_counter()
+    stats = SweepStats(features)
+    averages = stats.averages(configs)
+    summary = summarize(features.llm_names, configs, averages)
+    elapsed = time.perf_counter() - start
+
+    print_summary(summary, elapsed)
+
+    summary['sweep_date'] = datetime.now().isoformat()
+    summary['mode'] = 'grid' if args.grid else 'random'
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(f"💾 Results saved to {args.output}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Single-pass Structural Analysis for Feature Extraction
+"""
+
+import re
+from typing import Dict, Any, Tuple
+
+
+class TextAnalyzer:
+    """
+    Compute all structural text features in one walk over the lines
+
+    Results are identical to the original per-feature scans:
+
+    - headings: ``re.findall(r'^#+\\s', text, re.MULTILINE)``
+    - bullet_points: ``re.findall(r'^\\s*[-*•]\\s', text, re.MULTILINE)``
+    - numbered_lists: ``re.findall(r'^\\s*\\d+[\\.)]\\s', text, re.MULTILINE)``
+    - paragraph_count: non-blank pieces of ``text.split('\\n\\n')``
+    - sentence_count / avg_sentence_length: non-blank pieces of
+      ``re.split(r'[.!?]+', text)`` and their average word count
+
+    ``^`` only matches after ``\\n``, so the text is split on ``\\n`` once.
+    The trailing ``\\s`` of the patterns may be the newline itself, so a
+    marker that ends a line still counts unless it ends the text. A leading
+    ``\\s*`` spanning blank lines still yields one match per marker line.
+    Paragraph breaks (``\\n\\n``) are exactly the empty lines.
+
+    Sentences come from one ``str.split`` at the terminators (C speed,
+    unlike a character-class regex scan). Words are split once; the words
+    of all sentences follow from the terminator runs: a run inside a token
+    splits it into two sentence words, and a run surrounded by whitespace is
+    a token without sentence words.
+    """
+
+    VISUAL_MARKERS = ['✅', '❌', '🔍', '⚠️', '💡', '🚀', '📝', '🎯', '⏱️', '💾']
+
+    BULLET_CHARS = '-*•'
+
+    _NUMBER = re.compile(r'\d+[.)]')
+
+    @staticmethod
+    def analyze(text: str) -> Dict[str, Any]:
+        """
+        Extract structural features from response text
+
+        Args:
+            text: LLM response text (non-empty)
+
+        Returns:
+            Dictionary with word_count, code_blocks, headings, bullet_points,
+            numbered_lists, paragraph_count, has_visual_markers,
+            sentence_count and avg_sentence_length
+        """
+        headings, bullet_points, numbered_lists, paragraphs = TextAnalyzer.analyze_lines(text)
+        sentence_count, sentence_words, word_count = TextAnalyzer._count_sentences(text)
+
+        return {
+            'word_count': word_count,
+            'code_blocks': text.count('```') // 2,
+            'headings': headings,
+            'bullet_points': bullet_points,
+            'numbered_lists': numbered_lists,
+            'paragraph_count': paragraphs,
+            'has_visual_markers': TextAnalyzer.has_visual_markers(text),
+            'sentence_count': sentence_count,
+            'avg_sentence_length': sentence_words / sentence_count if sentence_count else 0,
+        }
+
+    @staticmethod
+    def analyze_lines(text: str) -> Tuple[int, int, int, int]:
+        """
+        Count line-based markdown structure in one walk over the lines
+
+        Args:
+            text: LLM response text (non-empty)
+
+        Returns:
+            (headings, bullet_points, numbered_lists, paragraph_count)
+        """
+        headings = bullet_points = numbered_lists = paragraphs = 0
+        in_paragraph = False
+        bullet_chars = TextAnalyzer.BULLET_CHARS
+        number = TextAnalyzer._NUMBER.match
+
+        # Markers ending a line count because the following newline matches
+        # \s; only the last line has no newline, it is corrected below
+        lines = text.split('\n')
+        for line in lines:
+            if not line:
+                in_paragraph = False
+                continue
+            stripped = line.lstrip()
+            if not stripped:
+                continue
+            if not in_paragraph:
+                paragraphs += 1
+                in_paragraph = True
+
+            first = stripped[0]
+            if first == '#':
+                if line[0] == '#':
+                    rest = line.lstrip('#')
+                    if not rest or rest[0].isspace():
+                        headings += 1
+            elif first in bullet_chars:
+                if len(stripped) == 1 or stripped[1].isspace():
+                    bullet_points += 1
+            elif first.isdecimal():
+                match = number(stripped)
+                if match and (match.end() == len(stripped) or stripped[match.end()].isspace()):
+                    numbered_lists += 1
+
+        last = lines[-1]
+        if last and last.rstrip() == last:
+            stripped = last.lstrip()
+            if last[0] == '#' and not last.lstrip('#'):
+                headings -= 1
+            elif len(stripped) == 1 and stripped in bullet_chars:
+                bullet_points -= 1
+            elif stripped[:1].isdecimal():
+                match = number(stripped)
+                if match and match.end() == len(stripped):
+                    numbered_lists -= 1
+
+        return headings, bullet_points, numbered_lists, paragraphs
+
+    @staticmethod
+    def has_visual_markers(text: str) -> bool:
+        """Whether the text contains any of VISUAL_MARKERS"""
+        return any(marker in text for marker in TextAnalyzer.VISUAL_MARKERS)
+
+    @staticmethod
+    def sentence_stats(text: str) -> Tuple[int, float]:
+        """
+        Count sentences and their average word count
+
+        Returns:
+            (sentence_count, avg_sentence_length)
+        """
+        sentence_count, sentence_words, _ = TextAnalyzer._count_sentences(text)
+        return sentence_count, sentence_words / sentence_count if sentence_count else 0
+
+    @staticmethod
+    def _count_sentences(text: str) -> Tuple[int, int, int]:
+        """
+        Count sentences, their words and whitespace-separated words
+
+        Returns:
+            (sentence_count, sentence_words, word_count)
+        """
+        word_count = len(text.split())
+        pieces = text.replace('!', '.').replace('?', '.').split('.')
+
+        first = pieces[0]
+        sentence_count = 1 if first and not first.isspace() else 0
+        # Tokens minus sentence words, see the class docstring
+        adjust = 0
+        # Whether the character before the current terminator run is part of a word
+        left_word = bool(first) and not first[-1].isspace()
+
+        for index in range(1, len(pieces)):
+            piece = pieces[index]
+            if not piece:
+                # Consecutive terminators
+                continue
+            right_word = not piece[0].isspace()
+            if left_word:
+                if right_word:
+                    adjust -= 1
+            elif not right_word:
+                adjust += 1
+
+            if right_word or not piece.isspace():
+                sentence_count += 1
+            left_word = not piece[-1].isspace()
+
+        # A terminator run at the very end of the text
+        if len(pieces) > 1 and not pieces[-1] and not left_word:
+            adjust += 1
+
+        return sentence_count, word_count - adjust, word_count
@@ -0,0 +1,251 @@
+"""
+Continuous Evaluation Driven by PostgreSQL LISTEN/NOTIFY
+"""
+
+import select
+import signal
+import time
+from typing import Any, Callable, Dict, Optional
+import psycopg2
+from psycopg2 import sql
+from config import DB_CONFIG, WATCH_CHANNEL, WATCH_MAX_DELAY, WATCH_BATCH_SIZE
+from evaluator import LLMEvaluator
+from incremental import IncrementalState
+from latency import LatencySketch
+
+
+# Seconds between reconnection attempts after losing the database
+RECONNECT_DELAY = 5.0
+
+
+def _interrupt(signum, frame):
+    """Stop on SIGTERM as on Ctrl+C"""
+    raise KeyboardInterrupt
+
+
+class EvaluationWatcher:
+    """
+    Keep the incremental evaluation current as rows change
+
+    Every inserted, changed or deleted llm_error_analysis row gets an entry
+    in the change log (src/database/upgrade-evaluation-incremental.sql), and
+    a trigger (src/database/upgrade-evaluation-notify.sql) announces the row
+    id of each entry on a NOTIFY channel once it commits. Announcements are
+    collected into micro-batches: a batch is applied once `batch_size` rows
+    are waiting or the oldest has waited `max_delay` seconds, so a change
+    reaches the results within about `max_delay` plus the time to score one
+    batch.
+
+    A batch reads the oldest change log entries and only their rows,
+    replaces their scores in the running aggregates of the incremental state
+    (the same state as `main.py evaluate --incremental`), commits it and
+    deletes the entries; no table scan is needed. Notifications only wake
+    the daemon, the log is the one cursor shared with the catch-up: on start
+    and after a lost connection the entries written while not listening are
+    applied, and rows still waiting at shutdown keep their entries. Batch
+    sizes, throughput and lag (notification to committed aggregates) are
+    tracked.
+    """
+
+    def __init__(self, evaluator: LLMEvaluator, channel: str = WATCH_CHANNEL,
+                 max_delay: float = WATCH_MAX_DELAY, batch_size: int = WATCH_BATCH_SIZE,
+                 on_results: Callable[[Dict[str, Any]], None] = None):
+        """
+        Args:
+            evaluator: Evaluator scoring the rows (its state_path, feature
+                cache and speed_quantile are used)
+            channel: NOTIFY channel of the trigger
+            max_delay: Longest a notified change waits for its batch, in seconds
+            batch_size: Waiting rows that start a batch immediately (and the
+                most rows applied per batch)
+            on_results: Called with the updated results after the catch-up
+                and after every batch (e.g. to save them)
+        """
+        self.evaluator = evaluator
+        self.channel = channel
+        self.max_delay = max_delay
+        self.batch_size = batch_size
+        self.on_results = on_results
+
+        self.listen_conn = None
+        self.state: Optional[IncrementalState] = None
+        self.aggregator = None
+        # Announced row id -> monotonic time its first notification arrived
+        self.pending: Dict[int, float] = {}
+
+        self.batches = 0
+        self.rows = 0
+        self.deleted = 0
+        # Seconds spent applying batches
+        self.busy = 0.0
+        # Milliseconds from notification to committed aggregates, per row
+        self.lag = LatencySketch()
+
+    def run(self):
+        """Watch until interrupted (Ctrl+C or SIGTERM), reconnecting when the database goes away"""
+        previous_handler = signal.signal(signal.SIGTERM, _interrupt)
+        self.state = IncrementalState(self.evaluator.state_path)
+
+        try:
+            while True:
+                try:
+                    self._connect()
+                    self._catch_up()
+                    self._watch()
+                except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                    self.state.rollback()
+                    self._disconnect(discard=True)
+                    print(f"⚠️  Database connection lost ({str(e).strip().splitlines()[0]}), "
+                          f"reconnecting in {RECONNECT_DELAY:.0f} s")
+                    time.sleep(RECONNECT_DELAY)
+        except KeyboardInterrupt:
+            print("\n👋 Watcher stopped")
+        finally:
+            self._disconnect()
+            self.evaluator.close_cache()
+            self.state.close()
+            signal.signal(signal.SIGTERM, previous_handler)
+            self.print_stats()
+
+    def _connect(self):
+        """Listen on the channel, then borrow the evaluator's connection"""
+        self.listen_conn = psycopg2.connect(**DB_CONFIG)
+        self.listen_conn.autocommit = True
+        cursor = self.listen_conn.cursor()
+        cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+        cursor.close()
+        self.evaluator.connect_db()
+        print(f"👂 Listening on '{self.channel}' (batches of up to {self.batch_size} rows, "
+              f"at most {self.max_delay:g} s wait)")
+
+    def _disconnect(self, discard: bool = False):
+        if self.listen_conn is not None:
+            self.listen_conn.close()
+            self.listen_conn = None
+        self.evaluator.close_db(discard)
+
+    def _catch_up(self):
+        """Apply changes made while not listening, starting from the committed state"""
+        # Listening started first, so entries committed from now on are
+        # announced; those the catch-up already drained are found gone later
+        self.aggregator = self.state.load_aggregator()
+        self.evaluator.breakdown = self.state.load_breakdown()
+        self.evaluator.catch_up(self.state, self.aggregator)
+        self.evaluator.conn.commit()
+        self._publish()
+
+    def _watch(self):
+        """Collect notifications and apply due batches (returns only by exception)"""
+        try:
+            while True:
+                self._receive()
+                while self._due():
+                    self._apply_batch()
+        except KeyboardInterrupt:
+            # Changes already announced are applied before stopping; without
+            # a database their log entries are left to the next start
+            try:
+                while self.pending:
+                    self._apply_batch()
+            except psycopg2.Error as e:
+                print(f"⚠️  {len(self.pending)} announced rows not applied ({str(e).strip().splitlines()[0]})")
+            raise
+
+    def _receive(self):
+        """Wait for notifications until the oldest waiting row is due, and collect them"""
+        timeout = None
+        if self.pending:
+            oldest = next(iter(self.pending.values()))
+            timeout = max(0.0, oldest + self.max_delay - time.monotonic())
+            if len(self.pending) >= self.batch_size:
+                timeout = 0.0
+
+        select.select([self.listen_conn], [], [], timeout)
+        self.listen_conn.poll()
+        now = time.monotonic()
+        for notify in self.listen_conn.notifies:
+            try:
+                row_id = int(notify.payload)
+            except ValueError:
+                print(f"⚠️  Ignoring notification {notify.payload!r} on '{self.channel}'")
+                continue
+            self.pending.setdefault(row_id, now)
+        self.listen_conn.notifies.clear()
+
+    def _due(self) -> bool:
+        """Whether a batch should be applied now"""
+        if not self.pending:
+            return False
+        if len(self.pending) >= self.batch_size:
+            return True
+        return time.monotonic() - next(iter(self.pending.values())) >= self.max_delay
+
+    def _apply_batch(self):
+        """Apply the oldest change log entries, drain them and commit"""
+        start = time.monotonic()
+        try:
+            change_ids, row_ids = self.evaluator.read_changes(self.batch_size)
+            changed, deleted = self.evaluator.apply_changes(self.state, self.aggregator, row_ids)
+            self.state.commit_run(self.aggregator, self.evaluator.breakdown)
+            # Applying entries again after a failed drain is harmless
+            self.evaluator.drain_changes(change_ids)
+            self.evaluator.conn.commit()
+        except BaseException:
+            # The aggregates in memory are reloaded from the state file on reconnect
+            self.state.rollback()
+            raise
+        if self.evaluator.feature_cache:
+            self.evaluator.feature_cache.flush()
+
+        # A notification is sent when its entry commits, so once the log was
+        # read to the end every row announced before the read has been applied
+        # (possibly by an earlier batch or the catch-up)
+        arrived = [self.pending.pop(row_id) for row_id in row_ids if row_id in self.pending]
+        if len(change_ids) < self.batch_size:
+            for row_id, arrival in list(self.pending.items()):
+                if arrival <= start:
+                    arrived.append(self.pending.pop(row_id))
+
+        done = time.monotonic()
+        for arrival in arrived:
+            self.lag.add((done - arrival) * 1000)
+        self.batches += 1
+        self.rows += changed
+        self.deleted += deleted
+        self.busy += done - start
+
+        leader = self._publish()
+        lag = f", lag up to {done - min(arrived):.2f} s" if arrived else ""
+        print(f"   🔁 Batch {self.batches}: {changed} rows scored, {deleted} removed "
+              f"in {(done - start) * 1000:.0f} ms{lag}"
+              f"{f' · 🏆 {leader}' if leader else ''}")
+
+    def _publish(self) -> Optional[str]:
+        """Pass the current results to on_results; returns the leader as 'name score'"""
+        if not any(self.aggregator.counts.values()):
+            return None
+        results = self.evaluator.summarize(self.aggregator)
+        if self.on_results:
+            self.on_results(results)
+        best_llm = results['best_llm']
+        return f"{best_llm} {results['scores'][best_llm]:.2f}"
+
+    def stats(self) -> Dict[str, Any]:
+        """Batches, rows, throughput while busy and lag percentiles (ms)"""
+        return {
+            'batches': self.batches,
+            'rows': self.rows,
+            'deleted': self.deleted,
+            'rows_per_second': self.rows / self.busy if self.busy else None,
+            'lag_ms': self.lag.summary()
+        }
+
+    def print_stats(self):
+        """Print stats()"""
+        if not self.batches:
+            return
+        stats = self.stats()
+        lag = stats['lag_ms']
+        print(f"📈 {stats['batches']} batches, {stats['rows']} rows scored, {stats['deleted']} removed, "
+              f"{stats['rows_per_second']:,.0f} rows/s while busy")
+        print(f"   Lag ms: p50 {lag['p50']:.0f}  p95 {lag['p95']:.0f}  p99 {lag['p99']:.0f}  max {lag['max']:.0f}")
@@ -0,0 +1,32 @@
+-- Evaluation results storage (written by evaluation/main.py)
+
+-- One row per evaluation run with the run-level report
+CREATE TABLE IF NOT EXISTS evaluation_runs (
+    id SERIAL PRIMARY KEY,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP,
+    best_llm TEXT,
+    worst_llm TEXT,
+    results JSONB,
+    description TEXT
+);
+
+-- Latest scores per response; run_id is the run that last changed them
+CREATE TABLE IF NOT EXISTS evaluation_scores (
+    error_id INTEGER NOT NULL REFERENCES llm_error_analysis(id) ON DELETE CASCADE,
+    llm_name TEXT NOT NULL,
+    technical_accuracy DOUBLE PRECISION NOT NULL,
+    solution_quality DOUBLE PRECISION NOT NULL,
+    clarity DOUBLE PRECISION NOT NULL,
+    conciseness DOUBLE PRECISION NOT NULL,
+    speed DOUBLE PRECISION NOT NULL,
+    reliability DOUBLE PRECISION NOT NULL,
+    total DOUBLE PRECISION NOT NULL,
+    run_id INTEGER REFERENCES evaluation_runs(id) ON DELETE SET NULL,
+    PRIMARY KEY (error_id, llm_name)
+);
+
+CREATE INDEX IF NOT EXISTS idx_evaluation_scores_llm ON evaluation_scores(llm_name);
+CREATE INDEX IF NOT EXISTS idx_evaluation_scores_run ON evaluation_scores(run_id);
+
+SELECT 'Evaluation result tables created!' as message;
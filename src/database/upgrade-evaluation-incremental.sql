@@ -0,0 +1,60 @@
+-- Upgrade database for incremental evaluation (evaluation/main.py --incremental)
+
+-- Change log: one entry per inserted, changed or deleted row, written in the
+-- same transaction as the change. The evaluator reads the entries, applies
+-- them and deletes exactly the entries it read, so a change that commits
+-- late (after a later one was already applied) is still picked up by the
+-- next run. Entries are consumed by one evaluator (one incremental state).
+CREATE TABLE IF NOT EXISTS llm_responses_changes (
+  change_id BIGSERIAL PRIMARY KEY,
+  row_id INTEGER NOT NULL,
+  changed_at TIMESTAMP NOT NULL DEFAULT clock_timestamp()
+);
+
+CREATE OR REPLACE FUNCTION log_llm_responses_change() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    INSERT INTO llm_responses_changes (row_id) VALUES (OLD.id);
+  ELSE
+    INSERT INTO llm_responses_changes (row_id) VALUES (NEW.id);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_log_responses_inserted ON llm_error_analysis;
+DROP TRIGGER IF EXISTS trg_log_responses_updated ON llm_error_analysis;
+DROP TRIGGER IF EXISTS trg_log_responses_deleted ON llm_error_analysis;
+
+CREATE TRIGGER trg_log_responses_inserted
+AFTER INSERT ON llm_error_analysis
+FOR EACH ROW
+EXECUTE FUNCTION log_llm_responses_change();
+
+-- Only changes to scored data, so writing evaluation results (best_llm,
+-- worst_llm, description) does not mark rows as changed
+CREATE TRIGGER trg_log_responses_updated
+AFTER UPDATE ON llm_error_analysis
+FOR EACH ROW
+WHEN (
+  OLD.error_category IS DISTINCT FROM NEW.error_category OR
+  OLD.error_code IS DISTINCT FROM NEW.error_code OR
+  OLD.groq_response IS DISTINCT FROM NEW.groq_response OR
+  OLD.mistral_response IS DISTINCT FROM NEW.mistral_response OR
+  OLD.cohere_response IS DISTINCT FROM NEW.cohere_response OR
+  OLD.openrouter_response IS DISTINCT FROM NEW.openrouter_response OR
+  OLD.openrouter_hermes_response IS DISTINCT FROM NEW.openrouter_hermes_response OR
+  OLD.groq_response_time IS DISTINCT FROM NEW.groq_response_time OR
+  OLD.mistral_response_time IS DISTINCT FROM NEW.mistral_response_time OR
+  OLD.cohere_response_time IS DISTINCT FROM NEW.cohere_response_time OR
+  OLD.openrouter_response_time IS DISTINCT FROM NEW.openrouter_response_time OR
+  OLD.openrouter_hermes_response_time IS DISTINCT FROM NEW.openrouter_hermes_response_time
+)
+EXECUTE FUNCTION log_llm_responses_change();
+
+CREATE TRIGGER trg_log_responses_deleted
+AFTER DELETE ON llm_error_analysis
+FOR EACH ROW
+EXECUTE FUNCTION log_llm_responses_change();
+
+SELECT 'Database upgraded for incremental evaluation!' as message;
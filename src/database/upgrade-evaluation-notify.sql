@@ -0,0 +1,22 @@
+-- Upgrade database for continuous evaluation (evaluation/main.py watch)
+-- Requires upgrade-evaluation-incremental.sql: the daemon applies the
+-- change log (llm_responses_changes); notifications only wake it up
+
+-- Announce every change log entry on the llm_responses_changed channel;
+-- the payload is the row id. Notifications are delivered when the
+-- transaction commits, and duplicates within a transaction are merged.
+CREATE OR REPLACE FUNCTION notify_llm_responses_changed() RETURNS trigger AS $$
+BEGIN
+  PERFORM pg_notify('llm_responses_changed', NEW.row_id::text);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notify_responses_changed ON llm_responses_changes;
+
+CREATE TRIGGER trg_notify_responses_changed
+AFTER INSERT ON llm_responses_changes
+FOR EACH ROW
+EXECUTE FUNCTION notify_llm_responses_changed();
+
+SELECT 'Database upgraded for continuous evaluation!' as message;
@@ -0,0 +1,35 @@
+-- Upgrade database for per-row evaluation winners (evaluation/main.py)
+
+-- Best and worst LLM of each individual error
+ALTER TABLE llm_error_analysis
+ADD COLUMN IF NOT EXISTS best_llm VARCHAR(50),
+ADD COLUMN IF NOT EXISTS worst_llm VARCHAR(50);
+
+-- The evaluator writes the names used in evaluation/config.py LLM_NAMES
+ALTER TABLE llm_error_analysis DROP CONSTRAINT IF EXISTS check_best_llm;
+
+ALTER TABLE llm_error_analysis
+ADD CONSTRAINT check_best_llm
+CHECK (best_llm IS NULL OR best_llm IN (
+  'groq',
+  'mistral',
+  'cohere',
+  'openrouter_llama',
+  'openrouter_mistral',
+  'openrouter_hermes'
+));
+
+ALTER TABLE llm_error_analysis DROP CONSTRAINT IF EXISTS check_worst_llm;
+
+ALTER TABLE llm_error_analysis
+ADD CONSTRAINT check_worst_llm
+CHECK (worst_llm IS NULL OR worst_llm IN (
+  'groq',
+  'mistral',
+  'cohere',
+  'openrouter_llama',
+  'openrouter_mistral',
+  'openrouter_hermes'
+));
+
+SELECT 'Database upgraded for per-row evaluation winners!' as message;
@@ -0,0 +1,90 @@
+-- Normalized response storage (evaluation/main.py --normalized)
+--
+-- One row per (error, LLM) response instead of one column pair per LLM, so
+-- new models need no schema change. The wide llm_error_analysis columns stay
+-- the source of truth for existing writers; a trigger mirrors them here.
+
+CREATE TABLE IF NOT EXISTS llm_responses (
+    error_id INTEGER NOT NULL REFERENCES llm_error_analysis(id) ON DELETE CASCADE,
+    llm_name TEXT NOT NULL,
+    response_text TEXT,
+    response_time_ms INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (error_id, llm_name)
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_responses_llm_name ON llm_responses(llm_name);
+
+-- Responses held in the wide columns of a row, named like config.LLM_NAMES.
+-- Columns are looked up by name, so openrouter_mistral_response (added by
+-- scripts/dev-tools/add-openrouter-mistral-column.js) is used where it exists
+-- and openrouter_response is never copied to a second LLM.
+CREATE OR REPLACE FUNCTION wide_llm_responses(e llm_error_analysis)
+RETURNS TABLE (llm_name TEXT, response_text TEXT, response_time_ms INTEGER) AS $$
+  SELECT m.llm_name, j ->> (m.prefix || '_response'), (j ->> (m.prefix || '_response_time'))::INTEGER
+  FROM to_jsonb(e) AS j,
+       (VALUES
+         ('groq', 'groq'),
+         ('mistral', 'mistral'),
+         ('cohere', 'cohere'),
+         ('openrouter_llama', 'openrouter'),
+         ('openrouter_mistral', 'openrouter_mistral'),
+         ('openrouter_hermes', 'openrouter_hermes')
+       ) AS m (llm_name, prefix)
+  WHERE j ? (m.prefix || '_response')
+$$ LANGUAGE sql STABLE;
+
+-- Keep llm_responses in sync with inserts and updates of the wide columns
+CREATE OR REPLACE FUNCTION sync_llm_responses() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'UPDATE' AND
+     ARRAY(SELECT ROW(w.*) FROM wide_llm_responses(OLD) w) IS NOT DISTINCT FROM
+     ARRAY(SELECT ROW(w.*) FROM wide_llm_responses(NEW) w) THEN
+    -- e.g. best_llm / worst_llm written by the evaluation
+    RETURN NULL;
+  END IF;
+
+  DELETE FROM llm_responses r
+  USING wide_llm_responses(NEW) w
+  WHERE r.error_id = NEW.id
+    AND r.llm_name = w.llm_name
+    AND w.response_text IS NULL
+    AND w.response_time_ms IS NULL;
+
+  INSERT INTO llm_responses (error_id, llm_name, response_text, response_time_ms)
+  SELECT NEW.id, w.llm_name, w.response_text, w.response_time_ms
+  FROM wide_llm_responses(NEW) w
+  WHERE w.response_text IS NOT NULL OR w.response_time_ms IS NOT NULL
+  ON CONFLICT (error_id, llm_name) DO UPDATE SET
+    response_text = EXCLUDED.response_text,
+    response_time_ms = EXCLUDED.response_time_ms,
+    updated_at = CURRENT_TIMESTAMP
+  WHERE (llm_responses.response_text, llm_responses.response_time_ms)
+    IS DISTINCT FROM (EXCLUDED.response_text, EXCLUDED.response_time_ms);
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_sync_llm_responses ON llm_error_analysis;
+
+CREATE TRIGGER trg_sync_llm_responses
+AFTER INSERT OR UPDATE ON llm_error_analysis
+FOR EACH ROW
+EXECUTE FUNCTION sync_llm_responses();
+
+-- Backfill existing rows (safe to re-run: unchanged responses are skipped)
+INSERT INTO llm_responses (error_id, llm_name, response_text, response_time_ms)
+SELECT e.id, w.llm_name, w.response_text, w.response_time_ms
+FROM llm_error_analysis e
+CROSS JOIN LATERAL wide_llm_responses(e) w
+WHERE w.response_text IS NOT NULL OR w.response_time_ms IS NOT NULL
+ON CONFLICT (error_id, llm_name) DO UPDATE SET
+  response_text = EXCLUDED.response_text,
+  response_time_ms = EXCLUDED.response_time_ms,
+  updated_at = CURRENT_TIMESTAMP
+WHERE (llm_responses.response_text, llm_responses.response_time_ms)
+  IS DISTINCT FROM (EXCLUDED.response_text, EXCLUDED.response_time_ms);
+
+SELECT 'Normalized llm_responses table created and backfilled!' as message;